@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+核心热点路径性能基准
+
+使用固定随机种子生成的模拟K线、价格和RSS新闻，在不同数据规模下测量：
+K线DataFrame构建+指标计算、check_signals、价格线图/MACD图更新、RSS解析、状态报告生成，
+以及在虚拟时钟下快进运行的完整监控循环（规模为循环轮数）。
+Binance客户端和RSS请求均由离线替身提供，无需网络。
+
+用法:
+    python benchmark.py                      # 运行全部基准并与基线比较
+    python benchmark.py --quick              # 只运行较小规模
+    python benchmark.py --only kline_frame   # 只运行指定基准（可多次指定）
+    python benchmark.py --save-baseline      # 将本次结果保存为基线
+    python benchmark.py --fail-on-regression # 存在性能回退时以非零状态退出
+
+每次运行的结果追加到 benchmark_results/history.jsonl，基线保存在 benchmark_results/baseline.json。
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import contextlib
+import tempfile
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from unittest import mock
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+try:
+    import matplotlib
+    matplotlib.use('Agg')  # 状态报告图表使用非交互后端
+except ImportError:
+    matplotlib = None
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from PyQt5.QtWidgets import QApplication
+
+from shell_tracker_core import ShellTrackerCore
+from utils.market_sim import MarketSimulator, klines_to_rows
+from utils.clock import VirtualClock
+from utils.io_runtime import Response
+from utils.feed_cache import FeedCache
+
+RESULTS_DIR = os.path.join(APP_DIR, "benchmark_results")
+HISTORY_FILE = os.path.join(RESULTS_DIR, "history.jsonl")
+BASELINE_FILE = os.path.join(RESULTS_DIR, "baseline.json")
+
+SEED = 42
+INTERVAL_MS = 60 * 1000
+
+# 各基准的数据规模（K线条数 / 文章数 / 价格tick数）
+SIZES = {
+    'kline_frame': [100, 1000, 10000, 100000, 1000000],
+    'check_signals': [100, 1000, 10000, 100000, 1000000],
+    'line_chart': [100, 1000, 10000, 100000, 1000000],
+    'macd_chart': [100, 1000, 10000, 100000, 1000000],
+    'rss_parse': [10, 100, 1000, 10000],
+    'status_report': [100, 1000, 10000, 100000],
+    'monitoring_loop': [100, 1000, 10000],
+}
+QUICK_LIMIT = {'rss_parse': 1000}
+QUICK_DEFAULT_LIMIT = 10000
+
+BENCH_CONFIG = {
+    'api': {
+        'binance': {'api_key': '', 'api_secret': ''},
+        'news': {'enabled': True},
+        'telegram': {'enabled': False},
+    },
+    'trading': {
+        'symbol': 'SHELLUSDT',
+        'interval': '1m',
+        'stop_loss_percent': 5.0,
+        'take_profit_percent': 10.0,
+        'sentiment_influence_enabled': True,
+        'sentiment_influence_weight': 0.5,
+    },
+    'monitoring': {},
+}
+
+
+def generate_klines(n, seed=SEED, end_ms=None):
+    """生成 n 条Binance REST格式的模拟K线"""
+    simulator = MarketSimulator(['SHELLUSDT'], seed=seed)
+    columns = simulator.klines(n, interval_ms=INTERVAL_MS, end_ms=end_ms)['SHELLUSDT']
+    return klines_to_rows(columns)
+
+
+class OfflineBinanceClient:
+    """离线Binance客户端替身，提供监控流程用到的接口"""
+
+    def __init__(self, n=1000, seed=SEED):
+        self.klines = generate_klines(n, seed)
+
+    def get_server_time(self):
+        return {'serverTime': int(time.time() * 1000)}
+
+    def get_asset_balance(self, asset=None):
+        return {'asset': asset, 'free': '0.0', 'locked': '0.0'}
+
+    def get_symbol_ticker(self, symbol=None, **kwargs):
+        return {'symbol': symbol, 'price': str(self.klines[-1][4])}
+
+    def get_ticker(self, symbol=None, **kwargs):
+        day = self.klines[-1440:]
+        first, last = day[0][1], day[-1][4]
+        return {
+            'symbol': symbol,
+            'lastPrice': str(last),
+            'priceChangePercent': str((last - first) / first * 100),
+            'highPrice': str(max(row[2] for row in day)),
+            'lowPrice': str(min(row[3] for row in day)),
+            'volume': str(sum(row[5] for row in day)),
+            'quoteVolume': str(sum(row[7] for row in day)),
+        }
+
+    def get_historical_klines(self, symbol, interval, start_str, limit=500):
+        return [list(row) for row in self.klines]
+
+    def get_klines(self, symbol=None, interval=None, limit=500, startTime=None, **kwargs):
+        rows = self.klines if startTime is None else [r for r in self.klines[-limit:] if r[0] >= startTime]
+        return [list(row) for row in rows[-limit:]]
+
+
+def generate_rss_feeds(n_articles, n_feeds=4, seed=SEED):
+    """生成 n_feeds 个RSS源的XML内容，共 n_articles 篇文章，约一半包含关键词"""
+    rng = np.random.default_rng(seed)
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    feeds = {}
+    per_feed = [n_articles // n_feeds + (1 if i < n_articles % n_feeds else 0) for i in range(n_feeds)]
+
+    article_id = 0
+    for f, count in enumerate(per_feed):
+        items = []
+        for _ in range(count):
+            keyword = 'MyShell' if rng.random() < 0.5 else 'Bitcoin'
+            pub = now - timedelta(minutes=int(rng.integers(0, 60 * 24 * 7)))
+            summary = (f"&lt;p&gt;{keyword} &lt;b&gt;update&lt;/b&gt; #{article_id}: markets &amp;amp; "
+                       f"liquidity move as traders react.&lt;/p&gt;" * 3)
+            items.append(
+                f"<item><title>{keyword} news {article_id}</title>"
+                f"<link>https://example.com/news/{article_id}</link>"
+                f"<description>{summary}</description>"
+                f"<pubDate>{format_datetime(pub)}</pubDate></item>"
+            )
+            article_id += 1
+        feeds[f"https://feed{f}.example.com/rss"] = (
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>Feed {f}</title><link>https://feed{f}.example.com</link>"
+            f"<description>Synthetic feed</description>{''.join(items)}</channel></rss>"
+        ).encode('utf-8')
+    return feeds
+
+
+def make_tracker(n_klines=1000):
+    """创建使用离线客户端的追踪器"""
+    tracker = ShellTrackerCore(json.loads(json.dumps(BENCH_CONFIG)))
+    tracker.client = OfflineBinanceClient(n_klines)
+    tracker.rss_keywords = ['myshell', 'shell coin', ' shell ']
+    return tracker
+
+
+def build_indicator_frame(tracker, n):
+    """构建 n 条K线的指标DataFrame（供 check_signals / 图表基准使用）"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return tracker._build_kline_frame('SHELLUSDT', '1m', generate_klines(n))
+
+
+# ---------------------------------------------------------------------------
+# 基准定义：setup(n) 返回无参数的被测函数
+# ---------------------------------------------------------------------------
+
+def setup_kline_frame(n):
+    tracker = make_tracker()
+    klines = generate_klines(n)
+
+    def run():
+        tracker.indicator_engines.clear()  # 冷启动：完整计算全部指标
+        return tracker._build_kline_frame('SHELLUSDT', '1m', klines)
+    return run
+
+
+def setup_check_signals(n):
+    tracker = make_tracker()
+    tracker.current_sentiment = 'positive'
+    tracker.sentiment_score = 0.3
+    df = build_indicator_frame(tracker, n)
+    return lambda: tracker.check_signals(df)
+
+
+def setup_line_chart(n):
+    from ui.chart_widget import PriceChartWidget
+    widget = PriceChartWidget()
+    start = datetime(2024, 1, 1)
+    prices = generate_klines(n)
+    price_data = [(start + timedelta(seconds=i), row[4]) for i, row in enumerate(prices)]
+    return lambda: widget.update_line_chart(price_data)
+
+
+def setup_macd_chart(n):
+    from ui.chart_widget import MacdChartWidget
+    widget = MacdChartWidget()
+    df = build_indicator_frame(make_tracker(), n)
+    return lambda: widget.update_macd_chart(df)
+
+
+def setup_rss_parse(n):
+    tracker = make_tracker()
+    feeds = generate_rss_feeds(n)
+    tracker.rss_feeds = list(feeds)
+
+    async def offline_request(method, url, *args, **kwargs):
+        return Response(200, url, {}, feeds[url])
+
+    def run():
+        tracker.feed_cache = FeedCache()  # 每次都从空缓存开始，测量完整解析
+        with mock.patch.object(tracker.io, 'request', offline_request):
+            return tracker.fetch_rss_news(max_articles_per_rss=n)
+    return run
+
+
+def setup_status_report(n):
+    tracker = make_tracker(1440)
+    tracker.charts_dir = tempfile.mkdtemp(prefix="bench_charts_")
+    start = datetime.now() - timedelta(seconds=n)
+    tracker.price_log = [(start + timedelta(seconds=i), row[4]) for i, row in enumerate(generate_klines(n))]
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracker.get_klines()  # 预热K线缓存，只测报告本身
+    return tracker.generate_status_report
+
+
+def setup_monitoring_loop(n):
+    refresh_seconds = 5
+
+    def run():
+        tracker = make_tracker(1440)
+        tracker.set_clock(VirtualClock())
+        tracker.config['api']['news']['enabled'] = False
+        tracker.config['monitoring']['price_alert_threshold'] = 1.0
+        tracker.config['monitoring']['adaptive_refresh'] = False  # 固定间隔，迭代次数保持为 n
+        tracker._monitoring_loop(n * refresh_seconds / 60, refresh_seconds)
+    return run
+
+
+BENCHMARKS = {
+    'kline_frame': setup_kline_frame,
+    'check_signals': setup_check_signals,
+    'line_chart': setup_line_chart,
+    'macd_chart': setup_macd_chart,
+    'rss_parse': setup_rss_parse,
+    'status_report': setup_status_report,
+    'monitoring_loop': setup_monitoring_loop,
+}
+
+
+def time_call(func, size, min_time=0.5, max_repeat=20):
+    """重复调用 func，返回各次耗时（秒）；大规模数据时减少重复次数"""
+    timings = []
+    budget_start = time.perf_counter()
+    while len(timings) < max_repeat:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        if len(timings) >= 3 and time.perf_counter() - budget_start >= min_time:
+            break
+        if size >= 100000 and time.perf_counter() - budget_start >= min_time:
+            break
+    return timings
+
+
+def run_benchmarks(names, quick=False):
+    """运行指定基准
+
+    Returns:
+        dict: 基准名 -> {规模(str): {'median': 秒, 'min': 秒, 'repeat': 次数}}
+    """
+    results = {}
+    for name in names:
+        sizes = SIZES[name]
+        if quick:
+            limit = QUICK_LIMIT.get(name, QUICK_DEFAULT_LIMIT)
+            sizes = [s for s in sizes if s <= limit]
+
+        results[name] = {}
+        for size in sizes:
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    func = BENCHMARKS[name](size)
+            except ImportError as e:
+                # 缺少可选依赖（如 PyQtChart）时跳过该基准
+                print(f"{name:14s} 跳过: {str(e)}")
+                del results[name]
+                break
+            timings = time_call(func, size)
+            results[name][str(size)] = {
+                'median': statistics.median(timings),
+                'min': min(timings),
+                'repeat': len(timings),
+            }
+            print(f"{name:14s} n={size:<8d} 中位数 {statistics.median(timings) * 1000:10.3f} ms  "
+                  f"最小 {min(timings) * 1000:10.3f} ms  ({len(timings)} 次)")
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def make_record(results):
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'seed': SEED,
+        'results': results,
+    }
+
+
+def append_history(record, path=HISTORY_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_baseline(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(record, path=BASELINE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+
+
+def compare_with_baseline(results, baseline, tolerance=0.25, noise_floor=0.001):
+    """与基线比较中位数耗时
+
+    Args:
+        tolerance: 允许的相对变慢比例（0.25 表示慢25%以内不算回退）
+        noise_floor: 绝对差值小于该秒数时忽略（避免微秒级抖动误报）
+
+    Returns:
+        list: 回退项 [(基准名, 规模, 基线秒, 本次秒, 比例)]
+    """
+    regressions = []
+    base_results = baseline.get('results', {})
+    for name, by_size in results.items():
+        for size, current in by_size.items():
+            base = base_results.get(name, {}).get(size)
+            if not base:
+                continue
+            ratio = current['median'] / base['median'] if base['median'] > 0 else float('inf')
+            if ratio > 1 + tolerance and current['median'] - base['median'] > noise_floor:
+                regressions.append((name, size, base['median'], current['median'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ShellMonitor 核心路径性能基准")
+    parser.add_argument('--only', action='append', choices=list(BENCHMARKS), help="只运行指定基准")
+    parser.add_argument('--quick', action='store_true', help=f"只运行不超过 {QUICK_DEFAULT_LIMIT} 的规模")
+    parser.add_argument('--save-baseline', action='store_true', help="将本次结果保存为基线")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="回退判定的相对阈值（默认0.25）")
+    parser.add_argument('--fail-on-regression', action='store_true', help="存在回退时返回非零状态")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    results = run_benchmarks(args.only or list(BENCHMARKS), quick=args.quick)
+    record = make_record(results)
+    append_history(record)
+    print(f"结果已追加到 {HISTORY_FILE}")
+
+    regressions = []
+    baseline = load_baseline()
+    if baseline is None:
+        print("未找到基线，使用 --save-baseline 保存本次结果作为基线")
+    else:
+        regressions = compare_with_baseline(results, baseline, tolerance=args.tolerance)
+        if regressions:
+            print(f"\n⚠️ 相对基线 ({baseline.get('revision')}, {baseline.get('timestamp')}) 的性能回退:")
+            for name, size, base, current, ratio in regressions:
+                print(f"  {name} n={size}: {base * 1000:.3f} ms -> {current * 1000:.3f} ms (x{ratio:.2f})")
+        else:
+            print(f"相对基线 ({baseline.get('revision')}) 无性能回退")
+
+    if args.save_baseline:
+        save_baseline(record)
+        print(f"基线已保存到 {BASELINE_FILE}")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,6 +26,7 @@ default_config = {
     "monitoring": {
         "duration_minutes": 120,
         "refresh_interval_seconds": 15,
+        "market_data_mode": "rest",
         "price_alert_threshold": 1.0,
         "news_query": "MyShell OR SHELL coin crypto",
         "max_news_per_source": 3
@@ -2,20 +2,71 @@
 # -*- coding: utf-8 -*-
 
 import time
+import math
 from datetime import datetime, timedelta
 import pandas as pd
-import ta
-import requests
 import os
 import json
 import traceback
-import re
 import threading
+import queue
+import asyncio
+from urllib.parse import quote
+import aiohttp
 import feedparser  # 用于解析RSS源
-import html  # 用于处理HTML实体
 from PyQt5.QtCore import QObject, pyqtSignal, QThread
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
+from utils.kline_cache import KlineCache
+from utils.indicators import IndicatorEngine, compute_indicators
+from utils.market_stream import MarketDataStream, DEFAULT_WS_URL
+from utils.watchlist import WatchlistEngine
+from utils.kline_store import KlineStore
+from utils.price_journal import PriceJournal
+from utils.backtest import run_backtest, params_from_config
+from utils.market_sim import MarketSimulator, klines_to_frame
+from utils.replay import ReplayFeed, INTERVAL_MS
+from utils.clock import SystemClock
+from utils.scheduler import TaskScheduler
+from utils.market_snapshot import MarketSnapshot
+from utils.io_runtime import IoRuntime
+from utils.binance_runtime import RuntimeBinanceClient
+from utils.feed_cache import FeedCache
+from utils.analysis_cache import AnalysisCache, analysis_key, normalize_headline
+from utils.sentiment_ledger import SentimentLedger, sentiment_label
+from utils.deepseek_stream import SseDecoder, AnalysisParser
+from utils.lexicon_sentiment import LexiconSentiment
+from utils.keyword_matcher import KeywordMatcher, strip_html
+from utils.near_duplicate import NearDuplicateIndex, coverage_weight
+from utils.rate_governor import WeightGovernor, GovernedClient, RateBudgetExceeded
+from utils.refresh_policy import AdaptiveRefresh
+
+# 流式分析时摘要更新的最小间隔（秒），情感分数变化时立即更新
+STREAM_UPDATE_INTERVAL = 0.25
+
+# WebSocket模式下监控线程处理推送价格的最长延迟（秒）
+STREAM_POLL_SECONDS = 0.1
+
+# DeepSeek新闻分析提示词（修改模板后旧的缓存结果自动失效）
+DEEPSEEK_PROMPT_TEMPLATE = """请分析以下关于'{query}'的新闻标题和描述：
+{headlines}
+
+请完成以下任务：
+1. 将上述新闻内容翻译成简洁流畅的中文。
+2. 对翻译后的内容进行总结，提炼出最关键的信息点，生成一段不超过150字的中文摘要。
+3. 基于这些新闻，判断市场对'{query}'的整体情感倾向是积极(positive)、消极(negative)还是中性(neutral)。
+4. （可选）如果能明确判断，请给出一个从-1.0 (极度消极) 到 1.0 (极度积极) 的情感分数。
+5. 按编号为每条新闻分别给出一个从-1.0到1.0的情感分数。
+
+请严格按照以下格式返回结果，确保每个标签都存在，标签和内容之间用冒号分隔：
+情感: [positive/negative/neutral]
+情感分数: [数值，如果无法判断则为 0.0]
+逐条分数:
+1: [数值]
+2: [数值]
+中文摘要:
+[这里是总结后的中文新闻内容]
+"""
 
 class ShellTrackerCore(QObject):
     """
@@ -29,22 +80,46 @@ class ShellTrackerCore(QObject):
     monitoring_stopped = pyqtSignal()
     monitoring_error = pyqtSignal(str)  # 错误信息
     news_processed = pyqtSignal(str, str, float)  # 处理后的新闻, 情感类型, 情感分数
+    news_stream_updated = pyqtSignal(str, str, float)  # 流式分析中的部分新闻摘要, 情感类型, 情感分数
     chart_data_ready = pyqtSignal(object)  # K线数据
     signal_status_updated = pyqtSignal(str, str, int)  # 类型, 推荐操作, 置信度(%)
     alert_triggered = pyqtSignal(str, str, float)  # 类型, 消息, 数值
     account_balance_updated = pyqtSignal(float, float)  # 余额, 估算价值(USDT)
     rss_news_received = pyqtSignal(list)  # RSS新闻列表(包含时间、标题、内容、来源)
+    watchlist_price_updated = pyqtSignal(str, float, float)  # 交易对, 价格, 百分比变化
+    watchlist_stop_triggered = pyqtSignal(str, str, float, float)  # 交易对, 类型, 价格, 盈亏百分比
+    watchlist_trade_signal = pyqtSignal(str, str, float)  # 交易对, 信号类型 ('BUY'/'SELL'), 价格
+    rate_budget_updated = pyqtSignal(int, int, float)  # 本分钟已用请求权重, 每分钟上限, 轮询间隔倍数
     
-    def __init__(self, config=None):
-        """初始化追踪器"""
+    def __init__(self, config=None, clock=None):
+        """初始化追踪器
+        
+        Args:
+            config: 配置字典
+            clock: 时钟（utils.clock），所有计时和等待都经过它；None 表示系统时钟，
+                传入 VirtualClock 可在模拟和测试中快进时间
+        """
         super().__init__()
         
         # 配置信息
         self.config = config or {}
         
+        # 时钟
+        self.clock = clock or SystemClock()
+        
         # API客户端
         self.client = None
         
+        # 异步I/O运行时：新闻API、DeepSeek、RSS、Telegram请求以协程方式共用一个连接池，
+        # api.http 可调整连接数和重试
+        http_config = self.config.get('api', {}).get('http', {})
+        self.io = IoRuntime(
+            max_connections=http_config.get('max_connections', 100),
+            max_connections_per_host=http_config.get('max_connections_per_host', 4),
+            retries=http_config.get('retries', 3),
+            backoff_factor=http_config.get('backoff_factor', 0.5)
+        )
+        
         # 价格和持仓信息
         self.last_price = None
         self.previous_price = None
@@ -66,20 +141,84 @@ class ShellTrackerCore(QObject):
         self.current_sentiment = None
         self.sentiment_score = 0.0
         self.last_processed_news = None  # 保存最近处理的新闻
+        self.news_coverage = None  # 最近一次新闻的事件聚类情况（报道数、事件数、最大报道数）
         self.rss_feeds = []
         self.rss_keywords = []
+        self.keyword_matcher = KeywordMatcher({})  # RSS相关性匹配（交易对 -> 关键词）
         
         # 监控线程
         self.monitoring_thread = None
         
+        # WebSocket行情流（market_data_mode 为 websocket 时启用）
+        self.market_stream = None
+        self.stream_ticks = queue.Queue()  # 推送的价格，由监控线程处理（行情流线程不直接修改状态）
+        self.best_bid = None
+        self.best_ask = None
+        
+        # 行情回放源（回放录制的价格日志或本地K线时代替实时行情）
+        self.replay = None
+        
+        # 多交易对监控列表（monitoring.watchlist）
+        self.watchlist = WatchlistEngine()
+        
+        # 自适应轮询间隔（每次开始监控时按刷新间隔重新创建）
+        self.refresh_policy = None
+        
         # 日志和图表目录
         self.log_dir = "price_logs"
         self.log_filename = None
+        self.price_journal = None  # 价格tick日志（缓冲写入）
         self.charts_dir = "charts"  # 默认图表目录
+        self.kline_store_dir = "kline_store"  # 本地K线库目录
+        self.kline_store = None
+        
+        # 离线行情模拟器（API不可用时提供模拟价格和K线）
+        self.market_simulator = None
         
         # 缓存相关
-        self.news_cache = {}  # 用于缓存新闻查询结果
-        self.cache_expiry = 3600  # 缓存有效期（秒）
+        monitoring_config = self.config.get('monitoring', {})
+        # DeepSeek分析结果缓存（按内容哈希，跨重启保存，LRU淘汰）
+        self.analysis_cache = AnalysisCache(
+            monitoring_config.get('analysis_cache_file', 'analysis_cache.json'),
+            ttl=monitoring_config.get('analysis_cache_ttl_seconds', 3600),
+            max_entries=monitoring_config.get('analysis_cache_max_entries', 200),
+            max_bytes=monitoring_config.get('analysis_cache_max_bytes', 2 * 1024 * 1024),
+            clock=self.clock
+        )
+        # RSS条件请求和已处理条目缓存（monitoring.rss_cache_file，跨重启保存）
+        self.feed_cache = FeedCache(monitoring_config.get('rss_cache_file', 'rss_cache.json'))
+        # 逐条新闻情感记录：只分析新标题，整体情感按时间衰减加权（跨重启保存）
+        self.sentiment_ledger = SentimentLedger(
+            monitoring_config.get('sentiment_ledger_file', 'sentiment_ledger.json'),
+            half_life_hours=monitoring_config.get('sentiment_half_life_hours', 6.0),
+            prior_weight=monitoring_config.get('sentiment_prior_weight', 0.5),
+            max_age_hours=monitoring_config.get('sentiment_max_age_hours', 72.0),
+            clock=self.clock
+        )
+        self.refresh_sentiment()
+        # 本地词典情感评分：新标题先由词典打分，只有不确定的标题才交给DeepSeek
+        self.lexicon = LexiconSentiment(
+            lexicon=monitoring_config.get('sentiment_lexicon'),
+            ambiguity_threshold=monitoring_config.get('lexicon_ambiguity_threshold', 0.35)
+        )
+        # 近似重复新闻索引：不同来源对同一事件的报道归为一簇，只分析一次
+        self.news_index = NearDuplicateIndex(
+            threshold=monitoring_config.get('news_dedup_threshold', 0.5),
+            max_entries=monitoring_config.get('news_dedup_max_entries', 2000)
+        )
+        self.kline_cache = KlineCache(clock=self.clock)  # K线增量缓存
+        self.market_snapshot = MarketSnapshot(clock=self.clock)  # 价格/24小时统计/余额共享缓存
+        self.rate_governor = WeightGovernor(clock=self.clock)  # Binance请求权重预算
+        self.indicator_engines = {}  # (交易对, 周期) -> 流式指标引擎
+        self._indicator_lock = threading.Lock()
+        self._kline_seed_lock = threading.Lock()  # 检查缓存和从本地K线库预填在同一把锁内完成
+        
+        # 后台任务调度器：有界线程池，同一任务执行中再次触发时合并
+        self.scheduler = TaskScheduler(max_workers=4, clock=self.clock)
+        self.scheduler.register('klines', self.get_klines)
+        self.scheduler.register('balance', self.check_account_balance)
+        self.scheduler.register('news', self.fetch_and_process_news, interval=3600)
+        self.scheduler.register('watchlist_klines', self.update_watchlist_indicators, interval=60)
         
     def initialize(self, config):
         """初始化追踪器，连接API"""
@@ -109,236 +248,341 @@ class ShellTrackerCore(QObject):
             if 'rss_keywords' in config.get('monitoring', {}):
                 self.rss_keywords = config['monitoring']['rss_keywords']
             
+            # 多交易对监控列表
+            self.watchlist.set_symbols(config.get('monitoring', {}).get('watchlist', []))
+            
+            # 行情快照各字段的有效期（秒）
+            self.market_snapshot.ttls.update(config.get('monitoring', {}).get('snapshot_ttl_seconds', {}))
+            self.market_snapshot.invalidate()
+            
+            # Binance每分钟请求权重上限（api.binance.weight_limit_per_minute）
+            self.rate_governor.limit = config['api']['binance'].get('weight_limit_per_minute', 6000)
+            
+            # 预热出站HTTP连接（在后台完成TLS握手，首次请求不再等待握手）
+            if config['api'].get('http', {}).get('prewarm', False):
+                self.io.submit(self.io.prewarm(self._outbound_urls()))
+            
             # 检查API密钥是否配置
             if not api_key or not api_secret:
                 self.monitoring_error.emit("未配置Binance API密钥，请在设置中配置")
                 return False
                 
             try:
-                # 初始化Binance客户端
-                self.client = Client(api_key, api_secret)
+                # 初始化Binance客户端（请求在I/O事件循环中执行，所有调用经过请求权重预算）
+                self.close_client()
+                self.client = GovernedClient(RuntimeBinanceClient(self.io, api_key, api_secret), self.rate_governor)
                 
                 # 检查连接
                 self.client.get_server_time()
                 print("Binance API连接成功")
                 
+                # 打开本地K线库（由 warm_start_klines 加载历史）
+                self.kline_store = KlineStore(self.kline_store_dir)
+                
                 # 连接成功后检查账户余额
                 self.check_account_balance()
                 
                 return True
             except Exception as e:
                 self.monitoring_error.emit(f"Binance API初始化失败: {str(e)}")
-                self.client = None
+                self.close_client()
                 return False
         except Exception as e:
             self.monitoring_error.emit(f"初始化追踪器失败: {str(e)}")
             return False
     
+    def close_client(self):
+        """关闭当前Binance客户端的连接"""
+        client = self.client.client if isinstance(self.client, GovernedClient) else self.client
+        if isinstance(client, RuntimeBinanceClient):
+            client.close()
+        self.client = None
+
+    def _outbound_urls(self):
+        """当前配置会访问的HTTP地址（用于连接预热）"""
+        news_config = self.config['api'].get('news', {})
+        urls = []
+        if news_config.get('enabled'):
+            if news_config.get('gnews_api_key'):
+                urls.append("https://gnews.io/")
+            if news_config.get('newsapi_api_key'):
+                urls.append("https://newsapi.org/")
+            if news_config.get('deepseek_api_key'):
+                urls.append(news_config.get('deepseek_api_url', 'https://api.deepseek.com/v1/chat/completions'))
+            urls.extend(self.rss_feeds)
+        telegram_config = self.config['api'].get('telegram', {})
+        if telegram_config.get('enabled', True) and telegram_config.get('token'):
+            urls.append("https://api.telegram.org/")
+        return urls
+    
     def get_latest_price(self):
-        """从Binance获取最新价格"""
+        """从Binance获取最新价格（有效期内共用行情快照中的价格）"""
+        if self.replay is not None:
+            return self.replay.price()
+            
         if not self.client:
             self.monitoring_error.emit("Binance客户端未初始化")
             return self._get_simulated_price()  # 使用模拟价格
             
         try:
             symbol = self.config['trading']['symbol']
-            ticker = self.client.get_symbol_ticker(symbol=symbol)
-            return float(ticker['price'])
+            return self.market_snapshot.get(
+                'price',
+                lambda: float(self.client.get_symbol_ticker(symbol=symbol)['price']),
+                key=symbol
+            )
+        except RateBudgetExceeded as e:
+            if self.last_price is not None:
+                self.monitoring_error.emit(f"{str(e)}，沿用上一次价格")
+                return self.last_price
+            self.monitoring_error.emit(f"{str(e)}，使用模拟数据")
+            return self._get_simulated_price()
         except Exception as e:
             self.monitoring_error.emit(f"获取最新价格失败，使用模拟数据: {str(e)}")
             return self._get_simulated_price()  # 失败时使用模拟价格
     
+    def get_24h_stats(self):
+        """获取24小时行情统计（有效期内共用行情快照）
+        
+        Returns:
+            dict: {'price_change_percent', 'high', 'low', 'volume', 'quote_volume'}，不可用时返回None
+        """
+        if self.replay is not None or not self.client:
+            return None
+            
+        try:
+            symbol = self.config['trading']['symbol']
+            return self.market_snapshot.get('ticker_24h', lambda: self._fetch_24h_stats(symbol), key=symbol)
+        except Exception as e:
+            self.monitoring_error.emit(f"获取24小时行情失败: {str(e)}")
+            return None
+    
+    def _fetch_24h_stats(self, symbol):
+        """请求24小时行情，顺带刷新快照中的最新价格"""
+        ticker = self.client.get_ticker(symbol=symbol)
+        self.market_snapshot.put('price', float(ticker['lastPrice']), key=symbol)
+        return {
+            'price_change_percent': float(ticker['priceChangePercent']),
+            'high': float(ticker['highPrice']),
+            'low': float(ticker['lowPrice']),
+            'volume': float(ticker['volume']),
+            'quote_volume': float(ticker['quoteVolume']),
+        }
+    
+    def _get_market_simulator(self):
+        """返回当前交易对的行情模拟器（monitoring.simulation_seed 可固定随机种子）"""
+        symbol = self.config.get('trading', {}).get('symbol', 'SHELLUSDT')
+        if self.market_simulator is None or self.market_simulator.symbols != [symbol.upper()]:
+            seed = self.config.get('monitoring', {}).get('simulation_seed')
+            self.market_simulator = MarketSimulator([symbol], seed=seed)
+        return self.market_simulator
+    
     def _get_simulated_price(self):
         """返回模拟价格（当API不可用时使用）"""
-        # 如果之前获取过价格，返回略有变化的价格
-        if hasattr(self, '_last_simulated_price') and self._last_simulated_price is not None:
-            # 添加小幅随机波动(-0.5%到+0.5%)
-            import random
-            change = random.uniform(-0.005, 0.005)
-            new_price = self._last_simulated_price * (1 + change)
-            self._last_simulated_price = new_price
-            return new_price
-        else:
-            # 首次调用，使用默认价格
-            self._last_simulated_price = 1.2345  # SHELL币的模拟价格
-            return self._last_simulated_price
+        return self._get_market_simulator().next_price()
+    
+    def _kline_params(self):
+        """返回当前配置对应的 (交易对, Binance K线周期, 回看天数)"""
+        symbol = self.config['trading']['symbol']
+        interval = self.config['trading']['interval']
+        
+        # 转换间隔格式为Binance API接受的格式
+        interval_map = {
+            '1m': Client.KLINE_INTERVAL_1MINUTE,
+            '3m': Client.KLINE_INTERVAL_3MINUTE,
+            '5m': Client.KLINE_INTERVAL_5MINUTE,
+            '15m': Client.KLINE_INTERVAL_15MINUTE,
+            '30m': Client.KLINE_INTERVAL_30MINUTE,
+            '1h': Client.KLINE_INTERVAL_1HOUR,
+            '2h': Client.KLINE_INTERVAL_2HOUR,
+            '4h': Client.KLINE_INTERVAL_4HOUR,
+            '1d': Client.KLINE_INTERVAL_1DAY
+        }
+        binance_interval = interval_map.get(interval, Client.KLINE_INTERVAL_15MINUTE)
+        
+        # 根据时间间隔调整获取的数据量（回看天数）
+        lookback_days = {
+            Client.KLINE_INTERVAL_1MINUTE: 1,    # 1分钟K线获取1天数据
+            Client.KLINE_INTERVAL_3MINUTE: 2,    # 3分钟K线获取2天数据
+            Client.KLINE_INTERVAL_5MINUTE: 3,    # 5分钟K线获取3天数据
+            Client.KLINE_INTERVAL_15MINUTE: 5,   # 15分钟K线获取5天数据
+            Client.KLINE_INTERVAL_30MINUTE: 7,   # 30分钟K线获取7天数据
+            Client.KLINE_INTERVAL_1HOUR: 14,     # 1小时K线获取14天数据
+            Client.KLINE_INTERVAL_2HOUR: 14,     # 2小时K线获取14天数据
+            Client.KLINE_INTERVAL_4HOUR: 30,     # 4小时K线获取30天数据
+            Client.KLINE_INTERVAL_1DAY: 90       # 1天K线获取90天数据
+        }.get(binance_interval, 5)
+        
+        return symbol, binance_interval, lookback_days
+    
+    def _seed_cache_from_store(self, symbol, interval, lookback_days):
+        """缓存为空时从本地K线库加载回看窗口内的历史到缓存
+        
+        GUI、监控线程和后台任务可能同时调用，检查缓存和预填在同一把锁内完成，
+        已有缓存（包括其他线程刚拉取的数据）不会被本地历史覆盖。
+        
+        Returns:
+            int: 加载的K线条数（已有缓存、本地数据过旧或不存在时为0）
+        """
+        if self.kline_store is None:
+            return 0
+            
+        try:
+            with self._kline_seed_lock:
+                if self.kline_cache.has(symbol, interval):
+                    return 0
+                    
+                now_ms = int(self.clock.time() * 1000)
+                start_ms = now_ms - lookback_days * 86400 * 1000
+                last_open = self.kline_store.last_open_time(symbol, interval)
+                if last_open is None or last_open < start_ms:
+                    return 0
+                    
+                rows = self.kline_store.load_rows(symbol, interval, start_time=start_ms)
+                if not rows or not self.kline_cache.seed(symbol, interval, rows):
+                    return 0
+                print(f"从本地K线库加载 {len(rows)} 条 {symbol} {interval} K线")
+                return len(rows)
+        except Exception as e:
+            self.monitoring_error.emit(f"读取本地K线库失败: {str(e)}")
+            return 0
+    
+    def _persist_klines(self, symbol, interval, klines):
+        """将已收盘的新K线追加到本地K线库"""
+        if self.kline_store is None:
+            return
+            
+        try:
+            self.kline_store.append(symbol, interval, klines, now_ms=int(self.clock.time() * 1000))
+        except Exception as e:
+            self.monitoring_error.emit(f"写入本地K线库失败: {str(e)}")
+    
+    def warm_start_klines(self):
+        """启动时从本地K线库快速加载历史并立即显示，随后在后台补齐缺口"""
+        try:
+            symbol, binance_interval, lookback_days = self._kline_params()
+            if self._seed_cache_from_store(symbol, binance_interval, lookback_days):
+                df = self._build_kline_frame(symbol, binance_interval, self.kline_cache.peek(symbol, binance_interval))
+                if df is not None:
+                    self.chart_data_ready.emit(df)
+        except Exception as e:
+            self.monitoring_error.emit(f"加载本地K线历史失败: {str(e)}")
+        
+        # 在后台任务中拉取缺口数据
+        self.scheduler.trigger('klines')
     
     def get_klines(self):
         """获取K线数据并计算技术指标"""
+        if self.replay is not None:
+            return self._get_replay_klines()
+            
         if not self.client:
             self.monitoring_error.emit("Binance客户端未初始化，尝试使用模拟数据")
             return self._get_simulated_klines()
             
         try:
-            symbol = self.config['trading']['symbol']
-            interval = self.config['trading']['interval']
-            
-            # 转换间隔格式为Binance API接受的格式
-            interval_map = {
-                '1m': Client.KLINE_INTERVAL_1MINUTE,
-                '3m': Client.KLINE_INTERVAL_3MINUTE,
-                '5m': Client.KLINE_INTERVAL_5MINUTE,
-                '15m': Client.KLINE_INTERVAL_15MINUTE,
-                '30m': Client.KLINE_INTERVAL_30MINUTE,
-                '1h': Client.KLINE_INTERVAL_1HOUR,
-                '2h': Client.KLINE_INTERVAL_2HOUR,
-                '4h': Client.KLINE_INTERVAL_4HOUR,
-                '1d': Client.KLINE_INTERVAL_1DAY
-            }
-            binance_interval = interval_map.get(interval, Client.KLINE_INTERVAL_15MINUTE)
-            
-            print(f"正在获取 {symbol} 的 {interval} K线数据...")
-            
-            # 根据时间间隔调整获取的数据量
-            lookback_periods = {
-                Client.KLINE_INTERVAL_1MINUTE: "1 day ago UTC",   # 1分钟K线获取1天数据
-                Client.KLINE_INTERVAL_3MINUTE: "2 days ago UTC",  # 3分钟K线获取2天数据
-                Client.KLINE_INTERVAL_5MINUTE: "3 days ago UTC",  # 5分钟K线获取3天数据
-                Client.KLINE_INTERVAL_15MINUTE: "5 days ago UTC", # 15分钟K线获取5天数据
-                Client.KLINE_INTERVAL_30MINUTE: "7 days ago UTC", # 30分钟K线获取7天数据
-                Client.KLINE_INTERVAL_1HOUR: "14 days ago UTC",   # 1小时K线获取14天数据
-                Client.KLINE_INTERVAL_2HOUR: "14 days ago UTC",   # 2小时K线获取14天数据
-                Client.KLINE_INTERVAL_4HOUR: "30 days ago UTC",   # 4小时K线获取30天数据
-                Client.KLINE_INTERVAL_1DAY: "90 days ago UTC"     # 1天K线获取90天数据
-            }
-            lookback = lookback_periods.get(binance_interval, "5 days ago UTC")
+            symbol, binance_interval, lookback_days = self._kline_params()
             
-            # 获取K线数据，适应不同的时间间隔需要不同的数据量
-            klines = self.client.get_historical_klines(
-                symbol, binance_interval, lookback, limit=100
-            )
+            print(f"正在获取 {symbol} 的 {self.config['trading']['interval']} K线数据...")
+            
+            # 缓存为空时先从本地K线库加载历史，之后只需补齐缺口
+            self._seed_cache_from_store(symbol, binance_interval, lookback_days)
+            
+            # 通过缓存获取K线数据，首次完整拉取，之后只增量拉取最新K线
+            klines = self.kline_cache.get(self.client, symbol, binance_interval, lookback_days)
+            
+            # 已收盘的新K线写入本地K线库
+            self._persist_klines(symbol, binance_interval, klines)
             
             if len(klines) < 2:
                 self.monitoring_error.emit(f"获取到的K线数据不足: {len(klines)} 条")
                 return self._get_simulated_klines()
                 
-            # 转换为DataFrame
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'num_trades',
-                'taker_buy_base', 'taker_buy_quote', 'ignore'
-            ])
-            
-            # 数据处理
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            num_cols = ['open', 'high', 'low', 'close', 'volume', 'quote_asset_volume']
-            for col in num_cols:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            df.dropna(subset=['close'], inplace=True)
-            
-            if df.empty or len(df) < 2:
-                self.monitoring_error.emit("处理后的K线数据为空")
+            df = self._build_kline_frame(symbol, binance_interval, klines)
+            if df is None:
                 return self._get_simulated_klines()
-                
-            print(f"获取到 {len(df)} 条K线数据，开始计算技术指标...")
-            
-            # 计算技术指标
-            data_len = len(df)
-            
-            # 移动平均线
-            df['ma5'] = ta.trend.sma_indicator(df['close'], window=5) if data_len >= 5 else pd.NA
-            df['ma25'] = ta.trend.sma_indicator(df['close'], window=25) if data_len >= 25 else pd.NA
-            
-            # RSI
-            df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=14).rsi() if data_len >= 14 else pd.NA
-            
-            # MACD
-            if data_len >= 26:
-                try:
-                    macd = ta.trend.MACD(df['close'], 
-                                      window_fast=12, 
-                                      window_slow=26, 
-                                      window_sign=9)
-                    df['macd'] = macd.macd()
-                    df['macd_signal'] = macd.macd_signal()
-                    df['macd_diff'] = macd.macd_diff()
-                    print(f"MACD计算完成: {len(df[df['macd'].notna()])} 行有效数据")
-                except Exception as e:
-                    self.monitoring_error.emit(f"计算MACD指标时出错: {str(e)}")
-                    df['macd'] = pd.NA
-                    df['macd_signal'] = pd.NA
-                    df['macd_diff'] = pd.NA
-            else:
-                self.monitoring_error.emit(f"数据不足以计算MACD: 需要至少26条数据，只有{data_len}条")
-                df['macd'] = pd.NA
-                df['macd_signal'] = pd.NA
-                df['macd_diff'] = pd.NA
-                
-            # 波动率
-            if data_len >= 21:
-                df['volatility'] = df['close'].pct_change().rolling(window=20).std() * 100
-            else:
-                df['volatility'] = pd.NA
-                
-            df.set_index('timestamp', inplace=True)
-            
-            # 检查并打印指标的完整度
-            indicators = ['ma5', 'ma25', 'rsi', 'macd', 'macd_signal', 'macd_diff', 'volatility']
-            for ind in indicators:
-                valid_count = df[ind].notna().sum()
-                print(f"指标 {ind}: {valid_count}/{len(df)} 行有效 ({valid_count/len(df)*100:.1f}%)")
             
             # 发送K线数据信号
             self.chart_data_ready.emit(df)
             
             return df
             
+        except RateBudgetExceeded as e:
+            # 预算不足时本轮不检查信号，不用模拟K线代替
+            self.monitoring_error.emit(f"{str(e)}，本轮不更新K线")
+            return None
         except Exception as e:
             error_message = f"获取K线或计算指标失败: {str(e)}"
             self.monitoring_error.emit(error_message)
             traceback.print_exc()  # 打印详细错误堆栈
             return self._get_simulated_klines()
+    
+    def _build_kline_frame(self, symbol, binance_interval, klines):
+        """将Binance格式的K线列表转换为DataFrame并计算技术指标
+        
+        Returns:
+            DataFrame: 以时间为索引的K线和指标数据，数据无效时返回None
+        """
+        # 转换为DataFrame
+        df = pd.DataFrame(klines, columns=[
+            'timestamp', 'open', 'high', 'low', 'close', 'volume',
+            'close_time', 'quote_asset_volume', 'num_trades',
+            'taker_buy_base', 'taker_buy_quote', 'ignore'
+        ])
+        
+        # 数据处理
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        num_cols = ['open', 'high', 'low', 'close', 'volume', 'quote_asset_volume']
+        for col in num_cols:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        
+        df.dropna(subset=['close'], inplace=True)
+        
+        if df.empty or len(df) < 2:
+            self.monitoring_error.emit("处理后的K线数据为空")
+            return None
+            
+        print(f"获取到 {len(df)} 条K线数据，开始计算技术指标...")
+        
+        # 计算技术指标（流式引擎，只处理新增或修订的K线）
+        data_len = len(df)
+        open_times = ((df['timestamp'] - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).tolist()
+        
+        with self._indicator_lock:
+            engine = self.indicator_engines.setdefault((symbol, binance_interval), IndicatorEngine())
+            indicator_values = engine.sync(open_times, df['close'].tolist())
+        
+        for col, values in indicator_values.items():
+            df[col] = values
+        
+        if data_len < 26:
+            self.monitoring_error.emit(f"数据不足以计算MACD: 需要至少26条数据，只有{data_len}条")
+            
+        df.set_index('timestamp', inplace=True)
+        
+        # 检查并打印指标的完整度
+        indicators = ['ma5', 'ma25', 'rsi', 'macd', 'macd_signal', 'macd_diff', 'volatility']
+        for ind in indicators:
+            valid_count = df[ind].notna().sum()
+            print(f"指标 {ind}: {valid_count}/{len(df)} 行有效 ({valid_count/len(df)*100:.1f}%)")
+        
+        return df
             
     def _get_simulated_klines(self):
         """生成模拟K线数据（当API不可用时使用）"""
         print("生成模拟K线数据...")
         
-        # 创建时间序列，从昨天到现在，10分钟间隔
-        end_time = datetime.now()
-        start_time = end_time - timedelta(days=1)
-        date_range = pd.date_range(start=start_time, end=end_time, freq='10min')
-        
-        # 创建基本价格，在1.0-2.0之间
-        import random
-        import numpy as np
-        
-        base_price = 1.5
-        close_prices = []
-        current_price = base_price
-        
-        # 生成随机走势
-        for _ in range(len(date_range)):
-            change = random.uniform(-0.02, 0.02)  # -2% 到 +2% 的变化
-            current_price = current_price * (1 + change)
-            # 确保价格不会太离谱
-            current_price = max(0.8, min(3.0, current_price))
-            close_prices.append(current_price)
-        
-        # 创建DataFrame
-        df = pd.DataFrame(index=date_range)
-        df['close'] = close_prices
-        df['open'] = df['close'].shift(1).fillna(df['close'] * 0.99)
-        df['high'] = df[['open', 'close']].max(axis=1) * (1 + np.random.uniform(0, 0.01, len(df)))
-        df['low'] = df[['open', 'close']].min(axis=1) * (1 - np.random.uniform(0, 0.01, len(df)))
-        df['volume'] = np.random.uniform(1000, 10000, len(df))
+        # 最近一天的10分钟K线，收盘于当前模拟价格
+        simulator = self._get_market_simulator()
+        columns = simulator.klines(145, interval_ms=10 * 60 * 1000, end_ms=int(self.clock.time() * 1000), history=True)
+        df = klines_to_frame(columns[simulator.symbols[0]])
         
         # 计算技术指标
-        df['ma5'] = ta.trend.sma_indicator(df['close'], window=5)
-        df['ma25'] = ta.trend.sma_indicator(df['close'], window=25)
-        df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
-        
-        # MACD
-        macd = ta.trend.MACD(df['close'], window_fast=12, window_slow=26, window_sign=9)
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = macd.macd_diff()
-        
-        # 波动率
-        df['volatility'] = df['close'].pct_change().rolling(window=20).std() * 100
+        for col, values in compute_indicators(df['close'].values).items():
+            df[col] = values
         
         # 清理NaN值
-        df.fillna(method='bfill', inplace=True)
+        df.bfill(inplace=True)
         
         print(f"已生成 {len(df)} 条模拟K线数据")
         
@@ -351,6 +595,9 @@ class ShellTrackerCore(QObject):
         """根据技术指标判断买入/卖出信号"""
         if df.empty or len(df) < 26:
             return None
+        
+        # 整体情感随时间衰减，使用前按当前时间重新计算
+        self.refresh_sentiment()
             
         try:
             latest = df.iloc[-1]
@@ -470,7 +717,7 @@ class ShellTrackerCore(QObject):
             self.position = 'LONG'
             
             # 输出详细日志信息
-            print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] BUY 信号触发 @ {price:.4f} {sentiment_info}")
+            print(f"[{self._now():%Y-%m-%d %H:%M:%S}] BUY 信号触发 @ {price:.4f} {sentiment_info}")
             
             # 发出交易信号
             self.trade_signal.emit('BUY', price)
@@ -486,7 +733,7 @@ class ShellTrackerCore(QObject):
             profit_info = f"(盈利: {profit:.2f}%)" if self.entry_price else "(无法计算盈亏)"
             
             # 输出详细日志信息
-            print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] SELL 信号触发 @ {price:.4f} {profit_info} {sentiment_info}")
+            print(f"[{self._now():%Y-%m-%d %H:%M:%S}] SELL 信号触发 @ {price:.4f} {profit_info} {sentiment_info}")
             
             # 清空持仓状态
             self.position = None
@@ -514,7 +761,7 @@ class ShellTrackerCore(QObject):
             
             if current_price <= stop_loss_price:
                 # 输出详细日志信息
-                print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] 止损触发 @ {current_price:.4f} (亏损: {profit_percent:.2f}%)")
+                print(f"[{self._now():%Y-%m-%d %H:%M:%S}] 止损触发 @ {current_price:.4f} (亏损: {profit_percent:.2f}%)")
                 
                 # 清空持仓状态
                 self.position = None
@@ -532,7 +779,7 @@ class ShellTrackerCore(QObject):
                 
             elif current_price >= take_profit_price:
                 # 输出详细日志信息
-                print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] 止盈触发 @ {current_price:.4f} (盈利: {profit_percent:.2f}%)")
+                print(f"[{self._now():%Y-%m-%d %H:%M:%S}] 止盈触发 @ {current_price:.4f} (盈利: {profit_percent:.2f}%)")
                 
                 # 清空持仓状态
                 self.position = None
@@ -550,6 +797,39 @@ class ShellTrackerCore(QObject):
                 
         return False
     
+    def run_backtest(self, start_time=None, end_time=None, df=None, **kwargs):
+        """用当前交易参数回测信号和止盈止损规则
+        
+        Args:
+            start_time: 起始开盘时间（毫秒），从本地K线库读取历史时使用
+            end_time: 结束开盘时间（毫秒，不含）
+            df: 直接指定K线DataFrame（如 get_klines 的结果），为None时读取本地K线库
+            **kwargs: 传递给 utils.backtest.run_backtest 的其他参数
+            
+        Returns:
+            dict: 回测结果（trades、equity、stats、signals），无数据时返回None
+        """
+        try:
+            if df is None:
+                if self.kline_store is None:
+                    self.monitoring_error.emit("本地K线库未初始化，无法回测")
+                    return None
+                symbol, binance_interval, _ = self._kline_params()
+                data = self.kline_store.load(symbol, binance_interval, start_time, end_time)
+                if len(data['close']) == 0:
+                    self.monitoring_error.emit(f"本地K线库中没有 {symbol} {binance_interval} 的数据")
+                    return None
+            else:
+                data = df
+            
+            # 回测期间使用当前情感分数（与实时判断一致）
+            kwargs.setdefault('sentiment', self.sentiment_score if self.current_sentiment is not None else None)
+            return run_backtest(data, params_from_config(self.config), **kwargs)
+        except Exception as e:
+            self.monitoring_error.emit(f"回测失败: {str(e)}")
+            traceback.print_exc()
+            return None
+    
     def fetch_and_process_news(self):
         """获取并处理新闻"""
         if not self.config['api']['news']['enabled']:
@@ -557,19 +837,32 @@ class ShellTrackerCore(QObject):
             
         all_headlines = []
         processed_sources_count = 0
+        query = self.config['monitoring']['news_query']
+        max_news = self.config['monitoring']['max_news_per_source']
         
-        # 获取GNews新闻
+        # 各新闻API的请求在I/O运行时中并发发送，与下面的RSS请求同时进行
+        gnews_future = None
         if self.config['api']['news'].get('gnews_api_key'):
+            api_key = self.config['api']['news']['gnews_api_key']
+            # 使用简化查询（只包含关键词）
+            simple_query = "SHELL coin"
+            url = f"https://gnews.io/api/v4/search?q={quote(simple_query)}&lang=en&max={max_news}&token={api_key}"
+            gnews_future = self.io.submit(self.io.get(url, timeout=20), tag='news')
+        
+        newsapi_future = None
+        if self.config['api']['news'].get('newsapi_api_key'):
+            api_key = self.config['api']['news']['newsapi_api_key']
+            url = f"https://newsapi.org/v2/everything?q={quote(query)}&language=en&pageSize={max_news}&apiKey={api_key}"
+            newsapi_future = self.io.submit(self.io.get(url, timeout=20), tag='news')
+        
+        # 获取RSS新闻
+        max_articles_per_rss = self.config['monitoring'].get('max_articles_per_rss', 2)
+        rss_articles = self.fetch_rss_news(max_articles_per_rss)
+        
+        # 获取GNews新闻
+        if gnews_future is not None:
             try:
-                query = self.config['monitoring']['news_query']
-                max_news = self.config['monitoring']['max_news_per_source']
-                api_key = self.config['api']['news']['gnews_api_key']
-                
-                # 使用简化查询（只包含关键词）
-                simple_query = "SHELL coin"
-                
-                url = f"https://gnews.io/api/v4/search?q={requests.utils.quote(simple_query)}&lang=en&max={max_news}&token={api_key}"
-                response = requests.get(url, timeout=20)
+                response = gnews_future.result()
                 response.raise_for_status()
                 data = response.json()
                 
@@ -582,14 +875,9 @@ class ShellTrackerCore(QObject):
                 self.monitoring_error.emit(f"GNews API错误: {str(e)}")
         
         # 获取NewsAPI新闻
-        if self.config['api']['news'].get('newsapi_api_key'):
+        if newsapi_future is not None:
             try:
-                query = self.config['monitoring']['news_query']
-                max_news = self.config['monitoring']['max_news_per_source']
-                api_key = self.config['api']['news']['newsapi_api_key']
-                
-                url = f"https://newsapi.org/v2/everything?q={requests.utils.quote(query)}&language=en&pageSize={max_news}&apiKey={api_key}"
-                response = requests.get(url, timeout=20)
+                response = newsapi_future.result()
                 response.raise_for_status()
                 data = response.json()
                 
@@ -601,74 +889,183 @@ class ShellTrackerCore(QObject):
             except Exception as e:
                 self.monitoring_error.emit(f"NewsAPI错误: {str(e)}")
         
-        # 获取RSS新闻
-        max_articles_per_rss = self.config['monitoring'].get('max_articles_per_rss', 2)
-        rss_articles = self.fetch_rss_news(max_articles_per_rss)
-        
         if rss_articles:
             rss_headlines = [f"{a['title']}. {a['summary']} (来源: {a['source']})" for a in rss_articles]
             all_headlines.extend(rss_headlines)
             processed_sources_count += 1
         
         if not all_headlines:
-            self.last_processed_news = "未能获取到相关新闻。"
-            return "未能获取到相关新闻。", "neutral", 0.0
+            # RSS没有新条目且其他来源为空时，情感分数按评分记录的时间衰减更新，摘要沿用上一次的结果
+            if self.refresh_sentiment() is None and self.current_sentiment is None:
+                processed_news, sentiment, score = "未能获取到相关新闻。", "neutral", 0.0
+            else:
+                print("没有新的新闻，按时间衰减更新情感分数")
+                processed_news = self.last_processed_news or "没有新的新闻。"
+                sentiment, score = self.current_sentiment, self.sentiment_score
+            self.news_processed.emit(processed_news, sentiment, score)
+            return processed_news, sentiment, score
             
         # 去重
         unique_headlines = list(dict.fromkeys(all_headlines))
         
-        # 调用DeepSeek API进行分析
-        processed_news, sentiment, score = self.call_deepseek_for_analysis(unique_headlines)
+        # 近似重复聚类：同一事件的多篇报道只分析簇中的代表标题，报道数作为该事件的情感权重（信号强度）
+        clusters = {}
+        for headline in unique_headlines:
+            cluster_id, _ = self.news_index.add(headline)
+            clusters.setdefault(cluster_id, []).append(headline)
+        coverage = {}
+        for cluster_id, members in clusters.items():
+            representative = self.news_index.representative(cluster_id) or members[0]
+            coverage[representative] = coverage_weight(self.news_index.size(cluster_id))
+            self.sentiment_ledger.set_weight(representative, coverage[representative])
+        self.news_coverage = {
+            'articles': len(unique_headlines),
+            'events': len(clusters),
+            'max_coverage': max(self.news_index.size(c) for c in clusters),
+        }
+        print(f"近似重复聚类: {len(unique_headlines)} 条新闻 -> {len(clusters)} 个事件")
+        
+        # 只把没有评分记录的标题分批交给DeepSeek，已评分的标题沿用记录中的分数
+        new_headlines = self.sentiment_ledger.unseen(list(coverage))
+        batch_size = max(1, self.config['monitoring'].get('sentiment_batch_size', 20))
+        summaries = []
+        sentiment, score = "neutral", 0.0
+        
+        # 本地词典先为新标题评分：结果明确的直接记录；不确定的交给DeepSeek，
+        # 在DeepSeek返回之前先以词典分数计入整体情感。DeepSeek未配置时全部使用词典分数
+        llm_headlines = new_headlines
+        lexicon_scores = {}
+        lexicon_headlines = []
+        if new_headlines and self.config['monitoring'].get('lexicon_prefilter', True):
+            result = self.lexicon.score(new_headlines)
+            lexicon_scores = dict(zip(new_headlines, result['scores'].tolist()))
+            if self.config['api']['news'].get('deepseek_api_key'):
+                lexicon_headlines = [h for h, a in zip(new_headlines, result['ambiguous']) if not a]
+                llm_headlines = [h for h, a in zip(new_headlines, result['ambiguous']) if a]
+            else:
+                lexicon_headlines, llm_headlines = new_headlines, []
+            if lexicon_headlines:
+                self.sentiment_ledger.add(lexicon_headlines, [lexicon_scores[h] for h in lexicon_headlines],
+                                          weights=[coverage[h] for h in lexicon_headlines])
+                summaries.append(self._lexicon_summary(lexicon_headlines, [lexicon_scores[h] for h in lexicon_headlines]))
+            self.sentiment_ledger.set_pending([lexicon_scores[h] for h in llm_headlines])
+            self.refresh_sentiment()
+        last_update = {'time': 0.0, 'scores': None, 'rest': [], 'active': False}
+        progress_lock = threading.Lock()
+        
+        def on_progress(partial_summary, headline_scores):
+            # 流式分析：分数一出现就计入整体情感（check_signals 立即使用），摘要逐步刷新。
+            # 在I/O事件循环线程中调用，会修改评分记录的临时分数和 sentiment_score/current_sentiment；
+            # 本批结束后（包括 io.cancel('news') 取消后仍在途的回调）不再生效，避免覆盖清理结果
+            with progress_lock:
+                if not last_update['active']:
+                    return
+                if headline_scores != last_update['scores']:
+                    if headline_scores is not None:
+                        self.sentiment_ledger.set_pending(headline_scores + last_update['rest'])
+                    self.refresh_sentiment()
+                elif time.monotonic() - last_update['time'] < STREAM_UPDATE_INTERVAL:
+                    return
+                last_update.update(time=time.monotonic(), scores=headline_scores)
+                self.news_stream_updated.emit("\n\n".join(summaries + [partial_summary]),
+                                              self.current_sentiment or "neutral", self.sentiment_score)
+        
+        try:
+            for start in range(0, len(llm_headlines), batch_size):
+                batch = llm_headlines[start:start + batch_size]
+                with progress_lock:
+                    last_update.update(rest=[lexicon_scores[h] for h in llm_headlines[start + batch_size:] if h in lexicon_scores],
+                                       scores=None, active=True)
+                summary, sentiment, score, headline_scores = self.call_deepseek_for_analysis(batch, on_progress)
+                with progress_lock:
+                    last_update['active'] = False
+                    self.sentiment_ledger.set_pending(last_update['rest'])
+                summaries.append(summary)
+                if headline_scores is None and lexicon_scores:
+                    # DeepSeek调用失败时使用词典分数
+                    headline_scores = [lexicon_scores[h] for h in batch]
+                if headline_scores is not None:
+                    self.sentiment_ledger.add(batch, headline_scores, weights=[coverage[h] for h in batch])
+        finally:
+            with progress_lock:
+                last_update['active'] = False
+                self.sentiment_ledger.set_pending(None)
         
-        # 保存新闻和情感结果，以便报告使用
-        self.current_sentiment = sentiment
-        self.sentiment_score = score
+        if summaries:
+            processed_news = "\n\n".join(summaries)
+        else:
+            print("没有新的新闻，按时间衰减更新情感分数")
+            processed_news = self.last_processed_news or "没有新的新闻。"
+        
+        # 整体情感为逐条分数的时间衰减加权平均；没有逐条分数（DeepSeek未配置或调用失败）时使用本次分析结果
+        if self.refresh_sentiment() is None:
+            self.current_sentiment = sentiment
+            self.sentiment_score = score
         self.last_processed_news = processed_news
         
-        # 发送信号
-        self.news_processed.emit(processed_news, sentiment, score)
+        try:
+            self.sentiment_ledger.save()
+        except Exception as e:
+            self.monitoring_error.emit(f"保存情感记录失败: {str(e)}")
+        
+        # 每个周期都发送信号：没有需要分析的新标题时只更新时间衰减后的情感分数
+        self.news_processed.emit(processed_news, self.current_sentiment, self.sentiment_score)
         
-        return processed_news, sentiment, score
+        return processed_news, self.current_sentiment, self.sentiment_score
     
-    def call_deepseek_for_analysis(self, headlines):
-        """调用DeepSeek API分析新闻"""
-        # 生成缓存键
-        cache_key = hash(tuple(sorted(headlines)))
-        
-        # 检查缓存
-        current_time = time.time()
-        if cache_key in self.news_cache:
-            cache_time, cache_data = self.news_cache[cache_key]
-            if current_time - cache_time < self.cache_expiry:
-                return cache_data
+    @staticmethod
+    def _lexicon_summary(headlines, scores, limit=5):
+        """词典评分结果的简短说明（列出分数绝对值最大的几条标题）"""
+        ranked = sorted(zip(headlines, scores), key=lambda item: abs(item[1]), reverse=True)
+        lines = [f"本地词典评分 {len(headlines)} 条新闻，平均情感分数 {sum(scores) / len(scores):+.2f}："]
+        lines.extend(f"- [{score:+.2f}] {headline}" for headline, score in ranked[:limit])
+        return "\n".join(lines)
+    
+    def refresh_sentiment(self):
+        """按时间衰减重新计算整体情感（没有逐条评分记录时不改变，返回 None）"""
+        score = self.sentiment_ledger.aggregate()
+        if score is not None:
+            self.sentiment_score = score
+            self.current_sentiment = sentiment_label(score)
+        return score
+    
+    def call_deepseek_for_analysis(self, headlines, on_progress=None):
+        """调用DeepSeek API分析新闻（相同内容的分析结果从缓存读取）
+        
+        api.news.deepseek_stream 开启时（默认）以流式方式接收结果，情感分数和摘要边接收边解析。
+        
+        Args:
+            headlines: 新闻标题列表
+            on_progress: 可选 on_progress(部分摘要, 逐条分数列表或None)，流式接收中结果有更新时调用
+        
+        Returns:
+            tuple: (中文摘要, 情感类型, 情感分数, 逐条分数列表)，逐条分数与 headlines 顺序一致，
+                   未能分析时为 None
+        """
+        query = self.config['monitoring']['news_query']
+        model = self.config['api']['news'].get('deepseek_model', 'deepseek-chat')
+        temperature = 0.3
+        
+        # 缓存键：归一化标题 + 提示词模板 + 模型参数的稳定哈希
+        cache_key = analysis_key(headlines, DEEPSEEK_PROMPT_TEMPLATE, model, query=query, temperature=temperature)
+        cached = self.analysis_cache.get(cache_key)
+        if cached is not None:
+            print("使用缓存的DeepSeek分析结果")
+            summary, sentiment, score, item_scores = cached
+            return summary, sentiment, score, [item_scores.get(normalize_headline(h), score) for h in headlines]
         
         processed_chinese_news = "未能提取到中文摘要。"
         sentiment = "neutral"
         sentiment_score_value = 0.0
         
         if not self.config['api']['news'].get('deepseek_api_key'):
-            return "DeepSeek API未配置。", sentiment, sentiment_score_value
+            return "DeepSeek API未配置。", sentiment, sentiment_score_value, None
             
         if not headlines:
-            return "无新闻内容可供分析。", sentiment, sentiment_score_value
+            return "无新闻内容可供分析。", sentiment, sentiment_score_value, []
             
-        combined_headlines = "\n".join([f"- {h}" for h in headlines])
-        
-        prompt = f"""请分析以下关于'{self.config['monitoring']['news_query']}'的新闻标题和描述：
-{combined_headlines}
-
-请完成以下任务：
-1. 将上述新闻内容翻译成简洁流畅的中文。
-2. 对翻译后的内容进行总结，提炼出最关键的信息点，生成一段不超过150字的中文摘要。
-3. 基于这些新闻，判断市场对'{self.config['monitoring']['news_query']}'的整体情感倾向是积极(positive)、消极(negative)还是中性(neutral)。
-4. （可选）如果能明确判断，请给出一个从-1.0 (极度消极) 到 1.0 (极度积极) 的情感分数。
-
-请严格按照以下格式返回结果，确保每个标签都存在，标签和内容之间用冒号分隔：
-情感: [positive/negative/neutral]
-情感分数: [数值，如果无法判断则为 0.0]
-中文摘要:
-[这里是总结后的中文新闻内容]
-"""
+        combined_headlines = "\n".join([f"{i}. {h}" for i, h in enumerate(headlines, 1)])
+        prompt = DEEPSEEK_PROMPT_TEMPLATE.format(query=query, headlines=combined_headlines)
         
         headers = {
             "Content-Type": "application/json",
@@ -676,49 +1073,34 @@ class ShellTrackerCore(QObject):
         }
         
         payload = {
-            "model": "deepseek-chat",
+            "model": model,
             "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3,
-            "max_tokens": 500
+            "temperature": temperature,
+            "max_tokens": 800
         }
         
         try:
             api_url = self.config['api']['news'].get('deepseek_api_url', 'https://api.deepseek.com/v1/chat/completions')
-            response = requests.post(api_url, headers=headers, json=payload, timeout=45)
-            response.raise_for_status()
-            response_data = response.json()
-            
-            if 'choices' not in response_data or not response_data['choices']:
-                raise ValueError("DeepSeek API 返回的响应格式不正确: 'choices' 缺失")
-                
-            response_text = response_data['choices'][0]['message']['content']
-            
-            # 解析响应
-            parsed_sentiment = None
-            parsed_score = 0.0
-            summary_content = None
-            
-            sentiment_match = re.search(r"^\s*情感\s*:\s*(positive|negative|neutral)\s*$", response_text, re.IGNORECASE | re.MULTILINE)
-            score_match = re.search(r"^\s*情感分数\s*:\s*(-?\d+(\.\d+)?)\s*$", response_text, re.IGNORECASE | re.MULTILINE)
-            summary_match = re.search(r"^\s*中文摘要\s*:(.*)", response_text, re.IGNORECASE | re.MULTILINE | re.DOTALL)
+            parser = AnalysisParser()
+            if self.config['api']['news'].get('deepseek_stream', True):
+                payload["stream"] = True
+                self._stream_deepseek(api_url, headers, payload, parser, headlines, on_progress)
+            else:
+                response = self.io.fetch('POST', api_url, headers=headers, json=payload, timeout=45, tag='news')
+                response.raise_for_status()
+                parser.feed(self._deepseek_message(response.json()))
+            parser.finish()
             
-            if sentiment_match:
-                parsed_sentiment = sentiment_match.group(1).lower()
+            # 解析结果
+            parsed_sentiment = parser.sentiment
+            parsed_score = parser.score if parser.score is not None else 0.0
             
-            if score_match:
-                try:
-                    parsed_score = float(score_match.group(1))
-                    parsed_score = max(-1.0, min(1.0, parsed_score))
-                except ValueError:
-                    pass
-            
-            if summary_match:
-                summary_content = summary_match.group(1).strip()
-                summary_content = re.sub(r"\n\s*(分析理由|情感|情感分数)\s*:.*", "", summary_content, flags=re.IGNORECASE | re.DOTALL)
-                if not summary_content:
-                    summary_content = "未能提取到有效的中文摘要内容。"
-            else:
+            if parser.summary is None:
                 summary_content = "未能找到中文摘要部分。"
+            elif not parser.summary:
+                summary_content = "未能提取到有效的中文摘要内容。"
+            else:
+                summary_content = parser.summary
             
             sentiment = parsed_sentiment if parsed_sentiment else "neutral"
             sentiment_score_value = parsed_score
@@ -730,21 +1112,61 @@ class ShellTrackerCore(QObject):
                 elif sentiment_score_value <= -0.3:
                     sentiment = "negative"
             
-            # 缓存结果
-            result = (processed_chinese_news, sentiment, sentiment_score_value)
-            self.news_cache[cache_key] = (current_time, result)
+            # 逐条分数（按编号对应标题），缺失的条目使用整体分数
+            item_scores = {normalize_headline(headlines[index - 1]): value
+                           for index, value in parser.item_scores.items() if 1 <= index <= len(headlines)}
+            headline_scores = [item_scores.get(normalize_headline(h), sentiment_score_value) for h in headlines]
             
-            return result
+            # 缓存结果（逐条分数按归一化标题保存，与标题顺序无关）
+            try:
+                self.analysis_cache.put(cache_key, [processed_chinese_news, sentiment, sentiment_score_value, item_scores])
+            except Exception as e:
+                self.monitoring_error.emit(f"保存分析缓存失败: {str(e)}")
             
-        except requests.exceptions.RequestException as e:
+            return processed_chinese_news, sentiment, sentiment_score_value, headline_scores
+            
+        except aiohttp.ClientError as e:
             self.monitoring_error.emit(f"调用 DeepSeek API 时发生网络错误: {str(e)}")
-            return f"调用 DeepSeek 失败 (网络错误): {str(e)}", sentiment, sentiment_score_value
+            return f"调用 DeepSeek 失败 (网络错误): {str(e)}", sentiment, sentiment_score_value, None
         except ValueError as e:
             self.monitoring_error.emit(f"解析 DeepSeek 响应时出错: {str(e)}")
-            return f"解析 DeepSeek 响应失败: {str(e)}", sentiment, sentiment_score_value
+            return f"解析 DeepSeek 响应失败: {str(e)}", sentiment, sentiment_score_value, None
         except Exception as e:
             self.monitoring_error.emit(f"调用 DeepSeek API 或处理响应时发生未知错误: {str(e)}")
-            return f"处理 DeepSeek 响应失败: {str(e)}", sentiment, sentiment_score_value
+            return f"处理 DeepSeek 响应失败: {str(e)}", sentiment, sentiment_score_value, None
+    
+    @staticmethod
+    def _deepseek_message(response_data):
+        """取出DeepSeek非流式响应中的回复文本"""
+        if 'choices' not in response_data or not response_data['choices']:
+            raise ValueError("DeepSeek API 返回的响应格式不正确: 'choices' 缺失")
+        return response_data['choices'][0]['message']['content']
+    
+    def _stream_deepseek(self, api_url, headers, payload, parser, headlines, on_progress=None):
+        """以SSE流式接收DeepSeek的回复，每收到一段文本就交给 parser 增量解析
+        
+        解析结果有更新时调用 on_progress(部分摘要, 逐条分数)。on_progress 在I/O事件循环线程中执行，
+        可能在本方法因超时或 io.cancel('news') 返回之后仍被调用一次，修改共享状态时需自行加锁并检查是否已结束。
+        服务器忽略 stream 参数直接返回完整JSON时按普通响应处理。
+        """
+        decoder = SseDecoder()
+        
+        def on_data(data):
+            if data is None or data == '[DONE]':
+                return
+            chunk = json.loads(data)
+            choices = chunk.get('choices') or []
+            content = (choices[0].get('delta') or {}).get('content') if choices else None
+            if content and parser.feed(content) and on_progress is not None:
+                on_progress(parser.summary or "", parser.headline_scores(len(headlines)))
+        
+        response = self.io.fetch_stream('POST', api_url, lambda line: on_data(decoder.feed(line)),
+                                        headers=headers, json=payload, timeout=90, tag='news')
+        response.raise_for_status()
+        if response.content:
+            parser.feed(self._deepseek_message(response.json()))
+        else:
+            on_data(decoder.flush())
     
     def start_monitoring(self, duration_minutes, refresh_interval_seconds):
         """开始监控"""
@@ -755,10 +1177,16 @@ class ShellTrackerCore(QObject):
         self.stop_flag = False
         self.price_log = []
         self.previous_price = None
+        self.session_high = None
+        self.session_low = None
         
         # 初始化价格日志文件
         self.initialize_price_log()
         
+        # WebSocket行情模式：价格、K线和止盈止损检查由推送事件驱动
+        if self.config['monitoring'].get('market_data_mode', 'rest') == 'websocket':
+            self.start_market_stream()
+        
         # 创建并启动监控线程
         self.monitoring_thread = threading.Thread(
             target=self._monitoring_loop,
@@ -767,17 +1195,22 @@ class ShellTrackerCore(QObject):
         self.monitoring_thread.daemon = True
         self.monitoring_thread.start()
         
-        # 获取和处理初始新闻（在单独的线程中进行，避免阻塞UI）
+        # 余额按独立间隔查询（默认与刷新间隔相同），新闻每小时更新
+        self.scheduler.set_interval('balance', self.config['monitoring'].get('balance_interval_seconds', refresh_interval_seconds))
+        self.scheduler.set_interval('watchlist_klines', self.config['monitoring'].get('kline_check_seconds', 60))
+        self.scheduler.reset()
+        
+        # 获取和处理初始新闻（在后台任务中进行，避免阻塞UI）
         if self.config['api']['news']['enabled']:
-            news_thread = threading.Thread(target=self.fetch_and_process_news)
-            news_thread.daemon = True
-            news_thread.start()
+            self.scheduler.trigger('news')
         
         # 发送监控开始信号
         self.monitoring_started.emit(duration_minutes, refresh_interval_seconds)
     
     def initialize_price_log(self):
-        """初始化价格日志文件"""
+        """初始化价格日志文件（二进制tick日志，可用 utils/price_journal.py 导出CSV）"""
+        self.close_price_log()
+        
         # 确保日志目录存在
         if not os.path.exists(self.log_dir):
             try:
@@ -788,109 +1221,421 @@ class ShellTrackerCore(QObject):
         
         # 创建日志文件
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            self.log_filename = f"{self.log_dir}/price_log_{timestamp}.csv"
-            
-            # 写入CSV头部
-            with open(self.log_filename, 'w') as f:
-                f.write("timestamp,price\n")
+            timestamp = self.clock.now().strftime("%Y%m%d_%H%M%S")
+            self.log_filename = f"{self.log_dir}/price_log_{timestamp}.bin"
+            self.price_journal = PriceJournal(self.log_filename)
         except Exception as e:
             self.monitoring_error.emit(f"创建价格日志文件失败: {str(e)}")
             self.log_filename = None
+            self.price_journal = None
     
     def log_price(self, timestamp, price):
-        """记录价格到日志文件"""
-        if not self.log_filename:
+        """记录价格到日志缓冲，由后台线程批量写入文件"""
+        journal = self.price_journal  # 停止监控时可能在其他线程中被关闭
+        if journal is None:
             return
             
-        try:
-            with open(self.log_filename, 'a') as f:
-                f.write(f"{timestamp.isoformat()},{price}\n")
-        except Exception as e:
-            self.monitoring_error.emit(f"写入价格日志失败: {str(e)}")
-            self.log_filename = None  # 停止后续写入尝试
+        if journal.error is not None:
+            self.monitoring_error.emit(f"写入价格日志失败: {str(journal.error)}")
+            self.close_price_log()  # 停止后续写入尝试
+            return
+            
+        journal.record(timestamp, price)
+    
+    def close_price_log(self):
+        """写入剩余的价格记录并关闭日志"""
+        if self.price_journal is not None:
+            self.price_journal.close()
+            self.price_journal = None
     
     def stop_monitoring(self):
         """停止监控"""
         self.stop_flag = True
+        self.stop_market_stream()
+        self.close_price_log()
+        self.io.cancel('news')  # 取消进行中的新闻和DeepSeek请求
         if self.monitoring_thread and self.monitoring_thread.is_alive():
             self.monitoring_thread.join(2)  # 等待最多2秒
         
         # 发送监控停止信号
         self.monitoring_stopped.emit()
     
+    def update_watchlist(self):
+        """批量更新监控列表中全部交易对的价格，并检查各自的止盈止损"""
+        if not self.client or not len(self.watchlist):
+            return
+            
+        try:
+            prices = self.watchlist.fetch_prices(self.client)
+        except Exception as e:
+            self.monitoring_error.emit(f"批量获取监控列表价格失败: {str(e)}")
+            return
+            
+        updates, stops = self.watchlist.update_prices(
+            prices,
+            self.config['trading']['stop_loss_percent'],
+            self.config['trading']['take_profit_percent']
+        )
+        
+        for symbol, price, pct_change in updates:
+            self.watchlist_price_updated.emit(symbol, price, pct_change)
+            
+        for symbol, stop_type, price, profit_percent in stops:
+            print(f"[{self._now():%Y-%m-%d %H:%M:%S}] {symbol} {'止损' if stop_type == 'STOP_LOSS' else '止盈'}触发 @ {price:.4f} ({profit_percent:.2f}%)")
+            self.watchlist_stop_triggered.emit(symbol, stop_type, price, profit_percent)
+        
+        # 指标更新后的交易信号（模拟交易：买入记录入场价，卖出清空持仓）
+        for symbol, signal, price in self.watchlist.check_signals():
+            if signal == 'BUY':
+                self.watchlist.open_position(symbol, price)
+                print(f"[{self._now():%Y-%m-%d %H:%M:%S}] {symbol} BUY 信号触发 @ {price:.4f}")
+            else:
+                entry_price = self.watchlist.close_position(symbol)
+                profit_info = f" (盈利: {(price - entry_price) / entry_price * 100:.2f}%)" if entry_price else ""
+                print(f"[{self._now():%Y-%m-%d %H:%M:%S}] {symbol} SELL 信号触发 @ {price:.4f}{profit_info}")
+            if self.refresh_policy is not None:
+                self.refresh_policy.note_alert()
+            self.watchlist_trade_signal.emit(symbol, signal, price)
+    
+    def update_watchlist_indicators(self):
+        """更新监控列表中各交易对的K线和技术指标（后台任务，按K线检查间隔执行）
+        
+        K线通过增量缓存获取，首次之后每个交易对每次只需一个小请求；请求按监控列表优先级
+        占用权重预算，预算不足时本轮停止，剩余交易对下一轮再更新。
+        """
+        if not self.client or not len(self.watchlist):
+            return
+        
+        _, binance_interval, lookback_days = self._kline_params()
+        client = self.client.prioritized('watchlist') if isinstance(self.client, GovernedClient) else self.client
+        for symbol in list(self.watchlist.symbols):
+            try:
+                klines = self.kline_cache.get(client, symbol, binance_interval, lookback_days)
+            except RateBudgetExceeded as e:
+                print(f"{str(e)}，监控列表指标下一轮继续更新")
+                return
+            except Exception as e:
+                self.monitoring_error.emit(f"获取 {symbol} K线失败: {str(e)}")
+                continue
+            if len(klines) < 2:
+                continue
+            
+            with self._indicator_lock:
+                engine = self.indicator_engines.setdefault((symbol, binance_interval), IndicatorEngine())
+                values = engine.sync([int(k[0]) for k in klines], [float(k[4]) for k in klines])
+            self.watchlist.set_indicators(
+                symbol,
+                {col: column[-1] for col, column in values.items()},
+                {col: column[-2] for col, column in values.items()}
+            )
+    
+    def _handle_price(self, current_time, current_price, interval_seconds, check_alert=True):
+        """处理一次价格更新：记录价格、发送价格信号、检查波动提醒和止盈止损
+        
+        Args:
+            current_time: 价格时间
+            current_price: 最新价格
+            interval_seconds: 与上一次价格之间的间隔（秒），用于提醒文案
+            check_alert: 是否检查波动提醒（WebSocket推送的价格不检查，由监控循环按轮询间隔检查）
+            
+        Returns:
+            tuple: (价格变化百分比, 是否触发止盈止损)
+        """
+        # 更新高低价格
+        if self.session_high is None or current_price > self.session_high:
+            self.session_high = current_price
+        if self.session_low is None or current_price < self.session_low:
+            self.session_low = current_price
+        
+        # 记录价格
+        self.price_log.append((current_time, current_price))
+        self.last_price = current_price
+        
+        # 写入价格日志
+        self.log_price(current_time, current_price)
+        
+        # 计算价格变化
+        pct_change = 0.0
+        if self.previous_price is not None and self.previous_price > 0:
+            pct_change = ((current_price - self.previous_price) / self.previous_price) * 100
+        
+        # 发送价格更新信号
+        self.price_updated.emit(current_price, pct_change)
+        
+        # 检查价格波动提醒
+        if check_alert:
+            self._check_price_alert(pct_change, interval_seconds)
+        
+        # 检查止盈止损
+        position_closed = False
+        if self.position == 'LONG':
+            position_closed = self.check_stop_conditions(current_price)
+        
+        return pct_change, position_closed
+    
+    def _check_price_alert(self, pct_change, interval_seconds):
+        """与上一轮价格相比变化超过阈值时发出波动提醒"""
+        price_alert_threshold = self.config['monitoring'].get('price_alert_threshold', 1.0)
+        if self.previous_price is not None and abs(pct_change) >= price_alert_threshold:
+            direction = "上涨" if pct_change > 0 else "下跌"
+            if self.refresh_policy is not None:
+                self.refresh_policy.note_alert()
+            self.alert_triggered.emit(
+                'PRICE_CHANGE',
+                f"{self.config['trading']['symbol']} 价格在过去 {interval_seconds}秒 内{direction} {abs(pct_change):.2f}%",
+                pct_change
+            )
+    
+    def start_market_stream(self):
+        """启动WebSocket行情流（ticker / kline / bookTicker）"""
+        self.stop_market_stream()
+        self.stream_ticks = queue.Queue()
+        
+        ws_url = self.config['api']['binance'].get('ws_base_url', DEFAULT_WS_URL)
+        self.market_stream = MarketDataStream(
+            self.config['trading']['symbol'],
+            self.config['trading']['interval'],
+            on_ticker=self._on_stream_ticker,
+            on_kline=self._on_stream_kline,
+            on_book_ticker=self._on_stream_book_ticker,
+            on_error=self.monitoring_error.emit,
+            base_url=ws_url
+        )
+        self.market_stream.start()
+        print(f"WebSocket行情流已启动: {', '.join(self.market_stream.streams())}")
+    
+    def stop_market_stream(self):
+        """停止WebSocket行情流"""
+        if self.market_stream is not None:
+            self.market_stream.stop()
+            self.market_stream = None
+    
+    def update_market_stream(self):
+        """交易对或K线周期变化后重新订阅行情流"""
+        if self.market_stream is not None:
+            self.market_stream.set_symbol(self.config['trading']['symbol'], self.config['trading']['interval'])
+    
+    def _on_stream_ticker(self, price, pct_change_24h, event_time_ms):
+        """WebSocket ticker推送（行情流线程）：交给监控线程处理，不在事件循环中调用REST"""
+        self.market_snapshot.put('price', price, key=self.config['trading']['symbol'])
+        self.stream_ticks.put((self.clock.now(), price))
+    
+    def _drain_stream_ticks(self):
+        """在监控线程中处理已推送的价格：记录价格、发送价格信号并立即检查止盈止损
+        
+        波动提醒和K线检查仍按轮询间隔在监控循环中进行（与上一轮的参考价格比较）。
+        """
+        while True:
+            try:
+                tick_time, price = self.stream_ticks.get_nowait()
+            except queue.Empty:
+                return
+            self._handle_price(tick_time, price, 1, check_alert=False)
+    
+    def _wait(self, seconds, streaming):
+        """等待到下一轮；WebSocket模式下等待期间持续处理推送的价格"""
+        if not streaming:
+            self.clock.sleep(seconds)
+            return
+        deadline = self.clock.time() + seconds
+        while not self.stop_flag:
+            self._drain_stream_ticks()
+            remaining = deadline - self.clock.time()
+            if remaining <= 0:
+                return
+            self.clock.sleep(min(remaining, STREAM_POLL_SECONDS))
+    
+    def _on_stream_kline(self, row, is_closed):
+        """WebSocket K线推送：合并到K线缓存"""
+        self.kline_cache.push(self.config['trading']['symbol'], self.config['trading']['interval'], row)
+    
+    def _on_stream_book_ticker(self, best_bid, best_ask):
+        """WebSocket 最优挂单推送"""
+        self.best_bid = best_bid
+        self.best_ask = best_ask
+    
+    def start_replay(self, source=None, speed=1.0, start_time=None, end_time=None):
+        """回放录制的行情，经过与实时监控相同的信号、交易和止盈止损流程
+        
+        Args:
+            source: 价格日志路径（.bin/.csv），None时回放本地K线库中当前交易对和周期的K线
+            speed: 回放倍速（1.0 原速，100.0 百倍速，None 尽可能快）
+            start_time: 从K线库回放时的起始开盘时间（毫秒）
+            end_time: 从K线库回放时的结束开盘时间（毫秒，不含）
+            
+        Returns:
+            bool: 是否成功开始回放
+        """
+        try:
+            symbol, binance_interval, _ = self._kline_params()
+            if source is None:
+                if self.kline_store is None:
+                    self.monitoring_error.emit("本地K线库未初始化，无法回放")
+                    return False
+                feed = ReplayFeed.from_kline_store(self.kline_store, symbol, binance_interval,
+                                                   start_time, end_time, speed=speed)
+            else:
+                feed = ReplayFeed.from_price_log(source, INTERVAL_MS.get(binance_interval, 60000), speed=speed)
+                # 用价格日志之前的本地K线作为指标预热数据
+                if self.kline_store is not None and len(feed):
+                    feed.seed_history(self.kline_store.load_rows(symbol, binance_interval, end_time=int(feed.times_ms[0])))
+        except Exception as e:
+            self.monitoring_error.emit(f"加载回放数据失败: {str(e)}")
+            return False
+            
+        if not len(feed):
+            self.monitoring_error.emit("回放数据为空")
+            return False
+        
+        if self.monitoring_thread and self.monitoring_thread.is_alive():
+            self.stop_monitoring()
+            time.sleep(1)  # 等待线程结束
+        
+        self.stop_flag = False
+        self.price_log = []
+        self.previous_price = None
+        self.session_high = None
+        self.session_low = None
+        self.position = None
+        self.entry_price = None
+        self.close_price_log()  # 回放的价格不再写入新的价格日志
+        self.replay = feed
+        
+        duration_minutes = max(1, int(feed.duration_seconds() / 60 + 0.5))
+        refresh_interval_seconds = max(1, int(feed.typical_interval_seconds() + 0.5))
+        
+        speed_text = "最快" if not speed else f"{speed:g}x"
+        print(f"开始回放 {len(feed)} 个价格 ({feed.now():%Y-%m-%d %H:%M:%S} 起, 约 {duration_minutes} 分钟, 速度 {speed_text})")
+        
+        self.monitoring_thread = threading.Thread(
+            target=self._monitoring_loop,
+            args=(duration_minutes, refresh_interval_seconds)
+        )
+        self.monitoring_thread.daemon = True
+        self.monitoring_thread.start()
+        
+        self.monitoring_started.emit(duration_minutes, refresh_interval_seconds)
+        return True
+    
+    def _get_replay_klines(self):
+        """由回放源截至当前时刻的K线计算技术指标"""
+        symbol, binance_interval, _ = self._kline_params()
+        klines = self.replay.klines()
+        if len(klines) < 2:
+            return None
+            
+        # 使用独立的指标引擎，不影响实时数据的增量状态
+        df = self._build_kline_frame(f"replay:{symbol}", binance_interval, klines)
+        if df is not None:
+            self.chart_data_ready.emit(df)
+        return df
+    
+    def set_clock(self, clock):
+        """更换时钟（应在开始监控之前调用）"""
+        self.clock = clock
+        self.kline_cache.clock = clock
+        self.scheduler.clock = clock
+        self.market_snapshot.clock = clock
+        self.analysis_cache.clock = clock
+        self.sentiment_ledger.clock = clock
+        self.rate_governor.clock = clock
+    
+    def _create_refresh_policy(self, refresh_interval_seconds):
+        """按配置创建自适应轮询间隔（monitoring.adaptive_refresh 为 false 时固定为刷新间隔）"""
+        monitoring = self.config['monitoring']
+        if not monitoring.get('adaptive_refresh', True):
+            return AdaptiveRefresh(refresh_interval_seconds, refresh_interval_seconds, refresh_interval_seconds,
+                                   clock=self.clock)
+        return AdaptiveRefresh(
+            refresh_interval_seconds,
+            min_interval=monitoring.get('refresh_min_seconds', min(1, refresh_interval_seconds)),
+            max_interval=monitoring.get('refresh_max_seconds', max(30, refresh_interval_seconds)),
+            window_seconds=monitoring.get('volatility_window_seconds', 300),
+            target_move_percent=monitoring.get('refresh_target_move_percent', 0.15),
+            stop_safety=monitoring.get('refresh_stop_safety', 0.25),
+            clock=self.clock
+        )
+    
+    def _stop_distance(self, current_price):
+        """当前持仓及监控列表持仓中，价格到止损价或止盈价的最近距离（比例），没有持仓时返回 None"""
+        stop_loss_percent = self.config['trading']['stop_loss_percent']
+        take_profit_percent = self.config['trading']['take_profit_percent']
+        distances = []
+        if self.position == 'LONG' and self.entry_price and current_price:
+            stop_loss_price = self.entry_price * (1 - stop_loss_percent / 100)
+            take_profit_price = self.entry_price * (1 + take_profit_percent / 100)
+            distances.append(min(math.log(current_price / stop_loss_price), math.log(take_profit_price / current_price)))
+        if len(self.watchlist):
+            watchlist_distance = self.watchlist.stop_distance(stop_loss_percent, take_profit_percent)
+            if watchlist_distance is not None:
+                distances.append(watchlist_distance)
+        return min(distances) if distances else None
+    
+    def _now(self):
+        """当前时间：回放时为回放数据中的时间"""
+        if self.replay is not None:
+            return self.replay.now()
+        return self.clock.now()
+    
     def _monitoring_loop(self, duration_minutes, refresh_interval_seconds):
         """监控循环"""
         try:
-            end_time = datetime.now() + timedelta(minutes=duration_minutes)
-            iteration = 0
-            last_news_time = datetime.now()
-            last_kline_time = datetime.now() - timedelta(minutes=1)  # 首次进入立即获取K线
-            
-            # 跟踪会话中的高低价格
-            session_high = None
-            session_low = None
-            
-            while datetime.now() < end_time and not self.stop_flag:
-                current_time = datetime.now()
-                iteration += 1
+            replay = self.replay
+            end_time = self.clock.now() + timedelta(minutes=duration_minutes)
+            price_alert_threshold = self.config['monitoring'].get('price_alert_threshold', 1.0)
+            kline_check_seconds = self.config['monitoring'].get('kline_check_seconds', 60)
+            last_kline_time = self._now() - timedelta(seconds=kline_check_seconds)  # 首次进入立即获取K线
+            self.refresh_policy = policy = self._create_refresh_policy(refresh_interval_seconds)
+            tick_seconds = refresh_interval_seconds  # 与上一轮之间的实际间隔
+            
+            while not self.stop_flag:
+                # 回放模式：每轮前进一个录制的价格，数据回放完毕即结束
+                if replay is not None:
+                    if not replay.advance():
+                        break
+                elif self.clock.now() >= end_time:
+                    break
+                    
+                current_time = self._now()
+                
+                # WebSocket已连接时，价格和止盈止损由推送事件处理；断开时自动回退到REST轮询
+                streaming = replay is None and self.market_stream is not None and self.market_stream.connected
+                pct_change = 0.0
                 
-                # 获取最新价格
-                current_price = self.get_latest_price()
+                if streaming:
+                    # 推送的价格已在等待期间处理（止盈止损即时检查），这里与上一轮的参考价格比较
+                    self._drain_stream_ticks()
+                    current_price = self.last_price
+                else:
+                    # 获取最新价格
+                    current_price = self.scheduler.call('price', self.get_latest_price)
                 
                 if current_price is not None:
-                    # 更新高低价格
-                    if session_high is None or current_price > session_high:
-                        session_high = current_price
-                    if session_low is None or current_price < session_low:
-                        session_low = current_price
-                    
-                    # 记录价格
-                    self.price_log.append((current_time, current_price))
-                    
-                    # 写入价格日志
-                    self.log_price(current_time, current_price)
-                    
-                    # 计算价格变化
-                    pct_change = 0.0
-                    if self.previous_price is not None and self.previous_price > 0:
-                        pct_change = ((current_price - self.previous_price) / self.previous_price) * 100
-                    
-                    # 发送价格更新信号
-                    self.price_updated.emit(current_price, pct_change)
-                    
-                    # 检查价格波动提醒
-                    price_alert_threshold = self.config['monitoring'].get('price_alert_threshold', 1.0)
-                    if self.previous_price is not None and abs(pct_change) >= price_alert_threshold:
-                        direction = "上涨" if pct_change > 0 else "下跌"
-                        self.alert_triggered.emit(
-                            'PRICE_CHANGE',
-                            f"{self.config['trading']['symbol']} 价格在过去 {refresh_interval_seconds}秒 内{direction} {abs(pct_change):.2f}%",
-                            pct_change
-                        )
-                    
-                    # 检查止盈止损
-                    if self.position == 'LONG':
-                        position_closed = self.check_stop_conditions(current_price)
+                    if replay is None:
+                        policy.observe(current_price)
+                    if streaming:
+                        if self.previous_price:
+                            pct_change = (current_price - self.previous_price) / self.previous_price * 100
+                        self._check_price_alert(pct_change, max(1, round(tick_seconds)))
+                    else:
+                        pct_change, position_closed = self._handle_price(current_time, current_price, max(1, round(tick_seconds)))
                         if position_closed:
                             self.previous_price = current_price
                             
                             # 位置关闭时更新K线图
-                            df = self.get_klines()
+                            df = self.scheduler.call('klines', self.get_klines)
                             if df is not None and not df.empty:
                                 self.chart_data_ready.emit(df)
                                 
                             continue  # 更新价格并跳过信号检查
                     
-                    # 检查交易信号 - 减少频率，每分钟一次或价格变化大时
-                    kline_check_interval = max(1, int(60 / refresh_interval_seconds))
+                    # 检查交易信号 - 按时间间隔（默认每分钟一次），价格变化大时立即检查
                     kline_elapsed = (current_time - last_kline_time).total_seconds()
-                    should_check_klines = iteration % kline_check_interval == 0 or \
-                                         (self.previous_price is not None and abs(pct_change) >= price_alert_threshold) or \
-                                         kline_elapsed >= 60  # 至少每分钟更新一次
+                    should_check_klines = kline_elapsed >= kline_check_seconds or \
+                                         (self.previous_price is not None and abs(pct_change) >= price_alert_threshold)
                     
                     if should_check_klines:
-                        df = self.get_klines()
+                        df = self.scheduler.call('klines', self.get_klines)
                         if df is not None and not df.empty:
                             # 更新图表数据
                             self.chart_data_ready.emit(df)
@@ -900,35 +1645,43 @@ class ShellTrackerCore(QObject):
                             if self.position is None:
                                 signal = self.check_signals(df)
                                 if signal == 'BUY':
+                                    policy.note_alert()
                                     self.execute_trade(signal, current_price)
                                     self.previous_price = current_price
                                     continue  # 买入后跳过本轮后续
                     
-                    # 更新上一次价格
+                    # 更新上一次价格（下一轮波动提醒的参考价格）
                     self.previous_price = current_price
                     
-                    # 定期更新账户余额(每次迭代都更新)
-                    if iteration % 1 == 0:  # 每次循环都检查
-                        # 在单独的线程中检查账户余额，避免阻塞主循环
-                        balance_thread = threading.Thread(target=self.check_account_balance)
-                        balance_thread.daemon = True
-                        balance_thread.start()
+                    # 定期更新账户余额(按余额间隔在后台任务中查询，上次查询未完成时合并，回放时不查询)
+                    if replay is None:
+                        self.scheduler.run_due('balance')
                 
-                # 定期更新新闻(每小时)
-                news_update_interval = 3600  # 1小时
-                if self.config['api']['news']['enabled'] and (current_time - last_news_time).total_seconds() >= news_update_interval:
-                    # 在单独的线程中获取新闻，避免阻塞监控循环
-                    news_thread = threading.Thread(target=self.fetch_and_process_news)
-                    news_thread.daemon = True
-                    news_thread.start()
-                    last_news_time = current_time
+                # 监控列表：每轮一次批量请求，指标按K线检查间隔在后台任务中更新（回放时跳过实时请求）
+                if replay is None:
+                    self.update_watchlist()
+                    self.scheduler.run_due('watchlist_klines')
                 
-                # 睡眠
+                # 定期更新新闻(每小时，回放时沿用当前情感分析结果)
+                if replay is None and self.config['api']['news']['enabled']:
+                    self.scheduler.run_due('news')
+                
+                # 睡眠（回放时按录制间隔和回放速度等待；实时监控时间隔由波动率、止盈止损距离和
+                # 最近的提醒决定，请求权重预计超出目标时再按倍数拉长）
                 if not self.stop_flag:
-                    time.sleep(refresh_interval_seconds)
+                    if replay is not None:
+                        replay.wait_next(lambda: self.stop_flag)
+                    else:
+                        budget = self.rate_governor.stats()
+                        self.rate_budget_updated.emit(int(budget['used']), int(budget['limit']), budget['multiplier'])
+                        tick_seconds = policy.next_interval(self._stop_distance(current_price)) * budget['multiplier']
+                        self._wait(tick_seconds, streaming)
             
             # 监控结束时生成最终报告
             if not self.stop_flag:  # 只有正常结束时才发出信号
+                self.stop_market_stream()
+                self.close_price_log()
+                
                 # 再次获取并发送最新的K线数据，确保最终视图是最新的
                 final_df = self.get_klines()
                 if final_df is not None and not final_df.empty:
@@ -940,6 +1693,9 @@ class ShellTrackerCore(QObject):
             error_message = f"监控过程中发生错误: {str(e)}"
             self.monitoring_error.emit(error_message)
             traceback.print_exc()
+        finally:
+            if self.replay is not None and self.replay is replay:
+                self.replay = None
     
     def check_account_balance(self):
         """检查当前账户余额"""
@@ -952,12 +1708,12 @@ class ShellTrackerCore(QObject):
             symbol = self.config['trading']['symbol']
             coin = symbol.replace('USDT', '')  # 假设所有交易对都是与USDT的交易
             
-            # 获取账户余额
-            balance_info = self.client.get_asset_balance(asset=coin)
+            # 获取账户余额（有效期内共用行情快照）
+            balance_info = self.market_snapshot.get('balance', lambda: self.client.get_asset_balance(asset=coin), key=coin)
             if balance_info and 'free' in balance_info:
                 self.account_balance = float(balance_info['free'])
                 
-                # 获取当前价格计算价值
+                # 获取当前价格计算价值（监控循环刚获取过的价格直接复用）
                 price = self.get_latest_price()
                 if price:
                     self.account_value = self.account_balance * price
@@ -973,6 +1729,10 @@ class ShellTrackerCore(QObject):
                     self.position = 'LONG'
                     # entry_price保持None，因为无法知道初始持仓成本
                     
+            return self.account_balance, self.account_value
+        except RateBudgetExceeded as e:
+            # 余额查询优先级最低，预算紧张时直接跳过，沿用上一次的余额
+            print(str(e))
             return self.account_balance, self.account_value
         except BinanceAPIException as e:
             error_message = f"Binance API错误: {str(e)}"
@@ -983,19 +1743,42 @@ class ShellTrackerCore(QObject):
             traceback.print_exc()  # 打印详细的错误堆栈
             return 0.0, 0.0
 
+    def _rss_keyword_matcher(self):
+        """RSS关键词匹配器（关键词集合变化时才重新构建）
+        
+        主交易对使用 rss_keywords，其他交易对使用 monitoring.rss_symbol_keywords（交易对 -> 关键词列表）。
+        """
+        symbol_keywords = {self.config.get('trading', {}).get('symbol', 'SHELLUSDT'): list(self.rss_keywords)}
+        for symbol, words in self.config.get('monitoring', {}).get('rss_symbol_keywords', {}).items():
+            symbol_keywords[symbol] = symbol_keywords.get(symbol, []) + list(words)
+        normalized = KeywordMatcher.normalize(symbol_keywords)
+        if normalized != self.keyword_matcher.keywords:
+            self.keyword_matcher = KeywordMatcher(normalized)
+        return self.keyword_matcher
+    
     def fetch_rss_news(self, max_articles_per_rss=2):
-        """获取RSS源新闻（并行处理）"""
+        """获取RSS源新闻（所有源在I/O运行时中并发请求）
+        
+        使用条件请求，源未更新时不下载和解析；已处理过的条目直接跳过。
+        
+        Returns:
+            list: 本次新出现的相关文章（界面显示的是包含缓存文章在内的最近文章）
+        """
         if not self.config['api']['news']['enabled']:
             return []
         
         all_articles = []
         rss_headers = {'User-Agent': 'Mozilla/5.0'}
+        keyword_matcher = self._rss_keyword_matcher()
         
-        def fetch_single_rss(feed_url):
-            """获取单个RSS源的新闻（线程函数）"""
+        def parse_single_rss(feed_url, response):
+            """解析单个RSS源的响应"""
             articles = []
             try:
-                response = requests.get(feed_url, headers=rss_headers, timeout=25)
+                if isinstance(response, BaseException):
+                    raise response
+                if response.status == 304:
+                    return articles  # 源未更新
                 response.raise_for_status()
                 feed = feedparser.parse(response.content)
                 
@@ -1006,11 +1789,18 @@ class ShellTrackerCore(QObject):
                 if feed.bozo:
                     self.monitoring_error.emit(f"RSS解析警告 ({source_name}): {feed.bozo_exception}")
                 
-                # 获取相关文章
+                # 获取相关文章（只处理之前没有见过的条目；达到数量上限后未检查的条目留到下次）
                 relevant_count = 0
+                examined_ids = []
+                truncated = False
                 for entry in feed.entries:
                     if relevant_count >= max_articles_per_rss:
+                        truncated = True
                         break
+                    entry_id = FeedCache.entry_id(entry)
+                    examined_ids.append(entry_id)
+                    if self.feed_cache.is_seen(feed_url, entry_id):
+                        continue
                         
                     # 获取标题和摘要
                     title = entry.get('title', '')
@@ -1018,7 +1808,7 @@ class ShellTrackerCore(QObject):
                     
                     # 处理HTML格式
                     if isinstance(summary, str):
-                        summary = html.unescape(re.sub('<[^<]+?>', '', summary))
+                        summary = strip_html(summary)
                     else:
                         summary = ''
                     
@@ -1027,54 +1817,65 @@ class ShellTrackerCore(QObject):
                     if hasattr(entry, 'published_parsed') and entry.published_parsed:
                         pub_time = datetime(*entry.published_parsed[:6])
                     else:
-                        pub_time = datetime.now()
+                        pub_time = self.clock.now()
                     
-                    # 检查关键词
-                    content_lower = (title + ' ' + summary).lower()
-                    if any(keyword in content_lower for keyword in self.rss_keywords):
+                    # 检查关键词（一次扫描得到命中的全部交易对）
+                    symbols = keyword_matcher.match(title + ' ' + summary)
+                    if symbols:
                         article = {
                             'title': title,
                             'summary': summary[:200] + ('...' if len(summary) > 200 else ''),
                             'source': source_name,
                             'time': pub_time,
-                            'url': entry.get('link', '')
+                            'url': entry.get('link', ''),
+                            'symbols': sorted(symbols)
                         }
                         articles.append(article)
                         relevant_count += 1
                 
-            except requests.exceptions.RequestException as e:
+                self.feed_cache.mark_seen(feed_url, examined_ids)
+                if not truncated:
+                    # 还有未检查的条目时不保存 ETag / Last-Modified，下次不会因 304 而错过它们
+                    self.feed_cache.update_validators(feed_url, response.headers)
+                self.feed_cache.add_articles(feed_url, articles)
+                
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 self.monitoring_error.emit(f"RSS获取错误 ({feed_url}): {str(e)}")
             except Exception as e:
                 self.monitoring_error.emit(f"RSS处理错误 ({feed_url}): {str(e)}")
             
             return articles
         
-        # 创建线程池处理多个RSS源
-        threads = []
-        results = [[] for _ in range(len(self.rss_feeds))]
-        
-        for i, feed_url in enumerate(self.rss_feeds):
-            thread = threading.Thread(
-                target=lambda idx=i, url=feed_url: results[idx].extend(fetch_single_rss(url))
+        async def fetch_all(feed_urls):
+            return await asyncio.gather(
+                *(self.io.get(url, headers=dict(rss_headers, **self.feed_cache.conditional_headers(url)), timeout=25)
+                  for url in feed_urls),
+                return_exceptions=True
             )
-            thread.daemon = True
-            threads.append(thread)
-            thread.start()
         
-        # 等待所有线程完成
-        for thread in threads:
-            thread.join(timeout=30)  # 设置超时，避免永久等待
+        # 并发请求全部RSS源，在当前线程中逐个解析
+        feed_urls = list(self.rss_feeds)
+        try:
+            responses = self.io.run(fetch_all(feed_urls), timeout=30, tag='news')
+        except Exception as e:
+            self.monitoring_error.emit(f"RSS获取错误: {str(e)}")
+            return []
         
-        # 合并结果
-        for result in results:
-            all_articles.extend(result)
+        for feed_url, response in zip(feed_urls, responses):
+            all_articles.extend(parse_single_rss(feed_url, response))
         
         # 按时间排序
         all_articles.sort(key=lambda x: x['time'], reverse=True)
         
-        # 发送新闻信号
-        if all_articles:
-            self.rss_news_received.emit(all_articles)
+        try:
+            self.feed_cache.save()
+        except Exception as e:
+            self.monitoring_error.emit(f"保存RSS缓存失败: {str(e)}")
+        
+        # 发送新闻信号（各源最近的相关文章，包括之前缓存的）
+        recent_articles = self.feed_cache.recent_articles(feed_urls, per_feed=max_articles_per_rss)
+        if recent_articles:
+            self.rss_news_received.emit(recent_articles)
         
         return all_articles 
 
@@ -1086,7 +1887,7 @@ class ShellTrackerCore(QObject):
         """
         # 准备报告数据
         report_data = {
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'timestamp': self._now().strftime("%Y-%m-%d %H:%M:%S"),
             'status': "监控中" if hasattr(self, 'monitoring_thread') and self.monitoring_thread and self.monitoring_thread.is_alive() else "未监控",
             'charts': {},
             'text_report': "",
@@ -1109,6 +1910,16 @@ class ShellTrackerCore(QObject):
                 
             # 添加价格信息
             report_data['current_price'] = current_price
+            ticker_24h = self.get_24h_stats()
+            if ticker_24h:
+                report_data['ticker_24h'] = ticker_24h
+            report_data['http_stats'] = self.io.stats()
+            report_data['rate_budget'] = self.rate_governor.stats()
+            if self.refresh_policy is not None:
+                report_data['refresh_policy'] = self.refresh_policy.stats()
+            report_data['analysis_cache'] = self.analysis_cache.stats()
+            report_data['sentiment_ledger'] = self.sentiment_ledger.stats()
+            report_data['news_coverage'] = dict(self.news_coverage or {}, index=self.news_index.stats())
             
             # 如果有价格日志，计算价格统计信息
             session_stats = {}
@@ -1119,7 +1930,7 @@ class ShellTrackerCore(QObject):
                 session_stats['price_change'] = ((prices[-1] - prices[0]) / prices[0]) * 100 if prices[0] != 0 else 0
                 session_stats['price_volatility'] = max(prices) - min(prices)
                 session_stats['volatility_percent'] = ((max(prices) - min(prices)) / min(prices)) * 100 if min(prices) > 0 else 0
-                session_stats['duration'] = (datetime.now() - times[0]).total_seconds() / 60
+                session_stats['duration'] = (self._now() - times[0]).total_seconds() / 60
                 
                 # 生成价格走势图
                 try:
@@ -1160,7 +1971,7 @@ class ShellTrackerCore(QObject):
                     plt.tight_layout()
                     
                     # 保存图表
-                    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    timestamp_str = self.clock.now().strftime("%Y%m%d_%H%M%S")
                     price_chart_filename = f'price_chart_{timestamp_str}.png'
                     
                     # 使用指定的图表目录
@@ -1265,7 +2076,7 @@ class ShellTrackerCore(QObject):
                     plt.tight_layout()
                     
                     # 保存图表
-                    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    timestamp_str = self.clock.now().strftime("%Y%m%d_%H%M%S")
                     macd_chart_filename = f'macd_chart_{timestamp_str}.png'
                     
                     # 使用指定的图表目录
@@ -1333,6 +2144,10 @@ class ShellTrackerCore(QObject):
 *持仓状态: {position_status_text}*
 
 当前价格: {current_price:.4f} USDT"""
+            
+            if ticker_24h:
+                report_text += f"""
+24小时涨跌: {ticker_24h['price_change_percent']:+.2f}% (最高 {ticker_24h['high']:.4f} / 最低 {ticker_24h['low']:.4f})"""
 
             # 添加价格统计信息
             if session_stats:
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+DeepSeek流式分析检查
+
+在本机启动一个模拟 DeepSeek chat/completions 接口的 SSE 服务（不访问外部网络），
+检查 SseDecoder/AnalysisParser 的增量解析、_stream_deepseek 的流式接收、服务器忽略
+stream 参数返回JSON时的处理、分析缓存命中，以及取消进行中的分析后临时分数被清除。
+
+    python test_deepseek_stream.py            # 运行全部检查
+    python test_deepseek_stream.py --serve    # 只启动模拟服务，可配置为 api.news.deepseek_api_url
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import threading
+
+from aiohttp import web
+
+from utils.deepseek_stream import SseDecoder, AnalysisParser
+
+# 模拟的分析结果（与 DEEPSEEK_PROMPT_TEMPLATE 要求的格式一致）
+REPLY = (
+    "情感: positive\n"
+    "情感分数: 0.6\n"
+    "逐条分数:\n"
+    "1: 0.8\n"
+    "2: -0.4\n"
+    "中文摘要:\n"
+    "MyShell 上线新的交易对，社区讨论热烈，但也有用户担心短期抛压。\n"
+)
+
+HEADLINES = [
+    "MyShell SHELL token listed on major exchange. (来源: test)",
+    "Analysts warn of SHELL unlock selling pressure. (来源: test)",
+]
+
+
+class DeepSeekStandIn:
+    """
+    本地 DeepSeek 接口模拟服务
+
+    POST /stream  按小块发送 SSE 增量（含注释行和 [DONE]）
+    POST /json    忽略 stream 参数，直接返回完整JSON
+    POST /slow    先发送情感和逐条分数，停顿 pause 秒后再发送摘要
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, chunk_size=6, pause=3.0):
+        self.host = host
+        self.port = port
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.requests = []  # (路径, 请求体)
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    def url(self, mode='stream'):
+        return f"http://{self.host}:{self.port}/{mode}"
+
+    def start(self):
+        """在后台线程中启动服务"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._start_site())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="deepseek-standin", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+    async def _start_site(self):
+        app = web.Application()
+        app.router.add_post('/{mode}', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def _handle(self, request):
+        mode = request.match_info['mode']
+        payload = await request.json()
+        self.requests.append((mode, payload))
+
+        if mode == 'json':
+            return web.json_response({'choices': [{'message': {'role': 'assistant', 'content': REPLY}}]})
+
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        await response.write(b": keep-alive\n\n")
+
+        split = REPLY.index("中文摘要")
+        chunks = [REPLY[i:i + self.chunk_size] for i in range(0, len(REPLY), self.chunk_size)]
+        sent = 0
+        try:
+            for chunk in chunks:
+                if mode == 'slow' and sent < split <= sent + len(chunk):
+                    await asyncio.sleep(self.pause)
+                data = json.dumps({'choices': [{'delta': {'content': chunk}}]}, ensure_ascii=False)
+                await response.write(f"data: {data}\n\n".encode('utf-8'))
+                sent += len(chunk)
+                await asyncio.sleep(0.01)
+            await response.write(b"data: [DONE]\n\n")
+            await response.write_eof()
+        except ConnectionResetError:
+            pass  # 客户端已取消请求
+        return response
+
+
+def check_decoder():
+    """SSE解码：注释行、多行 data、空行结束事件、流结束时的未完成事件"""
+    decoder = SseDecoder()
+    events = [decoder.feed(line) for line in [": ping", "data: a", "data:b", "event: x", "", "data: [DONE]"]]
+    assert events == [None, None, None, None, "a\nb", None], events
+    assert decoder.flush() == "[DONE]"
+    assert decoder.flush() is None
+    print("SseDecoder: 通过")
+
+
+def check_parser():
+    """增量解析：情感和逐条分数在摘要之前得到，一行被拆成多块时只在完整后解析"""
+    parser = AnalysisParser()
+    order = []
+    for i in range(0, len(REPLY), 4):
+        if parser.feed(REPLY[i:i + 4]):
+            order.append((parser.score, parser.headline_scores(2), parser.summary))
+    parser.finish()
+    assert parser.sentiment == 'positive' and parser.score == 0.6, (parser.sentiment, parser.score)
+    assert parser.headline_scores(2) == [0.8, -0.4], parser.item_scores
+    assert parser.summary.startswith("MyShell 上线"), parser.summary
+    assert order[0][2] is None, "情感分数应先于摘要解析"
+    assert any(scores == [0.8, -0.4] and summary is None for _, scores, summary in order), order
+    print("AnalysisParser: 通过")
+
+
+def make_core(standin, mode, tmp_dir):
+    from shell_tracker_core import ShellTrackerCore
+    config = {
+        'api': {
+            'binance': {},
+            'news': {
+                'enabled': True,
+                'deepseek_api_key': 'test',
+                'deepseek_api_url': standin.url(mode),
+                'deepseek_stream': True,
+            },
+        },
+        'trading': {'symbol': 'SHELLUSDT', 'interval': '15m'},
+        'monitoring': {
+            'news_query': 'MyShell',
+            'max_news_per_source': 5,
+            'lexicon_prefilter': False,
+            'analysis_cache_file': os.path.join(tmp_dir, f'analysis_cache_{mode}.json'),
+            'sentiment_ledger_file': os.path.join(tmp_dir, f'sentiment_ledger_{mode}.json'),
+            'rss_cache_file': os.path.join(tmp_dir, f'rss_cache_{mode}.json'),
+        },
+    }
+    core = ShellTrackerCore(config)
+    core.monitoring_error.connect(lambda message: print(f"  monitoring_error: {message}"))
+    return core
+
+
+def check_stream(standin, tmp_dir):
+    """流式接收：逐条分数先于摘要到达；第二次相同请求命中缓存，不再请求服务"""
+    core = make_core(standin, 'stream', tmp_dir)
+    progress = []
+    summary, sentiment, score, scores = core.call_deepseek_for_analysis(
+        HEADLINES, lambda partial, headline_scores: progress.append((partial, headline_scores)))
+
+    mode, payload = standin.requests[-1]
+    assert mode == 'stream' and payload.get('stream') is True, payload
+    assert (sentiment, score, scores) == ('positive', 0.6, [0.8, -0.4]), (sentiment, score, scores)
+    assert summary.startswith("MyShell 上线"), summary
+    first_scored = next(i for i, (_, s) in enumerate(progress) if s == [0.8, -0.4])
+    first_summary = next(i for i, (p, _) in enumerate(progress) if p)
+    assert first_scored < first_summary, progress[:first_summary + 1]
+
+    count = len(standin.requests)
+    cached = core.call_deepseek_for_analysis(list(reversed(HEADLINES)))
+    assert len(standin.requests) == count, "缓存命中时不应再请求"
+    assert cached[3] == [-0.4, 0.8], cached
+    core.io.stop()
+    print(f"_stream_deepseek 流式接收: 通过（{len(progress)} 次增量更新，缓存命中）")
+
+
+def check_json_fallback(standin, tmp_dir):
+    """服务器忽略 stream 参数直接返回JSON时按普通响应解析"""
+    core = make_core(standin, 'json', tmp_dir)
+    progress = []
+    summary, sentiment, score, scores = core.call_deepseek_for_analysis(
+        HEADLINES, lambda *args: progress.append(args))
+    assert (sentiment, score, scores) == ('positive', 0.6, [0.8, -0.4]), (sentiment, score, scores)
+    assert summary.startswith("MyShell 上线") and not progress, (summary, progress)
+    core.io.stop()
+    print("_stream_deepseek JSON响应: 通过")
+
+
+def check_cancel(standin, tmp_dir):
+    """分析进行中取消新闻请求：临时分数被清除，之后到达的数据不再改变整体情感"""
+    core = make_core(standin, 'slow', tmp_dir)
+    core.rss_feeds = []
+    core.fetch_rss_news = lambda max_articles: [
+        {'title': h.split(' (来源')[0].rstrip('.'), 'summary': '', 'source': 'test'} for h in HEADLINES]
+
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(value=core.fetch_and_process_news()))
+    worker.start()
+
+    deadline = time.monotonic() + 10
+    while not core.sentiment_ledger.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert core.sentiment_ledger.pending, "流式分数应在摘要之前计入临时分数"
+    streamed = core.sentiment_score
+
+    core.io.cancel('news')
+    worker.join(10)
+    assert not worker.is_alive()
+    time.sleep(standin.pause + 0.5)  # 等待服务端发送剩余内容
+    assert core.sentiment_ledger.pending == [], core.sentiment_ledger.pending
+    assert core.sentiment_ledger.aggregate() is None and len(core.sentiment_ledger) == 0
+    core.io.stop()
+    print(f"取消进行中的分析: 通过（流式阶段情感分数 {streamed:.2f}，取消后临时分数已清除）")
+
+
+def main():
+    if '--serve' in sys.argv:
+        port = int(sys.argv[sys.argv.index('--serve') + 1]) if len(sys.argv) > sys.argv.index('--serve') + 1 else 8799
+        standin = DeepSeekStandIn(port=port).start()
+        print(f"模拟DeepSeek服务: {standin.url('stream')}（/json、/slow 见说明），Ctrl+C 退出")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            standin.stop()
+        return True
+
+    check_decoder()
+    check_parser()
+    standin = DeepSeekStandIn(pause=1.5).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            check_stream(standin, tmp_dir)
+            check_json_fallback(standin, tmp_dir)
+            check_cancel(standin, tmp_dir)
+    finally:
+        standin.stop()
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        main()
+        print("DeepSeek流式分析检查通过!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"检查失败: {e}")
+        sys.exit(1)
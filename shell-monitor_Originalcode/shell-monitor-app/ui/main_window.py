@@ -12,7 +12,7 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                             QSplitter, QTableWidget, QHeaderView, QMessageBox,
                             QTableWidgetItem, QToolBar, QComboBox, QSpinBox,
                             QScrollArea, QTextBrowser, QDialog, QApplication,
-                            QSlider, QCheckBox)
+                            QSlider, QCheckBox, QFileDialog, QInputDialog)
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot, QThread, QSize, QObject, pyqtSignal
 from PyQt5.QtGui import QIcon, QFont, QColor, QPalette, QPixmap, QBrush
 from PyQt5.QtChart import QChart, QChartView, QLineSeries, QDateTimeAxis, QValueAxis
@@ -23,8 +23,9 @@ from shell_tracker_core import ShellTrackerCore
 import logging
 import traceback
 import io
-import requests
-import time
+import asyncio
+import concurrent.futures
+import aiohttp
 
 # 控制台输出重定向类
 class ConsoleRedirector(QObject):
@@ -110,10 +111,13 @@ class MainWindow(QMainWindow):
         # 初始化核心追踪器
         self.tracker = ShellTrackerCore(self.config)
         
-        # Telegram发送控制变量
-        self.telegram_send_interrupted = False
+        # Telegram发送控制变量（进行中的发送任务，取消即中断）
+        self.telegram_future = None
         self.report_data = None
         
+        # 流式新闻分析中正在更新的新闻表格行
+        self.streaming_news_row = None
+        
         # 创建专门的图表目录
         self.charts_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "charts")
         if not os.path.exists(self.charts_dir):
@@ -150,9 +154,17 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("就绪")
         
+        # Binance请求权重预算（常驻在状态栏右侧）
+        self.rate_budget_label = QLabel("API权重: --")
+        self.statusBar.addPermanentWidget(self.rate_budget_label)
+        
         # 连接信号和槽
         self.connect_signals()
         
+        # 从本地K线库加载历史K线并在后台补齐缺口
+        if self.tracker.client:
+            self.tracker.warm_start_klines()
+        
         # 初始化计时器
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_ui)
@@ -180,6 +192,7 @@ class MainWindow(QMainWindow):
             # 在初始化追踪器时设置charts_dir和log_dir
             self.tracker.charts_dir = self.charts_dir
             self.tracker.log_dir = self.log_dir
+            self.tracker.kline_store_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "kline_store")
             
             success = self.tracker.initialize(self.config)
             if not success:
@@ -204,7 +217,7 @@ class MainWindow(QMainWindow):
                         self.price_chart.timeframe_combo.setCurrentIndex(index)
                         logging.info(f"价格图表周期已设置为: {ui_interval}")
                 
-                # 在单独的线程中获取初始数据，避免阻塞UI
+                # 在后台任务中获取初始数据，避免阻塞UI
                 def get_initial_data():
                     try:
                         # 获取最新价格
@@ -218,11 +231,9 @@ class MainWindow(QMainWindow):
                     except Exception as e:
                         logging.error(f"获取初始数据失败: {e}")
                 
-                # 创建并启动线程
-                import threading
-                initial_data_thread = threading.Thread(target=get_initial_data)
-                initial_data_thread.daemon = True
-                initial_data_thread.start()
+                # 交给追踪器的任务调度器执行
+                self.tracker.scheduler.register('initial_data', get_initial_data)
+                self.tracker.scheduler.trigger('initial_data')
         except Exception as e:
             logging.error(f"初始化追踪器失败: {e}")
             QMessageBox.critical(self, "初始化错误", f"初始化过程中发生错误: {str(e)}")
@@ -395,11 +406,23 @@ class MainWindow(QMainWindow):
         
         rss_layout.addWidget(self.rss_table)
         
+        # 监控列表标签页（monitoring.watchlist 中的交易对）
+        self.watchlist_tab = QWidget()
+        watchlist_layout = QVBoxLayout(self.watchlist_tab)
+        
+        self.watchlist_table = QTableWidget(0, 5)
+        self.watchlist_table.setHorizontalHeaderLabels(["交易对", "价格", "变化", "持仓", "最近事件"])
+        self.watchlist_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.Stretch)
+        self.watchlist_rows = {}  # 交易对 -> 行号
+        
+        watchlist_layout.addWidget(self.watchlist_table)
+        
         # 添加标签页
         self.tabs.addTab(self.price_chart_tab, "价格图表")
         self.tabs.addTab(self.indicator_tab, "技术指标")
         self.tabs.addTab(self.news_tab, "新闻与情感")
         self.tabs.addTab(self.rss_tab, "RSS新闻")
+        self.tabs.addTab(self.watchlist_tab, "监控列表")
         
         # 信号面板
         self.signal_panel = QGroupBox("交易信号")
@@ -766,6 +789,11 @@ class MainWindow(QMainWindow):
         save_chart_action.triggered.connect(self.save_chart)
         tools_menu.addAction(save_chart_action)
         
+        # 行情回放操作
+        replay_action = QAction("回放行情...", self)
+        replay_action.triggered.connect(self.start_replay)
+        tools_menu.addAction(replay_action)
+        
         # 查看终端输出操作
         view_logs_action = QAction("终端输出", self)
         view_logs_action.triggered.connect(self.toggle_log_panel)
@@ -808,6 +836,7 @@ class MainWindow(QMainWindow):
         self.tracker.trade_signal.connect(self.on_trade_signal)
         self.tracker.monitoring_error.connect(self.on_monitoring_error)
         self.tracker.news_processed.connect(self.on_news_processed)
+        self.tracker.news_stream_updated.connect(self.on_news_stream_updated)
         self.tracker.signal_status_updated.connect(self.on_signal_status_updated)
         self.tracker.chart_data_ready.connect(self.on_chart_data_ready)
         self.tracker.monitoring_started.connect(self.on_monitoring_started)
@@ -817,6 +846,10 @@ class MainWindow(QMainWindow):
         self.tracker.account_balance_updated.connect(self.on_account_balance_updated)
         self.tracker.rss_news_received.connect(self.on_rss_news_received)
         self.tracker.alert_triggered.connect(self.on_alert_triggered)
+        self.tracker.rate_budget_updated.connect(self.on_rate_budget_updated)
+        self.tracker.watchlist_price_updated.connect(self.on_watchlist_price_updated)
+        self.tracker.watchlist_trade_signal.connect(self.on_watchlist_trade_signal)
+        self.tracker.watchlist_stop_triggered.connect(self.on_watchlist_stop_triggered)
         
         # 连接图表点击事件
         self.price_chart_label.mousePressEvent = self.show_price_chart_fullsize
@@ -844,6 +877,7 @@ class MainWindow(QMainWindow):
             # 更新追踪器配置
             if hasattr(self, 'tracker') and self.tracker:
                 self.tracker.config = self.config
+                self.tracker.update_market_stream()
                 
             # 如果正在监控中，重新获取K线数据
             if self.start_button.text() != "开始监控":
@@ -873,6 +907,7 @@ class MainWindow(QMainWindow):
             # 更新追踪器配置
             if hasattr(self, 'tracker') and self.tracker:
                 self.tracker.config = self.config
+                self.tracker.update_market_stream()
                 
             # 如果正在监控中，重新获取数据
             if self.start_button.text() != "开始监控":
@@ -961,6 +996,35 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "监控错误", f"启动监控时发生错误: {str(e)}")
             logging.error(f"启动监控失败: {e}")
     
+    def start_replay(self):
+        """选择录制的价格日志或本地K线库，按指定速度回放"""
+        if self.start_button.text() != "开始监控":
+            QMessageBox.information(self, "行情回放", "请先停止当前监控")
+            return
+            
+        source_names = ["价格日志文件", "本地K线库（当前交易对和周期）"]
+        source_name, ok = QInputDialog.getItem(self, "行情回放", "回放数据:", source_names, 0, False)
+        if not ok:
+            return
+            
+        speeds = {"1x（原速）": 1.0, "100x": 100.0, "最快": None}
+        speed_name, ok = QInputDialog.getItem(self, "行情回放", "回放速度:", list(speeds), 1, False)
+        if not ok:
+            return
+            
+        source = None
+        if source_name == source_names[0]:
+            source, _ = QFileDialog.getOpenFileName(self, "选择价格日志", self.log_dir, "价格日志 (*.bin *.csv)")
+            if not source:
+                return
+                
+        self.tracker.charts_dir = self.charts_dir
+        if self.tracker.start_replay(source, speed=speeds[speed_name]):
+            self.start_button.setText("停止监控")
+            self.start_button.setStyleSheet("QPushButton { background-color: #f44336; color: white; }")
+            self.timer.start(1000)
+            self.statusBar.showMessage(f"正在回放行情 ({speed_name})")
+    
     def stop_monitoring(self):
         """停止监控逻辑"""
         # 停止UI更新计时器
@@ -1060,6 +1124,11 @@ class MainWindow(QMainWindow):
         self.statusBar.showMessage(f"错误: {error_message}")
     
     @pyqtSlot(str, str, float)
+    def on_news_stream_updated(self, partial_news, sentiment, score):
+        """流式新闻分析进行中：更新情感标签，摘要显示在同一行中逐步更新"""
+        self.on_news_processed(partial_news, sentiment, score)
+        self.streaming_news_row = self.news_table.rowCount() - 1
+    
     def on_news_processed(self, processed_news, sentiment, score):
         """处理新闻分析结果"""
         # 更新情感标签
@@ -1071,9 +1140,13 @@ class MainWindow(QMainWindow):
         
         self.sentiment_label.setText(f"{sentiment_text} ({score:.1f})")
         
-        # 添加新闻到表格
-        row = self.news_table.rowCount()
-        self.news_table.insertRow(row)
+        # 添加新闻到表格（流式分析时更新已显示的那一行）
+        if self.streaming_news_row is not None and self.streaming_news_row < self.news_table.rowCount():
+            row = self.streaming_news_row
+        else:
+            row = self.news_table.rowCount()
+            self.news_table.insertRow(row)
+        self.streaming_news_row = None
         
         time_item = QTableWidgetItem(datetime.now().strftime("%H:%M:%S"))
         news_item = QTableWidgetItem(processed_news)
@@ -1242,6 +1315,67 @@ class MainWindow(QMainWindow):
         # 更新状态栏
         self.statusBar.showMessage(f"已更新 {len(articles)} 条 RSS 新闻", 3000)
     
+    @pyqtSlot(int, int, float)
+    def on_rate_budget_updated(self, used, limit, multiplier):
+        """更新状态栏中的Binance请求权重预算"""
+        text = f"API权重: {used}/{limit}"
+        if multiplier > 1.0:
+            text += f"  轮询间隔 ×{multiplier:.1f}"
+        self.rate_budget_label.setText(text)
+        ratio = used / limit if limit else 0.0
+        color = '#d32f2f' if ratio >= 0.85 else '#f57c00' if ratio >= 0.6 or multiplier > 1.0 else '#388e3c'
+        self.rate_budget_label.setStyleSheet(f"color: {color};")
+    
+    def _watchlist_row(self, symbol):
+        """返回交易对在监控列表表格中的行号（不存在时新增一行）"""
+        row = self.watchlist_rows.get(symbol)
+        if row is None:
+            row = self.watchlist_table.rowCount()
+            self.watchlist_table.insertRow(row)
+            self.watchlist_table.setItem(row, 0, QTableWidgetItem(symbol))
+            for col in range(1, 5):
+                self.watchlist_table.setItem(row, col, QTableWidgetItem(""))
+            self.watchlist_rows[symbol] = row
+        return row
+    
+    @pyqtSlot(str, float, float)
+    def on_watchlist_price_updated(self, symbol, price, pct_change):
+        """更新监控列表中交易对的价格"""
+        row = self._watchlist_row(symbol)
+        self.watchlist_table.item(row, 1).setText(f"{price:.4f}")
+        change_item = self.watchlist_table.item(row, 2)
+        change_item.setText(f"{pct_change:+.2f}%")
+        change_item.setForeground(QBrush(QColor('#388e3c' if pct_change >= 0 else '#d32f2f')))
+    
+    @pyqtSlot(str, str, float)
+    def on_watchlist_trade_signal(self, symbol, signal_type, price):
+        """监控列表中交易对的买入/卖出信号"""
+        row = self._watchlist_row(symbol)
+        time_str = datetime.now().strftime("%H:%M:%S")
+        if signal_type == 'BUY':
+            self.watchlist_table.item(row, 3).setText(f"多头 @ {price:.4f}")
+            event = f"{time_str} 买入信号 @ {price:.4f}"
+        else:
+            self.watchlist_table.item(row, 3).setText("")
+            event = f"{time_str} 卖出信号 @ {price:.4f}"
+        event_item = self.watchlist_table.item(row, 4)
+        event_item.setText(event)
+        event_item.setForeground(QBrush(QColor('#388e3c' if signal_type == 'BUY' else '#d32f2f')))
+        self.statusBar.showMessage(f"{symbol} {event}", 5000)
+    
+    @pyqtSlot(str, str, float, float)
+    def on_watchlist_stop_triggered(self, symbol, stop_type, price, profit_percent):
+        """监控列表中交易对触发止盈止损"""
+        row = self._watchlist_row(symbol)
+        time_str = datetime.now().strftime("%H:%M:%S")
+        kind = "止损" if stop_type == 'STOP_LOSS' else "止盈"
+        event = f"{time_str} {kind}触发 @ {price:.4f} ({profit_percent:+.2f}%)"
+        self.watchlist_table.item(row, 3).setText("")
+        event_item = self.watchlist_table.item(row, 4)
+        event_item.setText(event)
+        event_item.setForeground(QBrush(QColor('#d32f2f' if stop_type == 'STOP_LOSS' else '#388e3c')))
+        self.statusBar.showMessage(f"{symbol} {event}", 5000)
+    
     @pyqtSlot(str, str, float)
     def on_alert_triggered(self, alert_type, message, value):
         """处理警报触发"""
@@ -1265,7 +1399,7 @@ class MainWindow(QMainWindow):
         self.toggle_log_panel()
 
     def send_report_to_telegram(self):
-        """发送当前报告到Telegram（在后台线程中执行）"""
+        """发送当前报告到Telegram（在I/O运行时中执行）"""
         # 检查是否已经生成报告
         if not hasattr(self, 'report_data') or not self.report_data:
             QMessageBox.warning(self, "无法发送", "请先生成报告再发送到Telegram")
@@ -1277,17 +1411,12 @@ class MainWindow(QMainWindow):
         self.stop_telegram_button.setEnabled(True)
         self.send_telegram_button.setEnabled(False)
         
-        # 设置中断标志
-        self.telegram_send_interrupted = False
-        
-        # 使用线程来执行发送操作，避免阻塞UI
-        import threading
-        self.telegram_thread = threading.Thread(target=self._send_telegram_report_thread)
-        self.telegram_thread.daemon = True
-        self.telegram_thread.start()
+        # 在I/O运行时中以协程发送，完成后经Qt信号回到UI线程
+        self.telegram_future = self.tracker.io.submit(self._send_telegram_report_async(),
+                                                      callback=self._on_telegram_report_done)
     
-    def _send_telegram_report_thread(self):
-        """在后台线程中执行Telegram发送操作"""
+    async def _send_telegram_report_async(self):
+        """在I/O运行时中执行Telegram发送操作（协程，取消即中断发送）"""
         try:
             # 获取报告文本内容
             report_text = self.report_data.get('text_report', '')
@@ -1312,7 +1441,7 @@ class MainWindow(QMainWindow):
                     raise Exception(f"Telegram Token或Chat ID未配置：Token={TELEGRAM_TOKEN}, Chat ID={TELEGRAM_CHAT_ID}")
                 
                 # 自定义发送消息函数，确保使用正确的TOKEN
-                def send_telegram_message(message):
+                async def send_telegram_message(message):
                     """发送文本消息到 Telegram, 自动处理长消息分割 (增加重试机制和错误处理)"""
                     url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
                     max_length = 4096
@@ -1352,28 +1481,26 @@ class MainWindow(QMainWindow):
                         retry_delay = 2
                         for attempt in range(max_retries):
                             try:
-                                # 增加超时时间，并使用更安全的 SSL 配置
-                                session = requests.Session()
-                                session.mount('https://', requests.adapters.HTTPAdapter(max_retries=3))
-                                response = session.post(url, data=payload, timeout=30, verify=True)
+                                # 使用共享连接池（保持连接，避免每次重新握手）
+                                response = await self.tracker.io.post(url, data=payload, timeout=30)
                                 response.raise_for_status()
                                 print(f"Telegram消息发送成功：状态码 {response.status_code}")
-                                if len(messages_to_send) > 1: time.sleep(0.5)
+                                if len(messages_to_send) > 1: await asyncio.sleep(0.5)
                                 break  # 成功发送，跳出重试循环
-                            except requests.exceptions.SSLError as e:
+                            except aiohttp.ClientSSLError as e:
                                 print(f"Telegram SSL错误 (尝试 {attempt+1}/{max_retries}): {e}")
                                 if attempt < max_retries - 1:
                                     print(f"等待 {retry_delay} 秒后重试...")
-                                    time.sleep(retry_delay)
+                                    await asyncio.sleep(retry_delay)
                                     retry_delay *= 2  # 指数退避策略
                                 else:
                                     print(f"Telegram SSL连接失败，已达最大重试次数")
                                     # 尝试备用通知方式，例如打印到控制台或记录到日志
                                     print(f"【重要通知】{msg_part}")
-                            except requests.exceptions.RequestException as e:
+                            except aiohttp.ClientError as e:
                                 print(f"Telegram通知失败 (尝试 {attempt+1}/{max_retries}): {e}")
                                 if attempt < max_retries - 1:
-                                    time.sleep(retry_delay)
+                                    await asyncio.sleep(retry_delay)
                                     retry_delay *= 2
                                 else:
                                     print(f"Telegram通知失败，已达最大重试次数")
@@ -1381,12 +1508,12 @@ class MainWindow(QMainWindow):
                             except Exception as e:
                                 print(f"发送Telegram时未知错误: {e}")
                                 if attempt < max_retries - 1:
-                                    time.sleep(retry_delay)
+                                    await asyncio.sleep(retry_delay)
                                 else:
                                     print(f"【重要通知】{msg_part}")
                 
                 # 自定义发送图片函数，确保使用正确的TOKEN
-                def send_telegram_photo(photo_path, caption=""):
+                async def send_telegram_photo(photo_path, caption=""):
                     """发送图片到 Telegram (增加重试机制和错误处理)"""
                     url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendPhoto"
                     print(f"准备发送Telegram图片: URL={url}")
@@ -1401,10 +1528,8 @@ class MainWindow(QMainWindow):
                                 files = {'photo': f}
                                 data = {'chat_id': TELEGRAM_CHAT_ID, 'caption': caption}
 
-                                # 使用会话和更安全的 SSL 配置
-                                session = requests.Session()
-                                session.mount('https://', requests.adapters.HTTPAdapter(max_retries=3))
-                                response = session.post(url, files=files, data=data, timeout=60, verify=True)
+                                # 使用共享连接池（保持连接，避免每次重新握手）
+                                response = await self.tracker.io.post(url, files=files, data=data, timeout=60)
                                 response.raise_for_status()
                                 print(f"成功发送图片: {os.path.basename(photo_path)}")
                                 return  # 成功发送，退出函数
@@ -1414,20 +1539,20 @@ class MainWindow(QMainWindow):
                             # 文件不存在不需要重试
                             return
 
-                        except requests.exceptions.SSLError as e:
+                        except aiohttp.ClientSSLError as e:
                             print(f"Telegram图片发送 SSL错误 (尝试 {attempt+1}/{max_retries}): {e}")
                             if attempt < max_retries - 1:
                                 print(f"等待 {retry_delay} 秒后重试...")
-                                time.sleep(retry_delay)
+                                await asyncio.sleep(retry_delay)
                                 retry_delay *= 2
                             else:
                                 print(f"Telegram图片发送 SSL连接失败，已达最大重试次数")
                                 print(f"无法发送图片: {os.path.basename(photo_path)}")
 
-                        except requests.exceptions.RequestException as e:
+                        except aiohttp.ClientError as e:
                             print(f"Telegram图片通知失败 (尝试 {attempt+1}/{max_retries}): {e}")
                             if attempt < max_retries - 1:
-                                time.sleep(retry_delay)
+                                await asyncio.sleep(retry_delay)
                                 retry_delay *= 2
                             else:
                                 print(f"Telegram图片通知失败，已达最大重试次数")
@@ -1435,55 +1560,40 @@ class MainWindow(QMainWindow):
                         except Exception as e:
                             print(f"发送Telegram图片未知错误: {e}")
                             if attempt < max_retries - 1:
-                                time.sleep(retry_delay)
+                                await asyncio.sleep(retry_delay)
                             else:
                                 print(f"发送图片失败: {os.path.basename(photo_path)}")
             except Exception as config_error:
                 raise Exception(f"获取Telegram配置失败: {config_error}")
             
-            # 检查中断标志
-            if self.telegram_send_interrupted:
-                self._update_telegram_status("已中断", "red")
-                return
-                
             # 发送文本报告
             if report_text:
-                send_telegram_message(report_text)
-            
-            # 检查中断标志
-            if self.telegram_send_interrupted:
-                self._update_telegram_status("已中断", "red")
-                return
+                await send_telegram_message(report_text)
                 
             # 发送价格图表
             if price_chart_path and os.path.exists(price_chart_path):
-                send_telegram_photo(price_chart_path, "SHELL/USDT 价格走势图")
-            
-            # 检查中断标志
-            if self.telegram_send_interrupted:
-                self._update_telegram_status("已中断", "red")
-                return
+                await send_telegram_photo(price_chart_path, "SHELL/USDT 价格走势图")
                 
             # 发送MACD图表
             if macd_chart_path and os.path.exists(macd_chart_path):
-                send_telegram_photo(macd_chart_path, "SHELL/USDT MACD技术指标")
-            elif report_text and not self.telegram_send_interrupted:
-                send_telegram_message("ℹ️ MACD 技术指标图因数据不足未生成。")
-            
-            # 完成发送后更新状态
-            if not self.telegram_send_interrupted:
-                self._update_telegram_status("发送成功", "green")
+                await send_telegram_photo(macd_chart_path, "SHELL/USDT MACD技术指标")
+            elif report_text:
+                await send_telegram_message("ℹ️ MACD 技术指标图因数据不足未生成。")
         except Exception as e:
-            # 发送失败更新状态
-            self._update_telegram_status("发送失败", "red")
             print(f"发送报告到Telegram失败: {str(e)}")
-        finally:
-            # 在UI线程中重置按钮状态
-            from PyQt5.QtCore import QMetaObject, Qt, Q_ARG
-            QMetaObject.invokeMethod(self.stop_telegram_button, "setEnabled", 
-                                   Qt.QueuedConnection, Q_ARG(bool, False))
-            QMetaObject.invokeMethod(self.send_telegram_button, "setEnabled", 
-                                   Qt.QueuedConnection, Q_ARG(bool, True))
+            raise
+    
+    def _on_telegram_report_done(self, result, error):
+        """Telegram发送结束（由I/O运行时经Qt信号在UI线程中回调）"""
+        self.telegram_future = None
+        if isinstance(error, concurrent.futures.CancelledError):
+            self._update_telegram_status("已中断", "red")
+        elif error is not None:
+            self._update_telegram_status("发送失败", "red")
+        else:
+            self._update_telegram_status("发送成功", "green")
+        self.stop_telegram_button.setEnabled(False)
+        self.send_telegram_button.setEnabled(True)
     
     def _update_telegram_status(self, status, color):
         """在UI线程中更新Telegram状态文本"""
@@ -1501,8 +1611,8 @@ class MainWindow(QMainWindow):
     
     def stop_telegram_sending(self):
         """中断Telegram发送过程"""
-        if hasattr(self, 'telegram_thread') and self.telegram_thread.is_alive():
-            self.telegram_send_interrupted = True
+        if self.telegram_future is not None and not self.telegram_future.done():
+            self.telegram_future.cancel()
             self.telegram_status.setText("正在中断...")
             self.telegram_status.setStyleSheet("color: #e67e22; font-size: 9px;")
 
@@ -1555,7 +1665,7 @@ class MainWindow(QMainWindow):
         self.tracker.log_dir = self.log_dir
                 
         # 调用追踪器的报告生成方法
-        self.report_data = self.tracker.generate_status_report()
+        self.report_data = self.tracker.scheduler.call('report', self.tracker.generate_status_report)
         
         if 'error' in self.report_data:
             QMessageBox.warning(self, "报告生成失败", self.report_data['error'])
@@ -2001,6 +2111,11 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'stderr_redirector') and hasattr(self.stderr_redirector, 'original_stream'):
             sys.stderr = self.stderr_redirector.original_stream
             
+        # 关闭后台任务线程池（不等待正在执行的任务）和I/O运行时
+        self.tracker.scheduler.shutdown(wait=False)
+        self.tracker.close_client()
+        self.tracker.io.stop()
+            
         # 记录应用关闭信息
         logging.info("应用程序正常关闭")
         
@@ -154,8 +154,13 @@ class SettingsDialog(QDialog):
         self.refresh_interval.setRange(5, 300)  # 5秒到5分钟
         self.refresh_interval.setSuffix(" 秒")
         
+        self.market_data_mode = QComboBox()
+        self.market_data_mode.addItem("REST轮询", "rest")
+        self.market_data_mode.addItem("WebSocket推送", "websocket")
+        
         time_form.addRow("监控持续时间:", self.duration)
         time_form.addRow("数据刷新间隔:", self.refresh_interval)
+        time_form.addRow("行情数据模式:", self.market_data_mode)
         
         # 提醒设置
         alert_group = QGroupBox("提醒设置")
@@ -277,6 +282,7 @@ class SettingsDialog(QDialog):
                     "monitoring": {
                         "duration_minutes": 120,
                         "refresh_interval_seconds": 15,
+                        "market_data_mode": "rest",
                         "price_alert_threshold": 1.0,
                         "news_query": "MyShell OR SHELL coin crypto",
                         "max_news_per_source": 3
@@ -330,6 +336,8 @@ class SettingsDialog(QDialog):
             # 监控设置
             self.duration.setValue(self.config["monitoring"]["duration_minutes"])
             self.refresh_interval.setValue(self.config["monitoring"]["refresh_interval_seconds"])
+            mode_index = self.market_data_mode.findData(self.config["monitoring"].get("market_data_mode", "rest"))
+            self.market_data_mode.setCurrentIndex(max(0, mode_index))
             self.price_alert.setValue(self.config["monitoring"]["price_alert_threshold"])
             self.news_query.setText(self.config["monitoring"]["news_query"])
             self.max_news.setValue(self.config["monitoring"]["max_news_per_source"])
@@ -387,6 +395,7 @@ class SettingsDialog(QDialog):
             # 监控设置
             self.config["monitoring"]["duration_minutes"] = self.duration.value()
             self.config["monitoring"]["refresh_interval_seconds"] = self.refresh_interval.value()
+            self.config["monitoring"]["market_data_mode"] = self.market_data_mode.currentData()
             self.config["monitoring"]["price_alert_threshold"] = self.price_alert.value()
             self.config["monitoring"]["news_query"] = self.news_query.text()
             self.config["monitoring"]["max_news_per_source"] = self.max_news.value()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from utils.clock import SYSTEM_CLOCK
+
+
+def normalize_headline(headline):
+    """标题归一化：合并空白并转为小写，使仅有格式差异的标题得到相同的键"""
+    return ' '.join(str(headline).split()).casefold()
+
+
+def analysis_key(headlines, template, model, **params):
+    """由归一化后的标题集合、提示词模板和模型计算稳定的内容哈希（跨进程一致）
+
+    Args:
+        headlines: 新闻标题列表（顺序和重复不影响结果）
+        template: 提示词模板
+        model: 模型名
+        **params: 其他影响结果的参数（如查询词、温度）
+    """
+    normalized = sorted({normalize_headline(h) for h in headlines})
+    payload = json.dumps({'model': model, 'template': template, 'params': params, 'headlines': normalized},
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """
+    持久化的LLM分析结果缓存
+
+    以内容哈希为键保存分析结果，写入磁盘后重启仍然有效。条目超过有效期即失效；
+    条目数或总大小超过上限时按最近最少使用（LRU）顺序淘汰。记录命中、未命中、
+    过期和淘汰次数。
+    """
+
+    def __init__(self, path=None, ttl=3600, max_entries=200, max_bytes=2 * 1024 * 1024, clock=None):
+        """
+        Args:
+            path: 缓存文件路径（JSON），None 表示只保存在内存中
+            ttl: 条目有效期（秒），None 表示永不过期
+            max_entries: 最大条目数
+            max_bytes: 全部条目序列化后的最大总字节数
+            clock: 时钟（utils.clock），None 表示系统时钟
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock or SYSTEM_CLOCK
+        self._entries = OrderedDict()  # 键 -> {'time', 'size', 'value'}，末尾为最近使用
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    def get(self, key):
+        """读取缓存结果，未命中或已过期时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self.ttl is not None and self.clock.time() - entry['time'] >= self.ttl:
+                self._remove(key)
+                self.expired += 1
+                self.misses += 1
+                self._dirty = True
+                return None
+            self._entries.move_to_end(key)
+            self._dirty = True
+            self.hits += 1
+            return entry['value']
+
+    def put(self, key, value):
+        """写入结果（值需可JSON序列化），必要时淘汰最久未使用的条目，并保存到磁盘"""
+        size = len(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {'time': self.clock.time(), 'size': size, 'value': value}
+            self._total_bytes += size
+            self._evict()
+            self._dirty = True
+        self.save()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry['size']
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            self._dirty = True
+        self.save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """返回缓存统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def load(self):
+        """从磁盘读取缓存（文件损坏时忽略），按保存时的使用顺序恢复"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                self._entries.clear()
+                self._total_bytes = 0
+                for key, entry in data.get('entries', []):
+                    self._entries[key] = entry
+                    self._total_bytes += entry['size']
+                self._evict()
+                self._dirty = False
+        except Exception as e:
+            print(f"读取分析缓存失败，将重新分析: {str(e)}")
+
+    def save(self):
+        """有改动时写入磁盘（先写临时文件再替换）"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {'entries': list(self._entries.items())}
+            self._dirty = False
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+from utils.indicators import compute_indicators_vectorized
+
+# 与 ShellTrackerCore.check_signals / check_stop_conditions 一致的默认参数
+DEFAULT_PARAMS = {
+    'ma_fast': 5,
+    'ma_slow': 25,
+    'rsi_window': 14,
+    'rsi_threshold': 50.0,
+    'macd_fast': 12,
+    'macd_slow': 26,
+    'macd_signal': 9,
+    'buy_threshold': 0.6,
+    'sell_threshold': -0.6,
+    'stop_loss_percent': 5.0,
+    'take_profit_percent': 10.0,
+    'sentiment_influence_enabled': True,
+    'sentiment_influence_weight': 0.5,
+}
+
+# check_signals 要求的最少K线数
+MIN_BARS = 26
+
+# 指标参数（改变这些参数需要重新计算指标）
+INDICATOR_PARAM_KEYS = ('ma_fast', 'ma_slow', 'rsi_window', 'macd_fast', 'macd_slow', 'macd_signal')
+
+
+def params_from_config(config):
+    """从应用配置中提取回测参数，未配置的项使用默认值"""
+    params = dict(DEFAULT_PARAMS)
+    trading = config.get('trading', {})
+    for key in ('stop_loss_percent', 'take_profit_percent',
+                'sentiment_influence_enabled', 'sentiment_influence_weight'):
+        if key in trading:
+            params[key] = trading[key]
+    return params
+
+
+def compute_signals(indicators, params, sentiment=None):
+    """对每根K线一次性计算 check_signals 的买入/卖出判定
+
+    Args:
+        indicators: 列名 -> numpy数组（ma5, ma25, rsi, macd, macd_signal）
+        params: 回测参数
+        sentiment: None（无情感数据）、常数或与K线等长的情感分数数组
+
+    Returns:
+        tuple: (买入布尔数组, 卖出布尔数组)
+    """
+    ma5, ma25, rsi = indicators['ma5'], indicators['ma25'], indicators['rsi']
+    macd, sig = indicators['macd'], indicators['macd_signal']
+    n = len(ma5)
+
+    buy = np.zeros(n, dtype=bool)
+    sell = np.zeros(n, dtype=bool)
+    if n < MIN_BARS:
+        return buy, sell
+
+    cur = slice(1, n)
+    prev = slice(0, n - 1)
+
+    valid = np.ones(n - 1, dtype=bool)
+    for arr in (ma5, ma25, rsi, macd, sig):
+        valid &= ~np.isnan(arr[cur])
+    for arr in (ma5, ma25, macd, sig):
+        valid &= ~np.isnan(arr[prev])
+
+    with np.errstate(invalid='ignore'):
+        buy_tech = (ma5[prev] <= ma25[prev]) & (ma5[cur] > ma25[cur]) & \
+            (rsi[cur] < params['rsi_threshold']) & \
+            (macd[prev] <= sig[prev]) & (macd[cur] > sig[cur])
+        sell_tech = (ma5[prev] >= ma25[prev]) & (ma5[cur] < ma25[cur]) & \
+            (rsi[cur] > params['rsi_threshold']) & \
+            (macd[prev] >= sig[prev]) & (macd[cur] < sig[cur])
+
+    # 情感因素
+    sentiment_factor = np.zeros(n - 1)
+    if params['sentiment_influence_enabled'] and sentiment is not None:
+        sentiment_arr = np.broadcast_to(np.asarray(sentiment, dtype=float), (n,))[cur]
+        sentiment_factor = np.nan_to_num(sentiment_arr) * params['sentiment_influence_weight']
+
+    buy_score = buy_tech.astype(float) + sentiment_factor
+    sell_score = -sell_tech.astype(float) - sentiment_factor
+
+    buy_hit = valid & (buy_score >= params['buy_threshold'])
+    sell_hit = valid & ~buy_hit & (sell_score <= params['sell_threshold'])
+
+    # check_signals 在少于 MIN_BARS 根K线时不产生信号
+    buy_hit[:MIN_BARS - 2] = False
+    sell_hit[:MIN_BARS - 2] = False
+
+    buy[1:] = buy_hit
+    sell[1:] = sell_hit
+    return buy, sell
+
+
+def _first_true(condition, start, n):
+    """从 start 开始查找 condition(lo, hi) 中第一个为True的位置，分块扩大搜索范围"""
+    step = 256
+    while start < n:
+        end = min(n, start + step)
+        hits = np.flatnonzero(condition(start, end))
+        if hits.size:
+            return start + int(hits[0])
+        start = end
+        step *= 2
+    return -1
+
+
+def _prepare(data):
+    """将DataFrame或KlineStore列数据统一为 (时间索引, 收盘, 最高, 最低) 数组"""
+    if isinstance(data, pd.DataFrame):
+        close = data['close'].to_numpy(dtype=float)
+        high = data['high'].to_numpy(dtype=float) if 'high' in data else close
+        low = data['low'].to_numpy(dtype=float) if 'low' in data else close
+        times = data.index
+    else:
+        close = np.asarray(data['close'], dtype=float)
+        high = np.asarray(data.get('high', close), dtype=float)
+        low = np.asarray(data.get('low', close), dtype=float)
+        times = pd.to_datetime(np.asarray(data['open_time']), unit='ms') if 'open_time' in data \
+            else pd.RangeIndex(len(close))
+    return times, close, high, low
+
+
+def run_backtest(data, params=None, sentiment=None, indicators=None,
+                 intrabar_stops=False, fee_percent=0.0, initial_capital=1.0):
+    """对K线历史回测实时监控中的交易逻辑
+
+    与监控循环的行为一致：空仓时出现买入信号则以该K线收盘价入场；持仓期间
+    只由止盈止损平仓（监控循环不会根据卖出信号平仓）；平仓的K线不再检查买入信号。
+    默认以每根K线收盘价作为价格tick检查止盈止损。
+
+    Args:
+        data: K线DataFrame（get_klines 的结果）或 KlineStore.load 返回的列字典
+        params: 回测参数，缺省项取 DEFAULT_PARAMS
+        sentiment: None、常数或逐K线的情感分数数组
+        indicators: 预先计算好的指标（列名 -> 数组），None时自动计算
+        intrabar_stops: 为True时用K线最高/最低价判断止盈止损，并按触发价成交
+        fee_percent: 单边手续费百分比
+        initial_capital: 初始资金
+
+    Returns:
+        dict: trades（交易列表）、equity（资金曲线 Series）、stats（统计）、signals（买卖信号数组）
+    """
+    p = dict(DEFAULT_PARAMS)
+    if params:
+        p.update(params)
+
+    times, close, high, low = _prepare(data)
+    n = len(close)
+
+    if indicators is None:
+        indicators = compute_indicators_vectorized(
+            close, **{k: int(p[k]) for k in INDICATOR_PARAM_KEYS}
+        )
+    buy, sell = compute_signals(indicators, p, sentiment)
+
+    sl_ratio = 1 - p['stop_loss_percent'] / 100
+    tp_ratio = 1 + p['take_profit_percent'] / 100
+    fee = fee_percent / 100
+
+    buy_idx = np.flatnonzero(buy)
+    held = np.zeros(n, dtype=bool)
+    exit_returns = {}  # 平仓K线 -> 相对上一根收盘价的收益（盘中止盈止损时使用）
+    entries = []
+    exits = []
+    trades = []
+
+    next_allowed = 0
+    while True:
+        k = np.searchsorted(buy_idx, next_allowed)
+        if k >= len(buy_idx):
+            break
+        entry = int(buy_idx[k])
+        entry_price = close[entry]
+        sl_price = entry_price * sl_ratio
+        tp_price = entry_price * tp_ratio
+
+        if intrabar_stops:
+            exit_bar = _first_true(lambda lo, hi: (low[lo:hi] <= sl_price) | (high[lo:hi] >= tp_price), entry + 1, n)
+        else:
+            exit_bar = _first_true(lambda lo, hi: (close[lo:hi] <= sl_price) | (close[lo:hi] >= tp_price), entry + 1, n)
+
+        entries.append(entry)
+        if exit_bar == -1:
+            held[entry + 1:] = True
+            trades.append({
+                'entry_time': times[entry], 'entry_price': float(entry_price),
+                'exit_time': None, 'exit_price': float(close[-1]), 'exit_type': 'OPEN',
+                'return_percent': float(((close[-1] * (1 - fee)) / (entry_price * (1 + fee)) - 1) * 100),
+                'bars': n - 1 - entry,
+            })
+            break
+
+        if intrabar_stops:
+            if low[exit_bar] <= sl_price:
+                exit_type, exit_price = 'STOP_LOSS', sl_price
+            else:
+                exit_type, exit_price = 'TAKE_PROFIT', tp_price
+            exit_returns[exit_bar] = exit_price / close[exit_bar - 1] - 1
+        else:
+            exit_price = close[exit_bar]
+            exit_type = 'STOP_LOSS' if exit_price <= sl_price else 'TAKE_PROFIT'
+
+        held[entry + 1:exit_bar + 1] = True
+        exits.append(exit_bar)
+        trades.append({
+            'entry_time': times[entry], 'entry_price': float(entry_price),
+            'exit_time': times[exit_bar], 'exit_price': float(exit_price), 'exit_type': exit_type,
+            'return_percent': float(((exit_price * (1 - fee)) / (entry_price * (1 + fee)) - 1) * 100),
+            'bars': exit_bar - entry,
+        })
+        next_allowed = exit_bar + 1
+
+    # 资金曲线（逐K线盯市）
+    bar_returns = np.zeros(n)
+    if n > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bar_returns[1:] = np.nan_to_num(close[1:] / close[:-1] - 1)
+    strategy_returns = np.where(held, bar_returns, 0.0)
+    for bar, ret in exit_returns.items():
+        strategy_returns[bar] = ret
+    growth = 1 + strategy_returns
+    if fee:
+        growth[np.array(entries, dtype=int)] *= (1 - fee)
+        if exits:
+            growth[np.array(exits, dtype=int)] *= (1 - fee)
+    equity = initial_capital * np.cumprod(growth)
+
+    return {
+        'trades': trades,
+        'equity': pd.Series(equity, index=times),
+        'stats': _compute_stats(trades, equity, initial_capital),
+        'signals': {'buy': buy, 'sell': sell},
+    }
+
+
+def _compute_stats(trades, equity, initial_capital):
+    """计算回测统计指标"""
+    closed = [t for t in trades if t['exit_type'] != 'OPEN']
+    returns = np.array([t['return_percent'] for t in closed])
+
+    if len(equity):
+        peak = np.maximum.accumulate(equity)
+        max_drawdown = float(((equity - peak) / peak).min() * 100)
+        total_return = float((equity[-1] / initial_capital - 1) * 100)
+    else:
+        max_drawdown = 0.0
+        total_return = 0.0
+
+    gains = returns[returns > 0].sum() if returns.size else 0.0
+    losses = -returns[returns < 0].sum() if returns.size else 0.0
+
+    return {
+        'total_return_percent': total_return,
+        'max_drawdown_percent': max_drawdown,
+        'num_trades': len(trades),
+        'closed_trades': len(closed),
+        'win_rate': float((returns > 0).mean() * 100) if returns.size else 0.0,
+        'avg_trade_percent': float(returns.mean()) if returns.size else 0.0,
+        'profit_factor': float(gains / losses) if losses > 0 else (float('inf') if gains > 0 else 0.0),
+        'stop_loss_count': sum(1 for t in closed if t['exit_type'] == 'STOP_LOSS'),
+        'take_profit_count': sum(1 for t in closed if t['exit_type'] == 'TAKE_PROFIT'),
+    }
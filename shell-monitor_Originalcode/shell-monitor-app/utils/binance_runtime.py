@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import inspect
+import threading
+import contextvars
+from urllib.parse import urlsplit
+
+import aiohttp
+from binance.async_client import AsyncClient
+
+# 当前调用用来保存响应的字典（每个协程任务有自己的上下文，并发调用互不干扰）
+_current_call = contextvars.ContextVar('binance_call', default=None)
+
+
+async def _on_request_end(session, context, params):
+    call = _current_call.get()
+    if call is not None:
+        call['response'] = params.response
+
+
+class RuntimeBinanceClient:
+    """
+    在 IoRuntime 事件循环中运行的Binance REST客户端
+
+    内部是 python-binance 的 AsyncClient（aiohttp 会话建立在 I/O 事件循环上，连接保持复用），
+    对外提供与 binance.client.Client 相同的同步方法：每次调用都作为协程提交到事件循环，
+    调用线程只等待结果。请求带超时，可用 runtime.cancel(tag) 一起取消，
+    耗时和失败次数计入 IoRuntime 的主机统计。
+
+    AsyncClient.response 由所有并发请求共用，这里通过 aiohttp 的请求跟踪记录每次调用自己的
+    最后一个响应，response 属性返回当前线程最近一次调用的响应（供 GovernedClient 读取已用权重）。
+    """
+
+    def __init__(self, runtime, api_key=None, api_secret=None, timeout=30, history_timeout=300, tag='binance'):
+        """
+        Args:
+            runtime: IoRuntime
+            api_key: API密钥
+            api_secret: API密钥Secret
+            timeout: 单次调用的超时时间（秒）
+            history_timeout: 分页拉取历史K线（get_historical_klines 等）的超时时间（秒）
+            tag: 提交任务时使用的分组名
+        """
+        self.runtime = runtime
+        self.timeout = timeout
+        self.history_timeout = history_timeout
+        self.tag = tag
+        self._local = threading.local()
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_end.append(_on_request_end)
+
+        async def create():
+            return AsyncClient(api_key, api_secret, loop=asyncio.get_running_loop(),
+                               session_params={'trace_configs': [trace]})
+
+        self._client = runtime.run(create())
+        self.host = urlsplit(self._client.API_URL).netloc
+
+    @property
+    def response(self):
+        """当前线程最近一次调用收到的响应"""
+        return getattr(self._local, 'response', None)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith('_') or not inspect.iscoroutinefunction(attr):
+            return attr
+
+        timeout = self.history_timeout if name.startswith('get_historical') else self.timeout
+
+        def call(*args, **kwargs):
+            record = {}
+
+            async def run():
+                _current_call.set(record)
+                return await self.runtime.measure(self.host, attr(*args, **kwargs))
+
+            try:
+                return self.runtime.run(run(), timeout=timeout, tag=self.tag)
+            finally:
+                self._local.response = record.get('response')
+
+        return call
+
+    def close(self):
+        """关闭 aiohttp 会话"""
+        try:
+            self.runtime.run(self._client.close_connection(), timeout=5)
+        except Exception as e:
+            print(f"关闭Binance会话失败: {str(e)}")
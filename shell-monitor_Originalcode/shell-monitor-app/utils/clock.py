@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from datetime import datetime
+
+
+class SystemClock:
+    """系统时钟：直接使用 datetime.now() / time.time() / time.sleep()"""
+
+    def now(self):
+        return datetime.now()
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    虚拟时钟
+
+    sleep() 不真正等待，而是把虚拟时间向前推进，监控循环、新闻定时和缓存过期
+    因此可以在几秒内走完数小时的时间线，而各处看到的时间间隔与真实运行完全一致。
+    多个线程共用同一个虚拟时钟时，任何一个线程的 sleep 都会推进全部时间。
+    """
+
+    def __init__(self, start=None):
+        """
+        Args:
+            start: 起始时间（datetime 或 Unix 秒），None 表示当前系统时间
+        """
+        if start is None:
+            start = time.time()
+        elif isinstance(start, datetime):
+            start = start.timestamp()
+        self._time = float(start)
+        self._lock = threading.Lock()
+
+    def now(self):
+        return datetime.fromtimestamp(self.time())
+
+    def time(self):
+        with self._lock:
+            return self._time
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """将虚拟时间推进 seconds 秒"""
+        if seconds > 0:
+            with self._lock:
+                self._time += seconds
+
+    def set_time(self, timestamp):
+        """设置虚拟时间（datetime 或 Unix 秒），不允许倒退"""
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        with self._lock:
+            self._time = max(self._time, float(timestamp))
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+
+SENTIMENT_PATTERN = re.compile(r"^\s*情感\s*:\s*(positive|negative|neutral)\s*$", re.IGNORECASE | re.MULTILINE)
+SCORE_PATTERN = re.compile(r"^\s*情感分数\s*:\s*(-?\d+(\.\d+)?)\s*$", re.IGNORECASE | re.MULTILINE)
+ITEMS_PATTERN = re.compile(r"^\s*逐条分数\s*:(.*?)(?=^\s*中文摘要\s*:|\Z)", re.MULTILINE | re.DOTALL)
+ITEM_PATTERN = re.compile(r"^\s*(\d+)\s*[:：.、]\s*(-?\d+(?:\.\d+)?)\s*$", re.MULTILINE)
+SUMMARY_PATTERN = re.compile(r"^\s*中文摘要\s*:(.*)", re.IGNORECASE | re.MULTILINE | re.DOTALL)
+SUMMARY_TRAILER_PATTERN = re.compile(r"\n\s*(分析理由|情感|情感分数|逐条分数)\s*:.*", re.IGNORECASE | re.DOTALL)
+
+
+class SseDecoder:
+    """
+    Server-Sent Events 解码器
+
+    逐行输入响应体（不含换行符），遇到空行时返回该事件的 data（多行 data 以换行连接），
+    其余时候返回 None。注释行和 data 以外的字段被忽略。
+    """
+
+    def __init__(self):
+        self._data = []
+
+    def feed(self, line):
+        if line == '':
+            return self.flush()
+        if line.startswith(':'):
+            return None
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        if field == 'data':
+            self._data.append(value)
+        return None
+
+    def flush(self):
+        """返回尚未结束的事件数据（流结束时调用），没有则返回 None"""
+        if not self._data:
+            return None
+        data = '\n'.join(self._data)
+        self._data = []
+        return data
+
+
+class AnalysisParser:
+    """
+    DeepSeek分析结果的增量解析器
+
+    文本可以分多次 feed()：情感、情感分数和逐条分数的每一行在完整出现（遇到换行）时
+    立即解析，中文摘要随文本逐步增长。全部文本到达后调用 finish() 解析最后一行。
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.sentiment = None
+        self.score = None
+        self.item_scores = {}  # 编号（从1开始） -> 分数
+        self.summary = None
+        self._parsed_end = 0
+
+    def feed(self, chunk):
+        """追加一段文本
+
+        Returns:
+            bool: 情感、分数、逐条分数或摘要是否有更新
+        """
+        self.text += chunk
+        return self._parse(self.text.rfind('\n') + 1)
+
+    def finish(self):
+        """文本结束，解析最后一行不完整的内容"""
+        return self._parse(len(self.text))
+
+    def _parse(self, complete_end):
+        changed = False
+        if complete_end > self._parsed_end:
+            self._parsed_end = complete_end
+            complete = self.text[:complete_end]
+
+            if self.sentiment is None:
+                match = SENTIMENT_PATTERN.search(complete)
+                if match:
+                    self.sentiment = match.group(1).lower()
+                    changed = True
+
+            if self.score is None:
+                match = SCORE_PATTERN.search(complete)
+                if match:
+                    self.score = max(-1.0, min(1.0, float(match.group(1))))
+                    changed = True
+
+            match = ITEMS_PATTERN.search(complete)
+            if match:
+                for index, value in ITEM_PATTERN.findall(match.group(1)):
+                    value = max(-1.0, min(1.0, float(value)))
+                    if self.item_scores.get(int(index)) != value:
+                        self.item_scores[int(index)] = value
+                        changed = True
+
+        match = SUMMARY_PATTERN.search(self.text)
+        if match:
+            summary = SUMMARY_TRAILER_PATTERN.sub("", match.group(1).strip())
+            if summary != self.summary:
+                self.summary = summary
+                changed = True
+        return changed
+
+    def headline_scores(self, count):
+        """按标题顺序返回逐条分数（缺失的条目使用整体分数），还没有任何分数时返回 None"""
+        if self.score is None and not self.item_scores:
+            return None
+        default = self.score if self.score is not None else 0.0
+        return [self.item_scores.get(i, default) for i in range(1, count + 1)]
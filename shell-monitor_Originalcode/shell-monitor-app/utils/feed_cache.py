@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import threading
+from datetime import datetime
+
+
+class FeedCache:
+    """
+    RSS源缓存
+
+    为每个源保存 ETag / Last-Modified，用于发送条件请求（未更新时服务器返回304，
+    无需下载和解析）；记录已经处理过的条目ID，只有新条目才会被解析、匹配关键词并参与
+    情感分析；并保留每个源最近的相关文章，写入磁盘后重启也能直接显示。
+    """
+
+    def __init__(self, path=None, max_seen=500, max_articles=20):
+        """
+        Args:
+            path: 缓存文件路径（JSON），None 表示只保存在内存中
+            max_seen: 每个源保留的已处理条目ID数
+            max_articles: 每个源保留的相关文章数
+        """
+        self.path = path
+        self.max_seen = max_seen
+        self.max_articles = max_articles
+        self.feeds = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def _feed(self, url):
+        feed = self.feeds.get(url)
+        if feed is None:
+            feed = {'etag': None, 'last_modified': None, 'seen': {}, 'articles': []}
+            self.feeds[url] = feed
+        return feed
+
+    @staticmethod
+    def entry_id(entry):
+        """条目的唯一标识：guid，其次链接，最后标题"""
+        return entry.get('id') or entry.get('link') or entry.get('title', '')
+
+    def conditional_headers(self, url):
+        """返回该源的条件请求头（If-None-Match / If-Modified-Since）"""
+        with self._lock:
+            feed = self.feeds.get(url)
+            headers = {}
+            if feed is not None:
+                if feed['etag']:
+                    headers['If-None-Match'] = feed['etag']
+                if feed['last_modified']:
+                    headers['If-Modified-Since'] = feed['last_modified']
+            return headers
+
+    def update_validators(self, url, headers):
+        """从响应头中保存 ETag / Last-Modified"""
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        with self._lock:
+            feed = self._feed(url)
+            if (etag, last_modified) != (feed['etag'], feed['last_modified']):
+                feed['etag'] = etag
+                feed['last_modified'] = last_modified
+                self._dirty = True
+
+    def is_seen(self, url, entry_id):
+        with self._lock:
+            feed = self.feeds.get(url)
+            return feed is not None and entry_id in feed['seen']
+
+    def mark_seen(self, url, entry_ids):
+        """记录已处理的条目ID（超出上限时丢弃最早的记录）"""
+        with self._lock:
+            seen = self._feed(url)['seen']
+            for entry_id in entry_ids:
+                if entry_id not in seen:
+                    seen[entry_id] = True
+                    self._dirty = True
+            while len(seen) > self.max_seen:
+                del seen[next(iter(seen))]
+
+    def add_articles(self, url, articles):
+        """保存新的相关文章（按时间倒序保留最近 max_articles 篇）"""
+        if not articles:
+            return
+        with self._lock:
+            feed = self._feed(url)
+            feed['articles'] = sorted(articles + feed['articles'], key=lambda a: a['time'], reverse=True)[:self.max_articles]
+            self._dirty = True
+
+    def recent_articles(self, urls=None, per_feed=None):
+        """返回缓存的相关文章（按时间倒序）
+
+        Args:
+            urls: 只返回这些源的文章，None 表示全部
+            per_feed: 每个源最多返回的文章数
+        """
+        with self._lock:
+            articles = []
+            for url in (self.feeds if urls is None else urls):
+                feed = self.feeds.get(url)
+                if feed is not None:
+                    articles.extend(feed['articles'][:per_feed])
+        articles.sort(key=lambda a: a['time'], reverse=True)
+        return [dict(a) for a in articles]
+
+    def load(self):
+        """从磁盘读取缓存（文件损坏时忽略）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            feeds = {}
+            for url, feed in data.get('feeds', {}).items():
+                articles = []
+                for article in feed.get('articles', []):
+                    article = dict(article)
+                    article['time'] = datetime.fromisoformat(article['time'])
+                    articles.append(article)
+                feeds[url] = {
+                    'etag': feed.get('etag'),
+                    'last_modified': feed.get('last_modified'),
+                    'seen': dict.fromkeys(feed.get('seen', []), True),
+                    'articles': articles,
+                }
+            with self._lock:
+                self.feeds = feeds
+                self._dirty = False
+        except Exception as e:
+            print(f"读取RSS缓存失败，将重新获取: {str(e)}")
+
+    def save(self):
+        """有改动时写入磁盘（先写临时文件再替换，避免中途退出导致文件损坏）"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {'feeds': {
+                url: {
+                    'etag': feed['etag'],
+                    'last_modified': feed['last_modified'],
+                    'seen': list(feed['seen']),
+                    'articles': [dict(a, time=a['time'].isoformat()) for a in feed['articles']],
+                }
+                for url, feed in self.feeds.items()
+            }}
+            self._dirty = False
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import math
+from bisect import bisect_left
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# 指标列名，与 ShellTrackerCore.get_klines 生成的DataFrame列一致
+INDICATOR_COLUMNS = ['ma5', 'ma25', 'rsi', 'macd', 'macd_signal', 'macd_diff', 'volatility']
+
+# 累计和/方差每提交多少次重新精确计算一次，消除浮点误差累积
+_RESYNC_EVERY = 1000
+
+NAN = float('nan')
+
+
+class _RollingMean:
+    """滑动窗口均值（运行和），对应 ta.trend.sma_indicator"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window - 1)  # 已确认的最近 window-1 个值
+        self.total = 0.0
+        self.commits = 0
+
+    def peek(self, x):
+        """以 x 作为最新值计算均值，不改变状态"""
+        if len(self.values) < self.window - 1:
+            return NAN
+        return (self.total + x) / self.window
+
+    def commit(self, x):
+        if self.window == 1:
+            return
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        self.commits += 1
+        if self.commits % _RESYNC_EVERY == 0:
+            self.total = math.fsum(self.values)
+
+
+class _Ema:
+    """指数移动平均（adjust=False），与 pandas ewm 的递推方式一致"""
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = None
+        self.count = 0
+
+    def peek_raw(self, x):
+        """返回 (未屏蔽的EMA值, 观测数)"""
+        if self.value is None:
+            return x, 1
+        return (1 - self.alpha) * self.value + self.alpha * x, self.count + 1
+
+    def peek(self, x):
+        value, count = self.peek_raw(x)
+        return value if count >= self.min_periods else NAN
+
+    def commit(self, x):
+        self.value, self.count = self.peek_raw(x)
+
+
+class _RollingStd:
+    """滑动窗口样本标准差（Welford增删），对应 rolling(window).std()"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window - 1)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.commits = 0
+
+    @staticmethod
+    def _add(n, mean, m2, x):
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+        return n, mean, m2
+
+    @staticmethod
+    def _remove(n, mean, m2, x):
+        if n <= 1:
+            return 0, 0.0, 0.0
+        n -= 1
+        delta = x - mean
+        mean -= delta / n
+        m2 -= delta * (x - mean)
+        return n, mean, m2
+
+    def peek(self, x):
+        if len(self.values) < self.window - 1:
+            return NAN
+        n, mean, m2 = self._add(len(self.values), self.mean, self.m2, x)
+        return math.sqrt(max(m2, 0.0) / (n - 1))
+
+    def commit(self, x):
+        n = len(self.values)
+        mean, m2 = self.mean, self.m2
+        if n == self.values.maxlen:
+            n, mean, m2 = self._remove(n, mean, m2, self.values[0])
+        self.values.append(x)
+        n, self.mean, self.m2 = self._add(n, mean, m2, x)
+        self.commits += 1
+        if self.commits % _RESYNC_EVERY == 0:
+            self._resync()
+
+    def _resync(self):
+        n, mean, m2 = 0, 0.0, 0.0
+        for v in self.values:
+            n, mean, m2 = self._add(n, mean, m2, v)
+        self.mean, self.m2 = mean, m2
+
+
+class IndicatorEngine:
+    """
+    流式技术指标引擎
+
+    每根新K线或最后一根K线的修订只需常数时间更新，结果与原先基于 ta 库的
+    全序列计算一致：MA5/MA25、RSI(14, Wilder平滑)、MACD(12, 26, 9)
+    以及20周期收益率标准差（波动率，百分比）。
+
+    已收盘的K线会被"确认"进入各指标状态；最后一根K线保持待定，
+    同一开盘时间再次更新时只重新计算这一根。
+    """
+
+    def __init__(self, ma_fast=5, ma_slow=25, rsi_window=14,
+                 macd_fast=12, macd_slow=26, macd_signal=9, volatility_window=20):
+        self.params = {
+            'ma_fast': ma_fast, 'ma_slow': ma_slow, 'rsi_window': rsi_window,
+            'macd_fast': macd_fast, 'macd_slow': macd_slow, 'macd_signal': macd_signal,
+            'volatility_window': volatility_window
+        }
+        self.reset()
+
+    def reset(self):
+        """清空全部状态"""
+        p = self.params
+        self._ma_fast = _RollingMean(p['ma_fast'])
+        self._ma_slow = _RollingMean(p['ma_slow'])
+        self._rsi_up = _Ema(1 / p['rsi_window'], p['rsi_window'])
+        self._rsi_down = _Ema(1 / p['rsi_window'], p['rsi_window'])
+        self._ema_fast = _Ema(2 / (p['macd_fast'] + 1), p['macd_fast'])
+        self._ema_slow = _Ema(2 / (p['macd_slow'] + 1), p['macd_slow'])
+        self._macd_signal = _Ema(2 / (p['macd_signal'] + 1), p['macd_signal'])
+        self._volatility = _RollingStd(p['volatility_window'])
+
+        self._prev_close = None  # 最后一根已确认K线的收盘价
+        self._pending = None  # 待定K线 (开盘时间, 收盘价)
+
+        self.open_times = []
+        self.values = {col: [] for col in INDICATOR_COLUMNS}
+
+    def _commit_pending(self):
+        """将待定K线确认进入各指标状态"""
+        _, close = self._pending
+        self._ma_fast.commit(close)
+        self._ma_slow.commit(close)
+
+        diff = NAN if self._prev_close is None else close - self._prev_close
+        self._rsi_up.commit(diff if diff > 0 else 0.0)
+        self._rsi_down.commit(-diff if diff < 0 else 0.0)
+
+        macd = self._macd_value(close)
+        self._ema_fast.commit(close)
+        self._ema_slow.commit(close)
+        if not math.isnan(macd):
+            self._macd_signal.commit(macd)
+
+        if self._prev_close is not None and self._prev_close != 0:
+            self._volatility.commit(close / self._prev_close - 1)
+
+        self._prev_close = close
+
+    def _macd_value(self, close):
+        fast = self._ema_fast.peek(close)
+        slow = self._ema_slow.peek(close)
+        return fast - slow
+
+    def _compute(self, close):
+        """基于已确认状态计算以 close 收盘的待定K线的指标值"""
+        result = {
+            'ma5': self._ma_fast.peek(close),
+            'ma25': self._ma_slow.peek(close),
+        }
+
+        diff = NAN if self._prev_close is None else close - self._prev_close
+        up = self._rsi_up.peek(diff if diff > 0 else 0.0)
+        down = self._rsi_down.peek(-diff if diff < 0 else 0.0)
+        if math.isnan(up) or math.isnan(down):
+            result['rsi'] = NAN
+        elif down == 0:
+            result['rsi'] = 100.0
+        else:
+            result['rsi'] = 100 - (100 / (1 + up / down))
+
+        macd = self._macd_value(close)
+        signal = NAN if math.isnan(macd) else self._macd_signal.peek(macd)
+        result['macd'] = macd
+        result['macd_signal'] = signal
+        result['macd_diff'] = macd - signal
+
+        if self._prev_close is None or self._prev_close == 0:
+            result['volatility'] = NAN
+        else:
+            result['volatility'] = self._volatility.peek(close / self._prev_close - 1) * 100
+        return result
+
+    def update(self, open_time, close):
+        """输入一根新K线或修订最后一根K线
+
+        Args:
+            open_time: K线开盘时间（毫秒）
+            close: 收盘价
+
+        Returns:
+            dict: 该K线的各指标值（不可用时为NaN）
+        """
+        close = float(close)
+        if self._pending is not None:
+            if open_time < self._pending[0]:
+                raise ValueError(f"K线时间倒序: {open_time} < {self._pending[0]}")
+            if open_time > self._pending[0]:
+                self._commit_pending()
+                self.open_times.append(open_time)
+                for col in INDICATOR_COLUMNS:
+                    self.values[col].append(NAN)
+        else:
+            self.open_times.append(open_time)
+            for col in INDICATOR_COLUMNS:
+                self.values[col].append(NAN)
+
+        self._pending = (open_time, close)
+        result = self._compute(close)
+        for col in INDICATOR_COLUMNS:
+            self.values[col][-1] = result[col]
+        return result
+
+    def latest(self):
+        """返回最后一根K线的指标值，无数据时返回None"""
+        if not self.open_times:
+            return None
+        return {col: self.values[col][-1] for col in INDICATOR_COLUMNS}
+
+    def sync(self, open_times, closes):
+        """与一段连续K线序列同步，只处理新增或修订的K线
+
+        序列与已处理历史不连续时（如缓存被重建）自动从头重算。
+
+        Args:
+            open_times: 升序开盘时间（毫秒）序列
+            closes: 对应收盘价序列
+
+        Returns:
+            dict: 列名 -> 与输入等长的 numpy 数组
+        """
+        n = len(open_times)
+        if n == 0:
+            return {col: np.array([], dtype=float) for col in INDICATOR_COLUMNS}
+
+        start = 0
+        if self.open_times:
+            first = bisect_left(self.open_times, open_times[0])
+            last_known = self.open_times[-1]
+            pos = bisect_left(open_times, last_known)
+            aligned = (
+                first < len(self.open_times)
+                and self.open_times[first] == open_times[0]
+                and pos < n and open_times[pos] == last_known
+                and len(self.open_times) - first == pos + 1
+            )
+            if aligned:
+                start = pos
+                self._trim(first)
+            else:
+                self.reset()
+
+        for i in range(start, n):
+            self.update(int(open_times[i]), closes[i])
+
+        return {col: np.array(self.values[col][-n:], dtype=float) for col in INDICATOR_COLUMNS}
+
+    def _trim(self, count):
+        """丢弃最早的 count 条输出历史（指标状态不受影响）"""
+        if count <= 0:
+            return
+        del self.open_times[:count]
+        for col in INDICATOR_COLUMNS:
+            del self.values[col][:count]
+
+
+def compute_indicators(closes, **params):
+    """对完整收盘价序列一次性计算全部指标（用于模拟数据等无状态场景）"""
+    engine = IndicatorEngine(**params)
+    return engine.sync(list(range(len(closes))), list(closes))
+
+
+def compute_indicators_vectorized(closes, ma_fast=5, ma_slow=25, rsi_window=14,
+                                  macd_fast=12, macd_slow=26, macd_signal=9, volatility_window=20):
+    """用 pandas rolling/ewm 一次性计算整段序列的指标
+
+    与 IndicatorEngine 逐根更新的结果一致，适合回测、参数寻优等大批量历史计算。
+
+    Returns:
+        dict: 列名 -> numpy数组
+    """
+    close = pd.Series(np.asarray(closes, dtype=float))
+
+    result = {
+        'ma5': close.rolling(window=ma_fast, min_periods=ma_fast).mean(),
+        'ma25': close.rolling(window=ma_slow, min_periods=ma_slow).mean(),
+    }
+
+    diff = close.diff(1)
+    up = diff.where(diff > 0, 0.0).ewm(alpha=1 / rsi_window, min_periods=rsi_window, adjust=False).mean()
+    down = (-diff.where(diff < 0, 0.0)).ewm(alpha=1 / rsi_window, min_periods=rsi_window, adjust=False).mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(down == 0, 100.0, 100 - (100 / (1 + up / down)))
+    result['rsi'] = np.where(down.isna() | up.isna(), np.nan, rsi)
+
+    ema_fast = close.ewm(span=macd_fast, min_periods=macd_fast, adjust=False).mean()
+    ema_slow = close.ewm(span=macd_slow, min_periods=macd_slow, adjust=False).mean()
+    macd = ema_fast - ema_slow
+    signal = macd.ewm(span=macd_signal, min_periods=macd_signal, adjust=False).mean()
+    result['macd'] = macd
+    result['macd_signal'] = signal
+    result['macd_diff'] = macd - signal
+
+    result['volatility'] = close.pct_change().rolling(window=volatility_window).std() * 100
+
+    return {col: np.asarray(result[col], dtype=float) for col in INDICATOR_COLUMNS}
@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import asyncio
+import threading
+import concurrent.futures
+from collections import deque
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# 单个主机保留的最近耗时样本数（用于计算分位数）
+LATENCY_SAMPLES = 200
+
+# 可以安全重试的请求方法（幂等）
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class HttpStatusError(aiohttp.ClientError):
+    """HTTP响应状态码表示失败（4xx/5xx）"""
+
+    def __init__(self, status, url, body=''):
+        super().__init__(f"HTTP {status}: {url} {body[:200]}".strip())
+        self.status = status
+        self.url = url
+
+
+class Response:
+    """已读取完毕的HTTP响应（可以在事件循环线程之外使用），headers 不区分大小写"""
+
+    def __init__(self, status, url, headers, content):
+        self.status = status
+        self.url = url
+        self.headers = headers
+        self.content = content
+
+    @property
+    def status_code(self):
+        return self.status
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HttpStatusError(self.status, self.url, self.text)
+
+
+class _CallbackBridge(QObject):
+    """把事件循环线程中完成的结果转发到Qt对象所在线程（通常是GUI线程）"""
+    finished = pyqtSignal(object, object, object)  # 回调函数, 结果, 异常
+
+    def __init__(self):
+        super().__init__()
+        self.finished.connect(self._dispatch)
+
+    def _dispatch(self, callback, result, error):
+        callback(result, error)
+
+
+class IoRuntime:
+    """
+    异步I/O运行时
+
+    在独立线程中运行一个 asyncio 事件循环，所有出站HTTP请求（新闻API、DeepSeek、RSS、
+    Telegram）都以协程形式在这里执行，共用一个 aiohttp 会话：连接保持复用，
+    每个主机的并发连接数有上限，连接失败和 429/5xx 响应按指数退避重试。
+    Binance REST 调用（utils.binance_runtime，使用自己的会话）也在同一个事件循环中执行。
+    并发请求只占用协程而不是线程，数百个同时进行的请求开销很小。
+
+    同步代码通过 run()/fetch() 等待结果；submit() 返回 concurrent.futures.Future，
+    可取消，传入 callback 时结果经Qt信号在创建本对象的线程中回调。
+    按 tag 分组的请求可用 cancel(tag) 一起取消。每个主机分别记录请求次数、失败次数和耗时。
+    """
+
+    def __init__(self, max_connections=100, max_connections_per_host=4, retries=3, backoff_factor=0.5,
+                 status_forcelist=(429, 500, 502, 503, 504)):
+        """
+        Args:
+            max_connections: 全部主机的最大并发连接数
+            max_connections_per_host: 每个主机的最大并发连接数（超出时等待空闲连接）
+            retries: 连接错误和可重试状态码的最大重试次数
+            backoff_factor: 退避系数，第 n 次重试前等待 backoff_factor * 2^(n-1) 秒
+            status_forcelist: 需要重试的HTTP状态码（仅幂等请求）
+        """
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = tuple(status_forcelist)
+
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._start_lock = threading.Lock()
+        self._bridge = _CallbackBridge()
+
+        self._tagged = {}  # tag -> 进行中的 Future 集合
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    # ---------- 事件循环 ----------
+
+    def start(self):
+        """启动事件循环线程（首次提交任务时自动调用）"""
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="io-runtime", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+
+    def in_loop_thread(self):
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro, timeout=None, tag=None, callback=None):
+        """在事件循环中执行协程
+
+        Args:
+            coro: 协程对象
+            timeout: 超时时间（秒），超时后协程被取消并抛出 asyncio.TimeoutError
+            tag: 分组名，可用 cancel(tag) 取消该组所有未完成的任务
+            callback: 可选 callback(result, error)，在创建本对象的线程中（经Qt信号）调用
+
+        Returns:
+            concurrent.futures.Future
+        """
+        self.start()
+        if timeout is not None:
+            coro = asyncio.wait_for(coro, timeout)
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+        if tag is not None:
+            with self._lock:
+                self._tagged.setdefault(tag, set()).add(future)
+
+        def done(f):
+            if tag is not None:
+                with self._lock:
+                    self._tagged.get(tag, set()).discard(f)
+            if callback is not None:
+                if f.cancelled():
+                    result, error = None, concurrent.futures.CancelledError()
+                else:
+                    result, error = (f.result(), None) if f.exception() is None else (None, f.exception())
+                self._bridge.finished.emit(callback, result, error)
+
+        future.add_done_callback(done)
+        return future
+
+    def run(self, coro, timeout=None, tag=None):
+        """执行协程并等待结果（不能在事件循环线程中调用）"""
+        if self.in_loop_thread():
+            raise RuntimeError("不能在I/O事件循环线程中同步等待协程")
+        return self.submit(coro, timeout=timeout, tag=tag).result()
+
+    def cancel(self, tag):
+        """取消某个分组中所有未完成的任务
+
+        Returns:
+            int: 取消的任务数
+        """
+        with self._lock:
+            futures = list(self._tagged.pop(tag, ()))
+        return sum(1 for f in futures if f.cancel())
+
+    def stop(self):
+        """取消所有任务，关闭会话并停止事件循环"""
+        if self._loop is None:
+            return
+        with self._lock:
+            futures = [f for group in self._tagged.values() for f in group]
+            self._tagged.clear()
+        for future in futures:
+            future.cancel()
+
+        async def close_session():
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_session(), self._loop).result(timeout=5)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+        self._thread = None
+
+    # ---------- HTTP ----------
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                             limit_per_host=self.max_connections_per_host,
+                                             ttl_dns_cache=300,
+                                             keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    @staticmethod
+    def _form_data(data, files):
+        """把 requests 风格的 data/files 参数转换为 multipart 表单"""
+        form = aiohttp.FormData()
+        for name, value in (data or {}).items():
+            form.add_field(name, str(value))
+        for name, value in files.items():
+            form.add_field(name, value, filename=getattr(value, 'name', name).replace('\\', '/').split('/')[-1])
+        return form
+
+    async def request(self, method, url, timeout=30, retries=None, **kwargs):
+        """发送HTTP请求（协程），读取完整响应体后返回
+
+        Args:
+            method: 请求方法
+            url: 地址
+            timeout: 单次尝试的总超时（秒）
+            retries: 最大重试次数，None 使用默认值
+            **kwargs: 传给 aiohttp 的参数（params/headers/json/data），另支持 requests 风格的 files
+
+        Returns:
+            Response
+        """
+        method = method.upper()
+        retries = self.retries if retries is None else retries
+        files = kwargs.pop('files', None)
+        form_fields = kwargs.pop('data', None) if files else None
+        kwargs.pop('verify', None)  # aiohttp 默认校验证书
+        host = urlsplit(url).netloc
+        session = self._get_session()
+
+        attempt = 0
+        while True:
+            if files:
+                kwargs['data'] = self._form_data(form_fields, files)
+                for value in files.values():
+                    if hasattr(value, 'seek'):
+                        value.seek(0)
+            start = time.perf_counter()
+            failed = True
+            try:
+                async with session.request(method, url, timeout=aiohttp.ClientTimeout(total=timeout), **kwargs) as resp:
+                    content = await resp.read()
+                    response = Response(resp.status, str(resp.url), CIMultiDict(resp.headers), content)
+                failed = response.status >= 400
+            except asyncio.TimeoutError:
+                error = aiohttp.ServerTimeoutError(f"请求超时 ({timeout}秒): {url}")
+            except aiohttp.ClientConnectionError as e:
+                error = e
+            else:
+                error = None
+            finally:
+                self._record(host, time.perf_counter() - start, failed)
+
+            # 连接错误总是可以重试（请求未送达）；超时和可重试状态码只重试幂等请求
+            if error is not None:
+                retryable = isinstance(error, aiohttp.ClientConnectorError) or method in IDEMPOTENT_METHODS
+            else:
+                retryable = response.status in self.status_forcelist and method in IDEMPOTENT_METHODS
+
+            if not retryable or attempt >= retries:
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            delay = self.backoff_factor * (2 ** (attempt - 1))
+            if error is None and response.headers.get('Retry-After', '').isdigit():
+                delay = max(delay, int(response.headers['Retry-After']))
+            await asyncio.sleep(delay)
+
+    async def stream(self, method, url, on_line, timeout=90, read_timeout=30, **kwargs):
+        """发送HTTP请求并逐行读取流式响应（协程），如 text/event-stream
+
+        每读到一行就在事件循环线程中调用 on_line(line)（已解码，不含换行符）。
+        已开始读取的流无法重放，因此只在未收到响应时重试连接错误。
+
+        Args:
+            method: 请求方法
+            url: 地址
+            on_line: 每行的回调函数
+            timeout: 整个请求的总超时（秒）
+            read_timeout: 两次读取之间的最长等待（秒）
+            **kwargs: 传给 aiohttp 的参数
+
+        Returns:
+            Response: 流式读取时 content 为空；错误状态码或非流式响应（application/json 等）
+                      时为完整响应体，且不调用 on_line
+        """
+        method = method.upper()
+        kwargs.pop('verify', None)
+        host = urlsplit(url).netloc
+        session = self._get_session()
+        client_timeout = aiohttp.ClientTimeout(total=timeout, sock_read=read_timeout)
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            failed = True
+            try:
+                async with session.request(method, url, timeout=client_timeout, **kwargs) as resp:
+                    headers = CIMultiDict(resp.headers)
+                    if resp.status >= 400 or 'text/event-stream' not in headers.get('Content-Type', ''):
+                        response = Response(resp.status, str(resp.url), headers, await resp.read())
+                    else:
+                        async for line in resp.content:
+                            on_line(line.decode('utf-8', errors='replace').rstrip('\r\n'))
+                        response = Response(resp.status, str(resp.url), headers, b'')
+                failed = response.status >= 400
+                return response
+            except asyncio.TimeoutError:
+                raise aiohttp.ServerTimeoutError(f"请求超时 ({timeout}秒): {url}")
+            except aiohttp.ClientConnectorError:
+                if attempt >= self.retries:
+                    raise
+            finally:
+                self._record(host, time.perf_counter() - start, failed)
+
+            attempt += 1
+            await asyncio.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    def fetch(self, method, url, timeout=30, tag=None, **kwargs):
+        """同步发送HTTP请求并等待响应（在事件循环中执行）"""
+        return self.run(self.request(method, url, timeout=timeout, **kwargs), tag=tag)
+
+    def fetch_stream(self, method, url, on_line, timeout=90, tag=None, **kwargs):
+        """同步发送流式HTTP请求，读取完毕后返回（on_line 在事件循环线程中调用）"""
+        return self.run(self.stream(method, url, on_line, timeout=timeout, **kwargs), tag=tag)
+
+    async def prewarm(self, urls, timeout=10):
+        """预先建立到各主机的连接（并发发送HEAD请求，完成TLS握手后连接留在连接池中）
+
+        Returns:
+            list: 预热成功的主机
+        """
+        origins = {}
+        for url in urls:
+            parts = urlsplit(url)
+            if parts.scheme in ('http', 'https') and parts.netloc:
+                origins.setdefault(parts.netloc, f"{parts.scheme}://{parts.netloc}/")
+
+        async def warm(host, origin):
+            try:
+                await self.request('HEAD', origin, timeout=timeout, retries=0, allow_redirects=False)
+                return host
+            except Exception as e:
+                print(f"预热连接 {host} 失败: {str(e)}")
+                return None
+
+        results = await asyncio.gather(*(warm(host, origin) for host, origin in origins.items()))
+        return [host for host in results if host]
+
+    # ---------- 统计 ----------
+
+    async def measure(self, host, coro):
+        """执行协程并把耗时计入 host 的统计（用于不经过 request() 的客户端，如Binance）"""
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await coro
+            failed = False
+            return result
+        finally:
+            self._record(host, time.perf_counter() - start, failed)
+
+    def _record(self, host, duration, failed):
+        with self._lock:
+            stats = self._stats.get(host)
+            if stats is None:
+                stats = {'requests': 0, 'errors': 0, 'total_time': 0.0, 'max_time': 0.0,
+                         'samples': deque(maxlen=LATENCY_SAMPLES)}
+                self._stats[host] = stats
+            stats['requests'] += 1
+            stats['errors'] += int(failed)
+            stats['total_time'] += duration
+            stats['max_time'] = max(stats['max_time'], duration)
+            stats['samples'].append(duration)
+
+    def stats(self):
+        """返回各主机的请求统计
+
+        Returns:
+            dict: 主机 -> {'requests', 'errors', 'avg_ms', 'p50_ms', 'p95_ms', 'max_ms'}
+        """
+        with self._lock:
+            result = {}
+            for host, stats in self._stats.items():
+                samples = sorted(stats['samples'])
+                result[host] = {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'avg_ms': stats['total_time'] / stats['requests'] * 1000,
+                    'p50_ms': samples[len(samples) // 2] * 1000,
+                    'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+                    'max_ms': stats['max_time'] * 1000,
+                }
+            return result
+
+    def format_stats(self):
+        """将各主机统计格式化为多行文本"""
+        lines = []
+        for host, s in sorted(self.stats().items()):
+            lines.append(f"{host}: {s['requests']} 次请求, {s['errors']} 次失败, "
+                         f"平均 {s['avg_ms']:.0f} ms, P50 {s['p50_ms']:.0f} ms, "
+                         f"P95 {s['p95_ms']:.0f} ms, 最大 {s['max_ms']:.0f} ms")
+        return "\n".join(lines)
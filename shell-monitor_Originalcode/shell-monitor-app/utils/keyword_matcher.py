@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+import html
+from collections import deque
+
+# HTML标签和字符实体，一次扫描中同时处理
+HTML_PATTERN = re.compile(r"<[^<]+?>|&(?:#\d+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);")
+
+
+def _html_replace(match):
+    text = match.group(0)
+    return '' if text[0] == '<' else html.unescape(text)
+
+
+def strip_html(text):
+    """去除HTML标签并解码字符实体（单次扫描）"""
+    return HTML_PATTERN.sub(_html_replace, text)
+
+
+def _is_word_char(ch):
+    return ch.isascii() and ch.isalnum()
+
+
+class KeywordMatcher:
+    """
+    多关键词匹配器（Aho–Corasick 自动机）
+
+    关键词按标签分组（通常是交易对），构建一次自动机后，对每段文本只需线性扫描一遍，
+    即可得到文本命中的所有标签，耗时与关键词数量无关。匹配不区分大小写；关键词两端
+    是英文字母或数字时要求整词匹配（"shell" 不匹配 "myshellfish"），中文关键词不受限制。
+    """
+
+    def __init__(self, keywords):
+        """
+        Args:
+            keywords: 标签 -> 关键词列表（也可以直接传关键词列表，此时标签即关键词本身）
+        """
+        self.keywords = self.normalize(keywords)
+
+        # 状态转移表、失败指针和每个状态的输出（以该状态结尾的关键词：(长度, 标签, 首尾是否需要词边界)）
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for tag, words in self.keywords.items():
+            for word in words:
+                state = 0
+                for ch in word:
+                    next_state = self._goto[state].get(ch)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][ch] = next_state
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._output.append([])
+                    state = next_state
+                self._output[state].append((len(word), tag, _is_word_char(word[0]), _is_word_char(word[-1])))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    @staticmethod
+    def normalize(keywords):
+        """规范化关键词：小写、合并空白、去重排序（关键词两端的空格不再需要，改为整词匹配）"""
+        if not isinstance(keywords, dict):
+            keywords = {k: [k] for k in keywords}
+        return {tag: sorted({' '.join(k.lower().split()) for k in words if k.strip()})
+                for tag, words in keywords.items()}
+
+    def __len__(self):
+        return sum(len(words) for words in self.keywords.values())
+
+    def find(self, text):
+        """返回文本中所有关键词匹配
+
+        Returns:
+            list: (起始位置, 结束位置, 标签)
+        """
+        text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        state = 0
+        for index, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                end = index + 1
+                for length, tag, bound_start, bound_end in output[state]:
+                    start = end - length
+                    if bound_start and start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if bound_end and end < len(text) and _is_word_char(text[end]):
+                        continue
+                    matches.append((start, end, tag))
+        return matches
+
+    def match(self, text):
+        """返回文本命中的标签集合"""
+        return {tag for _, _, tag in self.find(text)}
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+from bisect import bisect_left
+
+from utils.clock import SYSTEM_CLOCK
+
+
+class KlineCache:
+    """
+    K线内存缓存，按 (交易对, 周期) 保存历史K线
+
+    首次访问时按回看天数完整拉取历史，之后只拉取最后一根K线开盘时间之后的数据，
+    并按开盘时间合并（最后一根未收盘的K线会被新数据覆盖）。
+    """
+
+    # 单次 get_klines 请求的最大条数（Binance限制）
+    MAX_BATCH = 1000
+
+    def __init__(self, min_refresh_seconds=2.0, stream_timeout=90.0, clock=None):
+        """
+        Args:
+            min_refresh_seconds: 两次增量拉取之间的最小间隔（秒），
+                同一轮循环中多处调用只会触发一次网络请求
+            stream_timeout: 行情推送超过该时间（秒）未更新时恢复REST增量拉取
+            clock: 时钟（utils.clock），None 表示系统时钟
+        """
+        self.min_refresh_seconds = min_refresh_seconds
+        self.stream_timeout = stream_timeout
+        self.clock = clock or SYSTEM_CLOCK
+        self._entries = {}  # (symbol, interval) -> {'rows', 'open_times', 'last_fetch'}
+        self._lock = threading.Lock()
+
+    def get(self, client, symbol, interval, lookback_days):
+        """获取K线原始数据（Binance格式的列表），必要时增量更新
+
+        Args:
+            client: binance.client.Client 实例
+            symbol: 交易对，如 'SHELLUSDT'
+            interval: Binance K线周期，如 '15m'
+            lookback_days: 保留的历史天数
+
+        Returns:
+            list: 按开盘时间升序排列的K线列表（副本）
+        """
+        key = (symbol, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+            now = self.clock.time()
+
+            if entry is None:
+                # 不指定 limit：按每页最多条数分页拉取完整回看窗口（请求次数最少）
+                rows = client.get_historical_klines(symbol, interval, f"{lookback_days} days ago UTC")
+                entry = {'rows': [], 'open_times': [], 'last_fetch': 0.0}
+                self._merge(entry, rows)
+                entry['last_fetch'] = now
+                self._entries[key] = entry
+            elif now - entry['last_fetch'] >= self.min_refresh_seconds and \
+                    now - entry.get('last_push', 0.0) >= self.stream_timeout:
+                self._fetch_incremental(client, symbol, interval, entry)
+                entry['last_fetch'] = now
+
+            self._trim(entry, now, lookback_days)
+            return list(entry['rows'])
+
+    def _fetch_incremental(self, client, symbol, interval, entry):
+        """只拉取最后一根K线之后的数据（包含最后一根，用于更新未收盘K线）"""
+        if not entry['rows']:
+            start_time = None
+        else:
+            start_time = entry['open_times'][-1]
+
+        while True:
+            params = {'symbol': symbol, 'interval': interval, 'limit': self.MAX_BATCH}
+            if start_time is not None:
+                params['startTime'] = start_time
+            batch = client.get_klines(**params)
+            self._merge(entry, batch)
+
+            # 一批已取满说明还有缺口，继续向后拉取
+            if len(batch) < self.MAX_BATCH or not entry['rows']:
+                break
+            next_start = entry['open_times'][-1]
+            if next_start == start_time:
+                break
+            start_time = next_start
+
+    @staticmethod
+    def _merge(entry, rows):
+        """按开盘时间合并新数据，相同开盘时间的K线以新数据为准"""
+        if not rows:
+            return
+        first_open = int(rows[0][0])
+        pos = bisect_left(entry['open_times'], first_open)
+        del entry['rows'][pos:]
+        del entry['open_times'][pos:]
+        for row in rows:
+            open_time = int(row[0])
+            if entry['open_times'] and open_time <= entry['open_times'][-1]:
+                continue
+            entry['rows'].append(row)
+            entry['open_times'].append(open_time)
+
+    @staticmethod
+    def _trim(entry, now, lookback_days):
+        """丢弃超出回看窗口的旧K线"""
+        cutoff = int((now - lookback_days * 86400) * 1000)
+        pos = bisect_left(entry['open_times'], cutoff)
+        if pos > 0:
+            del entry['rows'][:pos]
+            del entry['open_times'][:pos]
+
+    def push(self, symbol, interval, row):
+        """合并一根来自WebSocket推送的K线
+
+        只有已加载历史且推送的K线与缓存连续时才会合并；出现缺口（如断线重连）时
+        不合并，下一次 get 会通过REST补齐。
+
+        Returns:
+            bool: 是否已合并
+        """
+        with self._lock:
+            entry = self._entries.get((symbol, interval))
+            if not entry or not entry['rows']:
+                return False
+
+            last = entry['rows'][-1]
+            last_open = entry['open_times'][-1]
+            interval_ms = int(last[6]) - last_open + 1
+            open_time = int(row[0])
+            if open_time < last_open or open_time > last_open + interval_ms:
+                entry['last_push'] = 0.0
+                return False
+
+            self._merge(entry, [row])
+            entry['last_push'] = self.clock.time()
+            return True
+
+    def has(self, symbol, interval):
+        """缓存中是否已有该交易对/周期的数据"""
+        with self._lock:
+            return (symbol, interval) in self._entries
+
+    def peek(self, symbol, interval):
+        """返回缓存中的K线（副本），不触发网络请求"""
+        with self._lock:
+            entry = self._entries.get((symbol, interval))
+            return list(entry['rows']) if entry else []
+
+    def seed(self, symbol, interval, rows):
+        """用已有历史（如本地K线库）预填缓存，下一次 get 只会增量拉取之后的数据
+
+        缓存中已有该交易对/周期的数据时（如其他线程已完成拉取）不做任何修改。
+
+        Returns:
+            bool: 是否已预填
+        """
+        with self._lock:
+            if (symbol, interval) in self._entries:
+                return False
+            entry = {'rows': [], 'open_times': [], 'last_fetch': 0.0}
+            self._merge(entry, rows)
+            self._entries[(symbol, interval)] = entry
+            return True
+
+    def last_close_time(self, symbol, interval):
+        """返回缓存中最后一根K线的收盘时间（毫秒），无缓存时返回None"""
+        with self._lock:
+            entry = self._entries.get((symbol, interval))
+            if not entry or not entry['rows']:
+                return None
+            return int(entry['rows'][-1][6])
+
+    def invalidate(self, symbol=None, interval=None):
+        """清除缓存；不指定参数时清除全部"""
+        with self._lock:
+            if symbol is None and interval is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if (symbol is None or key[0] == symbol) and (interval is None or key[1] == interval):
+                    del self._entries[key]
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import threading
+
+import numpy as np
+
+# 列名和定长类型，顺序与Binance K线列表一致（去掉最后的 ignore 字段）
+COLUMNS = [
+    ('open_time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('close_time', '<i8'),
+    ('quote_asset_volume', '<f8'),
+    ('num_trades', '<i8'),
+    ('taker_buy_base', '<f8'),
+    ('taker_buy_quote', '<f8'),
+]
+
+
+class KlineStore:
+    """
+    本地列式K线库
+
+    每个 (交易对, 周期) 一个目录，每列一个定长二进制文件，读取时通过内存映射
+    直接得到 numpy 数组。open_time 列按升序只追加写入，兼作时间索引。
+    只保存已收盘的K线，因此已写入的数据不会再被修改。
+    """
+
+    def __init__(self, root_dir="kline_store"):
+        self.root_dir = root_dir
+        self._lock = threading.Lock()
+        self._checked = set()  # 已校验列长度的目录
+
+    def _dir(self, symbol, interval):
+        return os.path.join(self.root_dir, f"{symbol.upper()}_{interval}")
+
+    def _column_path(self, symbol, interval, name):
+        return os.path.join(self._dir(symbol, interval), f"{name}.bin")
+
+    def _count(self, symbol, interval):
+        """返回已保存的K线条数，必要时修复中断写入造成的列长度不一致"""
+        directory = self._dir(symbol, interval)
+        if not os.path.isdir(directory):
+            return 0
+
+        counts = []
+        for name, dtype in COLUMNS:
+            path = self._column_path(symbol, interval, name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            counts.append(size // np.dtype(dtype).itemsize)
+        count = min(counts)
+
+        if directory not in self._checked:
+            if any(c != count for c in counts):
+                for name, dtype in COLUMNS:
+                    path = self._column_path(symbol, interval, name)
+                    if os.path.exists(path):
+                        with open(path, 'r+b') as f:
+                            f.truncate(count * np.dtype(dtype).itemsize)
+            self._checked.add(directory)
+        return count
+
+    def count(self, symbol, interval):
+        """已保存的K线条数"""
+        with self._lock:
+            return self._count(symbol, interval)
+
+    def _last_open_time(self, symbol, interval):
+        count = self._count(symbol, interval)
+        if count == 0:
+            return None
+        path = self._column_path(symbol, interval, 'open_time')
+        with open(path, 'rb') as f:
+            f.seek((count - 1) * 8)
+            return int(np.frombuffer(f.read(8), dtype='<i8')[0])
+
+    def last_open_time(self, symbol, interval):
+        """最后一根已保存K线的开盘时间（毫秒），无数据时返回None"""
+        with self._lock:
+            return self._last_open_time(symbol, interval)
+
+    def load(self, symbol, interval, start_time=None, end_time=None):
+        """按开盘时间范围读取K线列数据（内存映射，只读）
+
+        Args:
+            start_time: 起始开盘时间（毫秒，含），None表示从头开始
+            end_time: 结束开盘时间（毫秒，不含），None表示到末尾
+
+        Returns:
+            dict: 列名 -> numpy数组；无数据时各列为空数组
+        """
+        with self._lock:
+            count = self._count(symbol, interval)
+            if count == 0:
+                return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS}
+
+            columns = {
+                name: np.memmap(self._column_path(symbol, interval, name), dtype=dtype, mode='r', shape=(count,))
+                for name, dtype in COLUMNS
+            }
+
+        open_times = columns['open_time']
+        lo = 0 if start_time is None else int(np.searchsorted(open_times, start_time, side='left'))
+        hi = count if end_time is None else int(np.searchsorted(open_times, end_time, side='left'))
+        return {name: arr[lo:hi] for name, arr in columns.items()}
+
+    def load_rows(self, symbol, interval, start_time=None, end_time=None):
+        """读取K线并转换为Binance REST格式的列表，便于直接放入K线缓存"""
+        cols = self.load(symbol, interval, start_time, end_time)
+        n = len(cols['open_time'])
+        if n == 0:
+            return []
+        lists = [cols[name].tolist() for name, _ in COLUMNS]
+        return [[lists[c][i] for c in range(len(COLUMNS))] + ['0'] for i in range(n)]
+
+    def append(self, symbol, interval, rows, now_ms=None):
+        """追加已收盘且比库中最新K线更新的K线
+
+        读取最新开盘时间和写入在同一把锁内完成，多个线程同时追加相同的K线时只写入一次。
+
+        Args:
+            rows: Binance格式的K线列表（升序）
+            now_ms: 当前时间（毫秒），收盘时间早于该时间的K线视为已收盘
+
+        Returns:
+            int: 实际写入的条数
+        """
+        if not rows:
+            return 0
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+
+        with self._lock:
+            last_open = self._last_open_time(symbol, interval)
+
+            # 从末尾向前找出需要写入的K线，避免每次扫描全部历史
+            start = len(rows)
+            while start > 0 and (last_open is None or int(rows[start - 1][0]) > last_open):
+                start -= 1
+            new_rows = [r for r in rows[start:] if int(r[6]) < now_ms]
+            if not new_rows:
+                return 0
+
+            os.makedirs(self._dir(symbol, interval), exist_ok=True)
+            for c, (name, dtype) in enumerate(COLUMNS):
+                values = np.array([float(r[c]) if dtype == '<f8' else int(r[c]) for r in new_rows], dtype=dtype)
+                with open(self._column_path(symbol, interval, name), 'ab') as f:
+                    f.write(values.tobytes())
+        return len(new_rows)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+
+import numpy as np
+
+# 加密货币新闻情感词典：词（或短语）-> 权重（正为利好，负为利空）
+DEFAULT_LEXICON = {
+    # 利好
+    'surge': 2.0, 'surges': 2.0, 'surged': 2.0, 'soar': 2.2, 'soars': 2.2, 'soared': 2.2,
+    'rally': 1.8, 'rallies': 1.8, 'rallied': 1.8, 'jump': 1.5, 'jumps': 1.5, 'jumped': 1.5,
+    'gain': 1.2, 'gains': 1.2, 'rise': 1.2, 'rises': 1.2, 'rising': 1.2, 'climb': 1.2, 'climbs': 1.2,
+    'up': 0.6, 'higher': 1.0, 'high': 0.6, 'record': 1.0, 'breakout': 1.8, 'rebound': 1.4, 'recovers': 1.2,
+    'bullish': 2.2, 'bull': 1.5, 'pump': 1.5, 'moon': 1.8, 'mooning': 1.8, 'all-time high': 2.5, 'ath': 2.0,
+    'listing': 1.5, 'listed': 1.2, 'lists': 1.2, 'partnership': 1.5, 'partners': 1.2, 'launch': 1.0,
+    'launches': 1.0, 'adoption': 1.5, 'integration': 1.0, 'upgrade': 1.2, 'approval': 1.8, 'approved': 1.8,
+    'approves': 1.8, 'etf': 0.8, 'inflows': 1.5, 'accumulation': 1.2, 'buyback': 1.5, 'airdrop': 0.8,
+    'support': 0.5, 'growth': 1.2, 'strong': 1.0, 'outperforms': 1.5, 'milestone': 1.2, 'wins': 1.2,
+    'optimism': 1.5, 'optimistic': 1.5, 'positive': 1.2, 'boost': 1.5, 'boosts': 1.5, 'expands': 1.0,
+    # 利空
+    'crash': -2.5, 'crashes': -2.5, 'crashed': -2.5, 'plunge': -2.2, 'plunges': -2.2, 'plunged': -2.2,
+    'dump': -1.8, 'dumps': -1.8, 'drop': -1.4, 'drops': -1.4, 'dropped': -1.4, 'fall': -1.3, 'falls': -1.3,
+    'fell': -1.3, 'decline': -1.2, 'declines': -1.2, 'slump': -1.8, 'slumps': -1.8, 'tumble': -2.0,
+    'tumbles': -2.0, 'down': -0.6, 'lower': -1.0, 'low': -0.6, 'sell-off': -1.8, 'selloff': -1.8,
+    'bearish': -2.2, 'bear': -1.5, 'correction': -1.0, 'liquidation': -1.5, 'liquidations': -1.5,
+    'outflows': -1.5, 'hack': -2.5, 'hacked': -2.5, 'exploit': -2.5, 'exploited': -2.5, 'breach': -2.2,
+    'stolen': -2.2, 'theft': -2.2, 'scam': -2.5, 'fraud': -2.5, 'rug pull': -3.0, 'rugpull': -3.0,
+    'ponzi': -2.5, 'lawsuit': -1.8, 'sues': -1.8, 'sued': -1.8, 'charges': -1.5, 'charged': -1.5,
+    'probe': -1.2, 'investigation': -1.2, 'crackdown': -2.0, 'ban': -2.0, 'bans': -2.0, 'banned': -2.0,
+    'delist': -2.5, 'delists': -2.5, 'delisted': -2.5, 'delisting': -2.5, 'halt': -1.5, 'halts': -1.5,
+    'suspends': -1.5, 'suspended': -1.5, 'insolvency': -2.5, 'bankruptcy': -2.5, 'bankrupt': -2.5,
+    'collapse': -2.5, 'collapses': -2.5, 'fud': -1.0, 'fear': -1.2, 'panic': -2.0, 'risk': -0.6,
+    'risks': -0.6, 'warning': -1.2, 'warns': -1.2, 'loss': -1.3, 'losses': -1.3, 'weak': -1.0,
+    'unlock': -0.8, 'vulnerability': -1.8, 'outage': -1.5, 'negative': -1.2, 'pessimism': -1.5,
+    # 中文
+    '上涨': 1.5, '大涨': 2.0, '暴涨': 2.2, '飙升': 2.2, '反弹': 1.4, '突破': 1.8, '新高': 2.0, '利好': 2.0,
+    '看涨': 2.0, '上线': 1.5, '上市': 1.2, '合作': 1.2, '批准': 1.8, '增长': 1.2, '流入': 1.5, '回购': 1.5,
+    '下跌': -1.5, '大跌': -2.0, '暴跌': -2.5, '跳水': -2.0, '崩盘': -2.5, '利空': -2.0, '看跌': -2.0,
+    '下架': -2.5, '黑客': -2.5, '被盗': -2.5, '漏洞': -1.8, '诈骗': -2.5, '跑路': -3.0, '监管': -0.8,
+    '禁止': -2.0, '起诉': -1.8, '调查': -1.2, '清算': -1.5, '爆仓': -2.0, '流出': -1.5, '恐慌': -2.0,
+    '风险': -0.6, '暂停': -1.5, '破产': -2.5,
+}
+
+# 否定词：其后 NEGATION_SCOPE 个词内的情感词反转并减弱
+DEFAULT_NEGATIONS = (
+    'not', 'no', 'never', "isn't", "aren't", "wasn't", "weren't", "don't", "doesn't", "didn't",
+    "won't", "can't", "cannot", 'without', 'fails', 'failed', 'despite', 'denies', 'denied',
+    '不', '未', '没有', '并非', '否认',
+)
+
+# 加强词：紧跟其后的情感词权重加大
+DEFAULT_INTENSIFIERS = {
+    'massive': 1.5, 'huge': 1.5, 'sharply': 1.4, 'sharp': 1.4, 'major': 1.3, 'record': 1.3,
+    'biggest': 1.5, 'significant': 1.3, 'extreme': 1.5, 'very': 1.3, '大幅': 1.5, '严重': 1.5,
+}
+
+NEGATION_SCOPE = 3
+NEGATION_FACTOR = -0.75
+# 分数归一化常数：score = s / sqrt(s^2 + alpha)
+NORMALIZATION_ALPHA = 15.0
+
+
+class LexiconSentiment:
+    """
+    本地词典情感评分
+
+    用加密货币领域的情感词典为新闻标题打分，处理否定（not/never/不/未…后的几个词内反转）
+    和加强词（massive/sharply/大幅…）。一批标题先分词拼接成一个数组，词权重、否定范围
+    和每条标题的合计都用 numpy 向量化计算，每条标题只需几微秒，无需网络。
+
+    分数在 -1 ~ 1 之间。命中情感词太少、分数绝对值低于阈值或同时包含利好与利空词的标题
+    被标记为"不确定"，这些标题才需要交给LLM进一步分析。
+    """
+
+    def __init__(self, lexicon=None, negations=DEFAULT_NEGATIONS, intensifiers=None, ambiguity_threshold=0.35):
+        """
+        Args:
+            lexicon: 额外的词典条目（词或短语 -> 权重），合并到默认词典
+            negations: 否定词
+            intensifiers: 加强词 -> 倍数，None 使用默认值
+            ambiguity_threshold: 分数绝对值低于该值的标题视为不确定
+        """
+        self.lexicon = dict(DEFAULT_LEXICON)
+        if lexicon:
+            self.lexicon.update({' '.join(k.casefold().split()): float(v) for k, v in lexicon.items()})
+        self.negations = frozenset(negations)
+        self.intensifiers = dict(DEFAULT_INTENSIFIERS if intensifiers is None else intensifiers)
+        self.ambiguity_threshold = ambiguity_threshold
+
+        # 分词：多词短语和中文词条按最长优先匹配，其余按英文单词切分
+        terms = [t for t in set(self.lexicon) | self.negations | set(self.intensifiers)
+                 if ' ' in t or not t.isascii()]
+        terms.sort(key=len, reverse=True)
+        phrase = '|'.join(r'\s+'.join(map(re.escape, t.split())) for t in terms)
+        self._token_pattern = re.compile((f"{phrase}|" if phrase else "") + r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+    def tokenize(self, text):
+        return [' '.join(t.split()) for t in self._token_pattern.findall(str(text).casefold())]
+
+    def score(self, headlines):
+        """为一批标题评分
+
+        Returns:
+            dict: {'scores': 分数数组, 'hits': 命中情感词数, 'ambiguous': 是否需要LLM分析的布尔数组}
+        """
+        count = len(headlines)
+        tokens_per = [self.tokenize(h) for h in headlines]
+        lengths = np.fromiter((len(t) for t in tokens_per), dtype=np.int64, count=count)
+        tokens = [t for per in tokens_per for t in per]
+        total = len(tokens)
+        if total == 0:
+            zeros = np.zeros(count)
+            return {'scores': zeros, 'hits': zeros.astype(np.int64), 'ambiguous': np.ones(count, dtype=bool)}
+
+        owner = np.repeat(np.arange(count), lengths)
+        weights = np.fromiter((self.lexicon.get(t, 0.0) for t in tokens), dtype=float, count=total)
+        negator = np.fromiter((t in self.negations for t in tokens), dtype=bool, count=total)
+        boost = np.fromiter((self.intensifiers.get(t, 1.0) for t in tokens), dtype=float, count=total)
+        index = np.arange(total)
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+        # 否定：距离前一个否定词（同一标题内）不超过 NEGATION_SCOPE 个词
+        last_negator = np.maximum.accumulate(np.where(negator, index, -1))
+        previous_negator = np.concatenate(([-1], last_negator[:-1]))
+        negated = (previous_negator >= starts) & (index - previous_negator <= NEGATION_SCOPE)
+        weights = np.where(negated, weights * NEGATION_FACTOR, weights)
+
+        # 加强词只作用于紧跟其后的词（同一标题内）
+        previous_boost = np.concatenate(([1.0], boost[:-1]))
+        weights = weights * np.where(index > starts, previous_boost, 1.0)
+
+        sums = np.bincount(owner, weights=weights, minlength=count)
+        hits = np.bincount(owner, weights=(weights != 0), minlength=count).astype(np.int64)
+        positive = np.bincount(owner, weights=(weights > 0), minlength=count) > 0
+        negative = np.bincount(owner, weights=(weights < 0), minlength=count) > 0
+
+        scores = sums / np.sqrt(sums * sums + NORMALIZATION_ALPHA)
+        ambiguous = (hits == 0) | (np.abs(scores) < self.ambiguity_threshold) | (positive & negative)
+        return {'scores': scores, 'hits': hits, 'ambiguous': ambiguous}
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.kline_store import COLUMNS
+
+DAY_MS = 86400 * 1000
+
+
+class MarketSimulator:
+    """
+    可复现的多交易对行情模拟器
+
+    价格服从带跳跃的几何布朗运动（Merton跳跃扩散），波动率在若干状态间按马尔可夫链切换，
+    各交易对通过共同市场因子相关。全部计算为 NumPy 向量运算，可一次生成数百万根K线。
+    K线最高/最低价按布朗桥极值分布抽样，与开盘/收盘价一致。
+
+    模拟器保存每个交易对的最新价格和当前波动率状态，连续调用 klines/ticks/next_price
+    得到的是同一条连续路径；相同种子和相同调用顺序得到完全相同的数据。
+    """
+
+    def __init__(self, symbols=('SHELLUSDT',), start_prices=1.2345, seed=None,
+                 daily_volatility=0.1, daily_drift=0.0,
+                 jump_intensity=2.0, jump_mean=0.0, jump_std=0.03,
+                 regimes=(0.6, 1.0, 2.5), regime_duration_days=0.5,
+                 correlation=0.5, base_volume=5000.0):
+        """
+        Args:
+            symbols: 交易对列表
+            start_prices: 初始价格，单个数值或 交易对 -> 价格 的字典
+            seed: 随机种子（None表示不固定）
+            daily_volatility: 基准日波动率（对数收益标准差）
+            daily_drift: 日漂移率
+            jump_intensity: 平均每天跳跃次数
+            jump_mean, jump_std: 单次跳跃对数收益的均值和标准差
+            regimes: 各波动率状态相对基准波动率的倍数
+            regime_duration_days: 波动率状态的平均持续时间（天）
+            correlation: 交易对之间的收益相关系数（0~1）
+            base_volume: 每根K线的平均成交量（按1分钟K线计，随周期缩放）
+        """
+        self.symbols = [s.upper() for s in symbols]
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        if isinstance(start_prices, dict):
+            prices = [float(start_prices.get(s, 1.0)) for s in self.symbols]
+        else:
+            prices = [float(start_prices)] * len(self.symbols)
+        self.prices = np.array(prices)
+
+        self.daily_volatility = daily_volatility
+        self.daily_drift = daily_drift
+        self.jump_intensity = jump_intensity
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+        self.regimes = np.asarray(regimes, dtype=float)
+        self.regime_duration_days = regime_duration_days
+        self.correlation = correlation
+        self.base_volume = base_volume
+
+        self.rng = np.random.default_rng(seed)
+        self.regime = int(np.flatnonzero(self.regimes == 1.0)[0]) if (self.regimes == 1.0).any() else 0
+
+        # next_price 使用的预生成收益缓冲
+        self._tick_interval_ms = None
+        self._tick_returns = None
+        self._tick_pos = None
+
+    def _regime_path(self, n, dt_days):
+        """生成 n 步的波动率状态序列（所有交易对共用）"""
+        if len(self.regimes) == 1 or self.regime_duration_days <= 0:
+            return np.full(n, self.regime)
+        switch_prob = min(1.0, dt_days / self.regime_duration_days)
+        switches = self.rng.random(n) < switch_prob
+        segment = np.cumsum(switches)
+        # 每次切换随机进入另一个状态
+        steps = self.rng.integers(1, len(self.regimes), segment[-1] + 1)
+        steps[0] = 0
+        states = (self.regime + np.cumsum(steps)) % len(self.regimes)
+        path = states[segment]
+        self.regime = int(path[-1])
+        return path
+
+    def _log_returns(self, n, step_ms):
+        """生成 (交易对数, n) 的对数收益和每步的扩散波动率"""
+        dt = step_ms / DAY_MS
+        m = len(self.symbols)
+        sigma = self.daily_volatility * np.sqrt(dt) * self.regimes[self._regime_path(n, dt)]
+
+        common = self.rng.standard_normal(n)
+        shocks = self.rng.standard_normal((m, n))
+        rho = self.correlation
+        z = np.sqrt(rho) * common + np.sqrt(1 - rho) * shocks
+
+        returns = (self.daily_drift * dt - 0.5 * sigma ** 2) + sigma * z
+
+        if self.jump_intensity > 0:
+            counts = self.rng.poisson(self.jump_intensity * dt, (m, n))
+            jumped = counts > 0
+            if jumped.any():
+                k = counts[jumped]
+                returns[jumped] += self.jump_mean * k + self.jump_std * np.sqrt(k) * self.rng.standard_normal(k.size)
+        return returns, sigma
+
+    @staticmethod
+    def _align_end(end_ms, interval_ms):
+        if end_ms is None:
+            end_ms = int(time.time() * 1000)
+        return end_ms // interval_ms * interval_ms
+
+    def klines(self, n, interval_ms=60000, end_ms=None, history=False):
+        """生成 n 根K线
+
+        Args:
+            n: K线数量
+            interval_ms: K线周期（毫秒）
+            end_ms: 最后一根K线所在时间（毫秒），None表示当前时间
+            history: False时从当前价格向后延续路径；True时生成以当前价格收盘的历史K线，
+                     当前价格保持不变（用于模拟启动时的回看数据）
+
+        Returns:
+            dict: 交易对 -> 列字典（列名与 KlineStore.COLUMNS 一致）
+        """
+        last_open = self._align_end(end_ms, interval_ms)
+        open_times = last_open - (n - 1 - np.arange(n, dtype=np.int64)) * interval_ms
+        returns, sigma = self._log_returns(n, interval_ms)
+
+        log_open0 = np.log(self.prices)[:, None]
+        log_close = log_open0 + np.cumsum(returns, axis=1)
+        if history:
+            shift = log_open0 - log_close[:, -1:]
+            log_open0 = log_open0 + shift
+            log_close = log_close + shift
+        log_open = np.concatenate((log_open0, log_close[:, :-1]), axis=1)
+
+        # 布朗桥极值：P(max > x) = exp(-2(x-a)(x-b)/σ²)
+        diff_sq = (log_close - log_open) ** 2
+        var = sigma ** 2
+        u_high = 1 - self.rng.random(log_close.shape)
+        u_low = 1 - self.rng.random(log_close.shape)
+        mid = log_open + log_close
+        log_high = 0.5 * (mid + np.sqrt(diff_sq - 2 * var * np.log(u_high)))
+        log_low = 0.5 * (mid - np.sqrt(diff_sq - 2 * var * np.log(u_low)))
+
+        open_, high, low, close = np.exp(log_open), np.exp(log_high), np.exp(log_low), np.exp(log_close)
+
+        # 成交量与波动幅度正相关
+        volume_scale = self.base_volume * interval_ms / 60000
+        activity = 1 + np.abs(returns) / sigma
+        volume = volume_scale * activity * self.rng.lognormal(-0.125, 0.5, close.shape)
+        typical = (high + low + close) / 3
+        taker_ratio = np.clip(0.5 + 0.1 * returns / sigma, 0.05, 0.95)
+
+        if not history:
+            self.prices = close[:, -1].copy()
+
+        result = {}
+        for i, symbol in enumerate(self.symbols):
+            columns = {
+                'open_time': open_times,
+                'open': open_[i],
+                'high': high[i],
+                'low': low[i],
+                'close': close[i],
+                'volume': volume[i],
+                'close_time': open_times + interval_ms - 1,
+                'quote_asset_volume': volume[i] * typical[i],
+                'num_trades': np.maximum(1, (volume[i] / (volume_scale / 50)).astype(np.int64)),
+                'taker_buy_base': volume[i] * taker_ratio[i],
+                'taker_buy_quote': volume[i] * taker_ratio[i] * typical[i],
+            }
+            result[symbol] = {name: np.asarray(columns[name], dtype=dtype) for name, dtype in COLUMNS}
+        return result
+
+    def ticks(self, n, interval_ms=1000, end_ms=None):
+        """生成 n 个等间隔价格tick
+
+        Returns:
+            dict: 交易对 -> (毫秒时间戳数组, 价格数组)
+        """
+        last = self._align_end(end_ms, interval_ms)
+        times = last - (n - 1 - np.arange(n, dtype=np.int64)) * interval_ms
+        returns, _ = self._log_returns(n, interval_ms)
+        prices = self.prices[:, None] * np.exp(np.cumsum(returns, axis=1))
+        self.prices = prices[:, -1].copy()
+        return {symbol: (times, prices[i]) for i, symbol in enumerate(self.symbols)}
+
+    def next_price(self, symbol=None, interval_ms=5000):
+        """返回单个交易对的下一个价格（从预生成的收益缓冲中取，适合逐tick调用）"""
+        i = 0 if symbol is None else self.index[symbol.upper()]
+        if self._tick_interval_ms != interval_ms or self._tick_pos[i] >= self._tick_returns.shape[1]:
+            self._tick_interval_ms = interval_ms
+            self._tick_returns, _ = self._log_returns(4096, interval_ms)
+            self._tick_pos = np.zeros(len(self.symbols), dtype=np.int64)
+        self.prices[i] *= np.exp(self._tick_returns[i, self._tick_pos[i]])
+        self._tick_pos[i] += 1
+        return float(self.prices[i])
+
+    def price(self, symbol=None):
+        """当前模拟价格"""
+        i = 0 if symbol is None else self.index[symbol.upper()]
+        return float(self.prices[i])
+
+
+def klines_to_rows(columns):
+    """将列字典转换为Binance REST格式的K线列表"""
+    lists = [columns[name].tolist() for name, _ in COLUMNS]
+    return [list(row) + ['0'] for row in zip(*lists)]
+
+
+def klines_to_frame(columns):
+    """将列字典转换为以时间为索引的DataFrame（与 get_klines 的列名一致）"""
+    df = pd.DataFrame({name: columns[name] for name, _ in COLUMNS if name != 'open_time'})
+    df.index = pd.to_datetime(columns['open_time'], unit='ms')
+    df.index.name = 'timestamp'
+    return df
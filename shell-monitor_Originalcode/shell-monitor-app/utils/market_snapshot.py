@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+
+from utils.clock import SYSTEM_CLOCK
+
+# 各字段默认有效期（秒）
+DEFAULT_TTLS = {
+    'price': 1.0,
+    'ticker_24h': 30.0,
+    'balance': 10.0,
+}
+
+
+class MarketSnapshot:
+    """
+    共享行情快照缓存
+
+    按字段（最新价格、24小时统计、账户余额）分别设置有效期。所有调用方通过 get()
+    读取同一份数据：有效期内直接返回缓存值；过期后只有一个调用方发起请求，
+    同时到达的其他调用方等待这次请求的结果，而不是各自再请求一次。
+    请求失败时不写入缓存，异常抛给所有等待者。
+    """
+
+    def __init__(self, ttls=None, clock=None):
+        """
+        Args:
+            ttls: 字段 -> 有效期（秒），未列出的字段使用 DEFAULT_TTLS
+            clock: 时钟（utils.clock），None 表示系统时钟
+        """
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.clock = clock or SYSTEM_CLOCK
+        self._entries = {}   # (字段, 键) -> (值, 写入时间)
+        self._pending = {}   # (字段, 键) -> 正在进行的请求 {'event', 'value', 'error'}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, entry, field):
+        return entry is not None and self.clock.time() - entry[1] < self.ttls.get(field, 0)
+
+    def peek(self, field, key=None):
+        """返回未过期的缓存值，没有则返回 None（不发起请求）"""
+        with self._lock:
+            entry = self._entries.get((field, key))
+            return entry[0] if self._fresh(entry, field) else None
+
+    def get(self, field, fetch, key=None):
+        """读取字段值，过期时调用 fetch() 刷新
+
+        Args:
+            field: 字段名（决定有效期）
+            fetch: 无参函数，返回最新值
+            key: 字段下的键（如交易对或资产名）
+
+        Returns:
+            缓存值或 fetch() 的结果
+        """
+        cache_key = (field, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if self._fresh(entry, field):
+                self.hits += 1
+                return entry[0]
+            pending = self._pending.get(cache_key)
+            owner = pending is None
+            if owner:
+                self.misses += 1
+                pending = {'event': threading.Event(), 'value': None, 'error': None}
+                self._pending[cache_key] = pending
+            else:
+                self.hits += 1
+
+        if not owner:
+            pending['event'].wait()
+            if pending['error'] is not None:
+                raise pending['error']
+            return pending['value']
+
+        try:
+            value = fetch()
+            pending['value'] = value
+            with self._lock:
+                self._entries[cache_key] = (value, self.clock.time())
+            return value
+        except Exception as e:
+            pending['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[cache_key]
+            pending['event'].set()
+
+    def put(self, field, value, key=None):
+        """写入外部得到的最新值（如WebSocket推送）"""
+        with self._lock:
+            self._entries[(field, key)] = (value, self.clock.time())
+
+    def invalidate(self, field=None, key=None):
+        """使缓存失效：field 为 None 时清空全部，key 为 None 时清空该字段下所有键"""
+        with self._lock:
+            if field is None:
+                self._entries.clear()
+                return
+            for cache_key in list(self._entries):
+                if cache_key[0] == field and (key is None or cache_key[1] == key):
+                    del self._entries[cache_key]
+
+    def stats(self):
+        """返回命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries),
+            }
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import asyncio
+import threading
+import logging
+
+import websockets
+
+DEFAULT_WS_URL = "wss://stream.binance.com:9443"
+
+
+class MarketDataStream:
+    """
+    Binance WebSocket行情流
+
+    通过组合流订阅 ticker / kline / bookTicker，连接断开后按指数退避自动重连，
+    每次连接成功后重新发送订阅请求。所有回调都在行情线程中执行。
+
+    base_url 可指向本地的WebSocket模拟服务器，便于离线测试。
+    """
+
+    def __init__(self, symbol, interval, on_ticker=None, on_kline=None,
+                 on_book_ticker=None, on_error=None, base_url=DEFAULT_WS_URL,
+                 reconnect_delay=1.0, max_reconnect_delay=30.0):
+        """
+        Args:
+            symbol: 交易对，如 'SHELLUSDT'
+            interval: K线周期，如 '15m'
+            on_ticker: 回调 (price, pct_change_24h, event_time_ms)
+            on_kline: 回调 (kline_row, is_closed)，kline_row 为Binance REST格式的K线列表
+            on_book_ticker: 回调 (best_bid, best_ask)
+            on_error: 回调 (message)
+            base_url: WebSocket服务地址
+            reconnect_delay: 初始重连等待时间（秒）
+            max_reconnect_delay: 最大重连等待时间（秒）
+        """
+        self.symbol = symbol
+        self.interval = interval
+        self.on_ticker = on_ticker
+        self.on_kline = on_kline
+        self.on_book_ticker = on_book_ticker
+        self.on_error = on_error
+        self.base_url = base_url.rstrip('/')
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.connected = False
+        self.reconnect_count = 0
+
+        self._loop = None
+        self._thread = None
+        self._task = None
+        self._ws = None
+        self._request_id = 0
+        self._stopping = False
+
+    def streams(self, symbol=None, interval=None):
+        """返回需要订阅的流名称列表"""
+        s = (symbol or self.symbol).lower()
+        return [f"{s}@ticker", f"{s}@kline_{interval or self.interval}", f"{s}@bookTicker"]
+
+    def start(self):
+        """在后台线程中启动行情流"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """停止行情流并等待线程退出"""
+        self._stopping = True
+        if self._loop and self._task and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread:
+            self._thread.join(timeout)
+        self.connected = False
+
+    def set_symbol(self, symbol, interval):
+        """切换订阅的交易对/周期，已连接时立即退订旧流并订阅新流"""
+        old_streams = self.streams()
+        self.symbol = symbol
+        self.interval = interval
+        new_streams = self.streams()
+        if old_streams == new_streams or not self.connected or not self._loop:
+            return
+        asyncio.run_coroutine_threadsafe(self._resubscribe(old_streams, new_streams), self._loop)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self._run())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def _run(self):
+        """连接循环：断开后指数退避重连"""
+        delay = self.reconnect_delay
+        while not self._stopping:
+            try:
+                async with websockets.connect(f"{self.base_url}/stream") as ws:
+                    self._ws = ws
+                    await self._send('SUBSCRIBE', self.streams())
+                    self.connected = True
+                    delay = self.reconnect_delay
+                    async for message in ws:
+                        self._dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._report_error(f"行情WebSocket连接中断: {str(e)}")
+            finally:
+                self.connected = False
+                self._ws = None
+
+            if self._stopping:
+                break
+            self.reconnect_count += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _send(self, method, params):
+        self._request_id += 1
+        await self._ws.send(json.dumps({'method': method, 'params': params, 'id': self._request_id}))
+
+    async def _resubscribe(self, old_streams, new_streams):
+        if self._ws is None:
+            return
+        try:
+            await self._send('UNSUBSCRIBE', old_streams)
+            await self._send('SUBSCRIBE', new_streams)
+        except Exception as e:
+            self._report_error(f"行情WebSocket重新订阅失败: {str(e)}")
+
+    def _dispatch(self, message):
+        """解析组合流消息并调用对应回调"""
+        try:
+            payload = json.loads(message)
+            data = payload.get('data') if isinstance(payload, dict) else None
+            if not data:
+                return  # 订阅确认等控制消息
+
+            stream = payload.get('stream', '')
+            if not stream.startswith(self.symbol.lower() + '@'):
+                return  # 切换交易对后残留的旧流消息
+
+            event_type = data.get('e')
+            if event_type == '24hrTicker':
+                if self.on_ticker:
+                    self.on_ticker(float(data['c']), float(data.get('P', 0.0)), int(data.get('E', 0)))
+            elif event_type == 'kline':
+                if self.on_kline:
+                    k = data['k']
+                    row = [
+                        int(k['t']), k['o'], k['h'], k['l'], k['c'], k['v'],
+                        int(k['T']), k.get('q', '0'), int(k.get('n', 0)),
+                        k.get('V', '0'), k.get('Q', '0'), '0'
+                    ]
+                    self.on_kline(row, bool(k.get('x', False)))
+            elif 'b' in data and 'a' in data:
+                # bookTicker 事件没有 'e' 字段
+                if self.on_book_ticker:
+                    self.on_book_ticker(float(data['b']), float(data['a']))
+        except Exception as e:
+            self._report_error(f"解析行情消息失败: {str(e)}")
+
+    def _report_error(self, message):
+        logging.warning(message)
+        if self.on_error:
+            self.on_error(message)
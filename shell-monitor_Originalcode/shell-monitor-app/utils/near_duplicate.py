@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+import zlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.analysis_cache import normalize_headline
+
+# 大于 2^32 的素数，MinHash 置换 (a*x + b) mod P 在 uint64 内不会溢出
+MINHASH_PRIME = np.uint64(4294967311)
+
+# 标题末尾的来源标注，如 "(来源: CoinDesk)"、"(GNews)"，比较内容时去掉
+SOURCE_SUFFIX_PATTERN = re.compile(r"\s*\((?:来源:[^()]*|GNews)\)\s*$")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[一-鿿]")
+
+
+def coverage_weight(size):
+    """同一事件被多少篇报道覆盖 -> 情感权重（报道越多权重越大，但增长放缓，避免重复计数）"""
+    return max(1, size) ** 0.5
+
+
+class NearDuplicateIndex:
+    """
+    近似重复新闻索引（MinHash + LSH）
+
+    标题去掉来源标注后切成词级 shingle，计算 MinHash 签名；签名按 band 分桶，同一桶中
+    的标题才比较签名，估计的 Jaccard 相似度不低于阈值时归入同一事件（簇）。
+    完全相同的标题（归一化后）直接返回已有的簇，不重复计数。
+    索引保留最近 max_entries 条标题，超出时淘汰最早的，内存占用有上限。
+    """
+
+    def __init__(self, threshold=0.5, num_perm=64, bands=32, shingle_size=2, max_entries=2000, seed=1):
+        """
+        Args:
+            threshold: 估计的 Jaccard 相似度阈值
+            num_perm: MinHash 置换数（签名长度）
+            bands: LSH 分段数（num_perm 需能被整除）
+            shingle_size: 每个 shingle 包含的词数
+            max_entries: 索引保留的最大标题数
+            seed: 随机种子（签名在不同进程间保持一致）
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 32, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 32, num_perm, dtype=np.uint64)
+
+        self._entries = OrderedDict()  # 归一化标题 -> {'signature', 'cluster', 'keys'}
+        self._buckets = {}             # (band, 签名片段) -> 归一化标题集合
+        self._clusters = {}            # 簇ID -> {'representative', 'size', 'entries'}
+        self._next_cluster = 0
+        self._lock = threading.Lock()
+
+    def shingles(self, text):
+        """标题 -> shingle 集合（小写英文单词或单个汉字，shingle_size 个一组）"""
+        tokens = TOKEN_PATTERN.findall(SOURCE_SUFFIX_PATTERN.sub('', str(text)).lower())
+        if len(tokens) < self.shingle_size:
+            return {' '.join(tokens)}
+        return {' '.join(tokens[i:i + self.shingle_size]) for i in range(len(tokens) - self.shingle_size + 1)}
+
+    def signature(self, text):
+        """MinHash 签名（uint64 数组）"""
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in self.shingles(text)), dtype=np.uint64)
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % MINHASH_PRIME).min(axis=1)
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def add(self, headline):
+        """把标题加入索引
+
+        Returns:
+            tuple: (簇ID, 是否新建的簇)
+        """
+        key = normalize_headline(SOURCE_SUFFIX_PATTERN.sub('', str(headline)))
+        signature = self.signature(headline)
+        keys = self._band_keys(signature)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry['cluster'], False
+
+            # 同桶候选中相似度最高且达到阈值的簇
+            best_cluster, best_similarity = None, self.threshold
+            checked = set()
+            for band_key in keys:
+                for candidate in self._buckets.get(band_key, ()):
+                    if candidate in checked:
+                        continue
+                    checked.add(candidate)
+                    similarity = float(np.mean(self._entries[candidate]['signature'] == signature))
+                    if similarity >= best_similarity:
+                        best_cluster, best_similarity = self._entries[candidate]['cluster'], similarity
+
+            created = best_cluster is None
+            if created:
+                best_cluster = self._next_cluster
+                self._next_cluster += 1
+                self._clusters[best_cluster] = {'representative': headline, 'size': 0, 'entries': 0}
+            cluster = self._clusters[best_cluster]
+            cluster['size'] += 1
+            cluster['entries'] += 1
+
+            self._entries[key] = {'signature': signature, 'cluster': best_cluster, 'keys': keys}
+            for band_key in keys:
+                self._buckets.setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._evict()
+            return best_cluster, created
+
+    def _evict(self):
+        key, entry = self._entries.popitem(last=False)
+        for band_key in entry['keys']:
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+        cluster = self._clusters[entry['cluster']]
+        cluster['entries'] -= 1
+        if cluster['entries'] <= 0:
+            del self._clusters[entry['cluster']]
+
+    def representative(self, cluster_id):
+        """簇中第一条标题（该事件用于情感分析的标题）"""
+        with self._lock:
+            cluster = self._clusters.get(cluster_id)
+            return cluster['representative'] if cluster else None
+
+    def size(self, cluster_id):
+        """簇中的报道数（包括已被淘汰出索引的）"""
+        with self._lock:
+            cluster = self._clusters.get(cluster_id)
+            return cluster['size'] if cluster else 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'clusters': len(self._clusters),
+                'buckets': len(self._buckets),
+            }
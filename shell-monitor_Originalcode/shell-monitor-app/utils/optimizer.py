@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.backtest import run_backtest, DEFAULT_PARAMS, INDICATOR_PARAM_KEYS
+from utils.indicators import compute_indicators_vectorized
+
+# 默认搜索空间：键为回测参数名，值为候选取值列表
+DEFAULT_SPACE = {
+    'buy_threshold': [0.4, 0.6, 0.8, 1.0],
+    'rsi_threshold': [40, 50, 60],
+    'ma_fast': [5, 7, 10],
+    'ma_slow': [20, 25, 30],
+    'stop_loss_percent': [2.0, 3.0, 5.0],
+    'take_profit_percent': [4.0, 6.0, 10.0],
+}
+
+# 共享内存中的价格行顺序
+PRICE_ROWS = ('close', 'high', 'low')
+
+# 工作进程内的全局状态（由 _init_worker 设置）
+_worker_prices = None
+_worker_shm = None
+_worker_indicator_cache = {}
+
+
+def build_grid(space=None, base=None):
+    """由搜索空间生成全部参数组合
+
+    Args:
+        space: dict 参数名 -> 候选值列表，None时使用 DEFAULT_SPACE
+        base: 未参与搜索的参数的取值，None时使用 DEFAULT_PARAMS
+
+    Returns:
+        list: 参数字典列表（已剔除 ma_fast >= ma_slow 等无效组合）
+    """
+    space = DEFAULT_SPACE if space is None else space
+    base = dict(DEFAULT_PARAMS if base is None else base)
+    keys = list(space)
+
+    grid = []
+    for values in itertools.product(*(space[k] for k in keys)):
+        params = dict(base)
+        params.update(zip(keys, values))
+        if params['ma_fast'] >= params['ma_slow'] or params['macd_fast'] >= params['macd_slow']:
+            continue
+        grid.append(params)
+    return grid
+
+
+def walk_forward_splits(n, n_splits=4, train_ratio=0.7, anchored=False):
+    """生成滚动（或锚定）的训练/测试区间
+
+    将 [0, n) 均分为 n_splits 个窗口，每个窗口前 train_ratio 用于寻优，其余用于验证；
+    anchored=True 时训练区间始终从0开始。
+
+    Returns:
+        list: [(train_start, train_end, test_start, test_end), ...]（左闭右开）
+    """
+    window = n // n_splits
+    splits = []
+    for i in range(n_splits):
+        start = i * window
+        end = n if i == n_splits - 1 else start + window
+        train_end = start + int((end - start) * train_ratio)
+        if train_end <= start or train_end >= end:
+            continue
+        splits.append((0 if anchored else start, train_end, train_end, end))
+    return splits
+
+
+def score_result(stats, drawdown_weight=0.5):
+    """综合评分：总收益率 - drawdown_weight * |最大回撤|"""
+    return stats['total_return_percent'] + drawdown_weight * stats['max_drawdown_percent']
+
+
+def rank_results(results, drawdown_weight=0.5, min_trades=1):
+    """按综合评分排序（高到低），交易次数不足 min_trades 的结果排在最后"""
+    def key(result):
+        stats = result['stats']
+        enough = stats['num_trades'] >= min_trades
+        return (enough, score_result(stats, drawdown_weight), stats['total_return_percent'])
+
+    ranked = sorted(results, key=key, reverse=True)
+    for result in ranked:
+        result['score'] = score_result(result['stats'], drawdown_weight)
+    return ranked
+
+
+def _init_worker(shm_name, n):
+    """工作进程初始化：挂载共享内存中的价格数组（不复制）"""
+    global _worker_prices, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_prices = np.ndarray((len(PRICE_ROWS), n), dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_indicator_cache.clear()
+
+
+def _evaluate_batch(batch, start, end, sentiment, options):
+    """在工作进程中回测一批参数组合（同一批共享相同的指标参数）"""
+    close, high, low = (_worker_prices[i, start:end] for i in range(len(PRICE_ROWS)))
+    data = {'close': close, 'high': high, 'low': low}
+
+    results = []
+    for params in batch:
+        indicator_key = (tuple(int(params[k]) for k in INDICATOR_PARAM_KEYS), start, end)
+        indicators = _worker_indicator_cache.get(indicator_key)
+        if indicators is None:
+            # 每个进程只保留最近一组指标，避免内存随组合数增长
+            _worker_indicator_cache.clear()
+            indicators = compute_indicators_vectorized(close, **dict(zip(INDICATOR_PARAM_KEYS, indicator_key[0])))
+            _worker_indicator_cache[indicator_key] = indicators
+        bt = run_backtest(data, params, sentiment=sentiment, indicators=indicators, **options)
+        results.append({'params': params, 'stats': bt['stats']})
+    return results
+
+
+def _batches(grid, batch_size):
+    """按指标参数分组后切分批次，使同一批次可复用指标计算结果"""
+    ordered = sorted(grid, key=lambda p: tuple(p[k] for k in INDICATOR_PARAM_KEYS))
+    batch = []
+    last_key = None
+    for params in ordered:
+        key = tuple(params[k] for k in INDICATOR_PARAM_KEYS)
+        if batch and (key != last_key or len(batch) >= batch_size):
+            yield batch
+            batch = []
+        batch.append(params)
+        last_key = key
+    if batch:
+        yield batch
+
+
+class ParameterOptimizer:
+    """
+    信号参数并行寻优
+
+    价格数据只写入一次共享内存，各工作进程直接挂载读取，任务只传递参数组合和区间下标。
+    用法：
+
+        with ParameterOptimizer(store.load('BTCUSDT', '1m')) as optimizer:
+            ranked = optimizer.sweep(build_grid())
+            report = optimizer.walk_forward(build_grid(), n_splits=4)
+    """
+
+    def __init__(self, data, max_workers=None, batch_size=32, sentiment=None,
+                 intrabar_stops=False, fee_percent=0.0):
+        """
+        Args:
+            data: K线DataFrame或 KlineStore.load 返回的列字典（需含 close，可选 high/low）
+            max_workers: 工作进程数，None时使用CPU核数
+            batch_size: 每个任务包含的最大参数组合数
+            sentiment: 回测使用的情感分数（None表示不考虑情感）
+            intrabar_stops, fee_percent: 传递给 run_backtest
+        """
+        close = np.asarray(data['close'], dtype=np.float64)
+        self.n = len(close)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.sentiment = sentiment
+        self.options = {'intrabar_stops': intrabar_stops, 'fee_percent': fee_percent}
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, len(PRICE_ROWS) * self.n * 8))
+        prices = np.ndarray((len(PRICE_ROWS), self.n), dtype=np.float64, buffer=self._shm.buf)
+        prices[0] = close
+        prices[1] = np.asarray(data['high'], dtype=np.float64) if 'high' in data else close
+        prices[2] = np.asarray(data['low'], dtype=np.float64) if 'low' in data else close
+        del prices
+
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self._shm.name, self.n)
+            )
+        return self._executor
+
+    def evaluate(self, grid, start=0, end=None):
+        """在 [start, end) 区间回测全部参数组合
+
+        Returns:
+            list: [{'params': 参数字典, 'stats': 回测统计}, ...]（未排序）
+        """
+        end = self.n if end is None else end
+        pool = self._pool()
+        futures = [
+            pool.submit(_evaluate_batch, batch, start, end, self.sentiment, self.options)
+            for batch in _batches(grid, self.batch_size)
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def sweep(self, grid, start=0, end=None, drawdown_weight=0.5, min_trades=1):
+        """回测全部组合并按综合评分排序"""
+        return rank_results(self.evaluate(grid, start, end), drawdown_weight, min_trades)
+
+    def walk_forward(self, grid, n_splits=4, train_ratio=0.7, anchored=False,
+                     drawdown_weight=0.5, min_trades=1):
+        """前进式验证：每个窗口在训练区间寻优，再用最优参数回测紧随其后的测试区间
+
+        Returns:
+            dict: splits（每个窗口的最优参数、训练及测试统计）和 test_return_percent（测试区间复合收益率）
+        """
+        splits = []
+        growth = 1.0
+        for train_start, train_end, test_start, test_end in walk_forward_splits(self.n, n_splits, train_ratio, anchored):
+            ranked = self.sweep(grid, train_start, train_end, drawdown_weight, min_trades)
+            if not ranked:
+                continue
+            best = ranked[0]
+            test = self.evaluate([best['params']], test_start, test_end)[0]
+            growth *= 1 + test['stats']['total_return_percent'] / 100
+            splits.append({
+                'train': (train_start, train_end),
+                'test': (test_start, test_end),
+                'params': best['params'],
+                'train_stats': best['stats'],
+                'test_stats': test['stats'],
+            })
+        return {'splits': splits, 'test_return_percent': (growth - 1) * 100}
+
+    def close(self):
+        """关闭进程池并释放共享内存"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _format_params(params, space):
+    return ", ".join(f"{k}={params[k]}" for k in space)
+
+
+if __name__ == "__main__":
+    # 用法（在应用目录下运行）: python -m utils.optimizer <K线库目录> <交易对> <周期> [前进式窗口数]
+    from utils.kline_store import KlineStore
+
+    if len(sys.argv) < 4:
+        print("用法: python -m utils.optimizer <K线库目录> <交易对> <周期> [前进式窗口数]")
+        sys.exit(1)
+
+    columns = KlineStore(sys.argv[1]).load(sys.argv[2], sys.argv[3])
+    if len(columns['close']) == 0:
+        print(f"K线库中没有 {sys.argv[2]} {sys.argv[3]} 的数据")
+        sys.exit(1)
+
+    grid = build_grid()
+    print(f"K线 {len(columns['close'])} 条，参数组合 {len(grid)} 个")
+    with ParameterOptimizer(columns) as optimizer:
+        ranked = optimizer.sweep(grid)
+        for result in ranked[:10]:
+            stats = result['stats']
+            print(f"评分 {result['score']:8.2f} | 收益 {stats['total_return_percent']:7.2f}% | "
+                  f"回撤 {stats['max_drawdown_percent']:7.2f}% | 交易 {stats['num_trades']:4d} | "
+                  f"{_format_params(result['params'], DEFAULT_SPACE)}")
+
+        if len(sys.argv) > 4:
+            report = optimizer.walk_forward(grid, n_splits=int(sys.argv[4]))
+            for split in report['splits']:
+                print(f"训练 {split['train']} -> 测试 {split['test']}: "
+                      f"测试收益 {split['test_stats']['total_return_percent']:.2f}% | "
+                      f"{_format_params(split['params'], DEFAULT_SPACE)}")
+            print(f"前进式测试复合收益: {report['test_return_percent']:.2f}%")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+from datetime import datetime
+
+import numpy as np
+
+# 文件头：魔数 + 版本号，共8字节
+MAGIC = b'SMPJ'
+VERSION = 1
+HEADER = MAGIC + bytes([VERSION, 0, 0, 0])
+
+# 每条记录：int64 毫秒时间戳 + float64 价格（小端，16字节）
+RECORD_DTYPE = np.dtype([('time_ms', '<i8'), ('price', '<f8')])
+
+
+class PriceJournal:
+    """
+    价格tick二进制日志
+
+    价格先写入内存缓冲，由后台线程在缓冲达到指定条数或超过指定时间后
+    批量写入文件，避免每个tick都打开/关闭文件。
+    """
+
+    def __init__(self, path, flush_size=256, flush_interval=5.0):
+        """
+        Args:
+            path: 日志文件路径（.bin）
+            flush_size: 缓冲达到该条数时立即写盘
+            flush_interval: 最长写盘间隔（秒）
+        """
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.error = None  # 最近一次写入错误
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        # 创建文件并写入文件头（已存在时追加）
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, 'wb') as f:
+                f.write(HEADER)
+
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def record(self, timestamp, price):
+        """记录一个价格
+
+        Args:
+            timestamp: datetime 或毫秒时间戳
+            price: 价格
+        """
+        if isinstance(timestamp, datetime):
+            time_ms = int(timestamp.timestamp() * 1000)
+        else:
+            time_ms = int(timestamp)
+
+        with self._lock:
+            self._buffer.append((time_ms, float(price)))
+            full = len(self._buffer) >= self.flush_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """立即将缓冲写入文件"""
+        with self._lock:
+            pending, self._buffer = self._buffer, []
+        if not pending:
+            return
+        try:
+            with open(self.path, 'ab') as f:
+                f.write(np.array(pending, dtype=RECORD_DTYPE).tobytes())
+        except Exception as e:
+            self.error = e
+            # 写入失败时放回缓冲，等待下次重试
+            with self._lock:
+                self._buffer = pending + self._buffer
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self):
+        """停止后台线程并写入剩余数据"""
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=2)
+        self.flush()
+
+
+def read_journal(path):
+    """读取价格日志
+
+    Returns:
+        numpy结构化数组，字段为 time_ms 和 price
+    """
+    with open(path, 'rb') as f:
+        header = f.read(len(HEADER))
+    if header[:4] != MAGIC:
+        raise ValueError(f"不是有效的价格日志文件: {path}")
+
+    count = (os.path.getsize(path) - len(HEADER)) // RECORD_DTYPE.itemsize
+    if count <= 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.fromfile(path, dtype=RECORD_DTYPE, count=count, offset=len(HEADER))
+
+
+def export_csv(journal_path, csv_path=None):
+    """将二进制价格日志导出为CSV（timestamp,price，ISO格式时间）
+
+    Returns:
+        str: CSV文件路径
+    """
+    if csv_path is None:
+        csv_path = os.path.splitext(journal_path)[0] + '.csv'
+
+    records = read_journal(journal_path)
+    with open(csv_path, 'w') as f:
+        f.write("timestamp,price\n")
+        for time_ms, price in zip(records['time_ms'].tolist(), records['price'].tolist()):
+            f.write(f"{datetime.fromtimestamp(time_ms / 1000).isoformat()},{price}\n")
+    return csv_path
+
+
+if __name__ == "__main__":
+    # 用法: python utils/price_journal.py price_logs/price_log_xxx.bin [输出.csv]
+    if len(sys.argv) < 2:
+        print("用法: python utils/price_journal.py <价格日志.bin> [输出.csv]")
+        sys.exit(1)
+    output = export_csv(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"已导出: {output}")
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+import math
+import heapq
+import itertools
+import threading
+from collections import deque
+
+from utils.clock import SYSTEM_CLOCK
+
+# 请求优先级（数值越小越优先）及该优先级可使用的权重比例
+PRIORITIES = {
+    'price': 0,      # 最新价格（止盈止损检查依赖）
+    'klines': 1,     # K线（信号检查）
+    'watchlist': 2,  # 监控列表批量价格
+    'market': 3,     # 24小时统计等
+    'account': 4,    # 账户余额
+}
+PRIORITY_SHARES = (0.95, 0.85, 0.75, 0.65, 0.5)
+
+# 达到比例上限时可以等待下一分钟的优先级（更低的优先级直接放弃本次请求）
+MAX_WAITING_PRIORITY = 1
+
+# Binance接口权重估计：方法名 -> (优先级, 权重)；实际权重以响应头 X-MBX-USED-WEIGHT-1M 为准
+METHOD_COSTS = {
+    'get_symbol_ticker': ('price', 2),
+    'get_ticker': ('market', 2),
+    'get_klines': ('klines', 2),
+    'get_historical_klines': ('klines', 2),  # 每页的权重，总权重按页数估计（见 request_cost）
+    'get_asset_balance': ('account', 20),
+    'get_account': ('account', 20),
+    'get_server_time': ('price', 1),
+    'ping': ('price', 1),
+    'get_exchange_info': ('market', 20),
+}
+DEFAULT_COST = ('market', 2)
+
+# get_historical_klines 未指定 limit 时每页的K线条数
+HISTORY_PAGE_SIZE = 1000
+
+# K线周期和相对时间（"N days ago UTC"）的单位秒数
+_INTERVAL_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'M': 2592000}
+_AGO_UNITS = {'minute': 60, 'hour': 3600, 'day': 86400, 'week': 604800}
+_AGO_PATTERN = re.compile(r'(\d+)\s*(minute|hour|day|week)s?\s+ago')
+
+
+class RateBudgetExceeded(Exception):
+    """本分钟的请求权重预算不足，请求未发送"""
+
+
+def _history_pages(args, kwargs):
+    """估计 get_historical_klines 的请求次数：按回看时长和每页条数计算的页数，加上查询最早K线的一次请求"""
+    params = dict(zip(('symbol', 'interval', 'start_str', 'end_str', 'limit'), args))
+    params.update(kwargs)
+    interval = str(params.get('interval') or '')
+    match = _AGO_PATTERN.search(str(params.get('start_str') or ''))
+    if not interval[:-1].isdigit() or interval[-1] not in _INTERVAL_UNITS or match is None:
+        return 2
+    interval_seconds = int(interval[:-1]) * _INTERVAL_UNITS[interval[-1]]
+    span_seconds = int(match.group(1)) * _AGO_UNITS[match.group(2)]
+    page_size = params.get('limit') or HISTORY_PAGE_SIZE
+    return max(1, math.ceil(span_seconds / interval_seconds / page_size)) + 1
+
+
+def request_cost(name, args, kwargs):
+    """估计一次客户端调用的优先级和权重"""
+    if name == 'get_historical_klines':
+        priority, weight = METHOD_COSTS[name]
+        return priority, weight * _history_pages(args, kwargs)
+    if name == 'get_symbol_ticker' and 'symbol' not in kwargs:
+        return 'watchlist', 4  # 多个交易对或全部交易对
+    if name == 'get_ticker' and 'symbol' not in kwargs and 'symbols' not in kwargs:
+        return 'market', 80
+    return METHOD_COSTS.get(name, DEFAULT_COST)
+
+
+class WeightGovernor:
+    """
+    Binance请求权重预算
+
+    Binance按自然分钟统计每个IP的请求权重，超过上限返回429，继续请求会被封禁(418)。
+    每次请求前按估计权重占用本分钟的预算：各优先级只能用到上限的一定比例（价格检查
+    可用得最多，余额查询最少），预算不足时高优先级请求按优先级顺序等待下一分钟，
+    低优先级请求直接放弃（RateBudgetExceeded）。每次响应后用服务器返回的已用权重校正。
+
+    根据最近一分钟的权重消耗预测本分钟的总用量，超过目标比例时 interval_multiplier()
+    返回大于1的倍数，轮询间隔按此自动拉长。
+    """
+
+    def __init__(self, limit=6000, target_ratio=0.7, max_stretch=8.0, max_wait=15.0, clock=None):
+        """
+        Args:
+            limit: 每分钟权重上限
+            target_ratio: 预测用量超过上限的该比例时开始拉长轮询间隔
+            max_stretch: 轮询间隔的最大倍数
+            max_wait: 高优先级请求最多等待的秒数
+            clock: 时钟（utils.clock），None 表示系统时钟
+        """
+        self.limit = limit
+        self.target_ratio = target_ratio
+        self.max_stretch = max_stretch
+        self.max_wait = max_wait
+        self.clock = clock or SYSTEM_CLOCK
+
+        self._window = None      # 当前自然分钟的起点
+        self._used = 0           # 本分钟已用权重（本地估计与服务器值取较大者）
+        self._server_used = None
+        self._recent = deque()   # 最近60秒的 (时间, 权重)
+        self._blocked_until = 0.0
+        self._waiting = []       # 等待中的请求 (优先级, 序号)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.waits = 0
+        self.rejected = 0
+        self.limited = 0
+
+    def _roll(self, now):
+        window = now - now % 60
+        if window != self._window:
+            self._window = window
+            self._used = 0
+            self._server_used = None
+        while self._recent and now - self._recent[0][0] >= 60:
+            self._recent.popleft()
+
+    def acquire(self, priority, weight):
+        """为一次请求占用预算（可能等待），预算不足时抛出 RateBudgetExceeded"""
+        level = PRIORITIES.get(priority, len(PRIORITY_SHARES) - 1)
+        share = self.limit * PRIORITY_SHARES[level]
+        entry = (level, next(self._sequence))
+        deadline = self.clock.time() + self.max_wait
+        with self._lock:
+            heapq.heappush(self._waiting, entry)
+            try:
+                waited = False
+                while True:
+                    now = self.clock.time()
+                    self._roll(now)
+                    blocked = self._blocked_until > now
+                    if not blocked and self._waiting[0] == entry and self._used + weight <= share:
+                        self._used += weight
+                        self._recent.append((now, weight))
+                        self.calls += 1
+                        return
+                    resume = self._blocked_until if blocked else self._window + 60
+                    if level > MAX_WAITING_PRIORITY or resume > deadline:
+                        self.rejected += 1
+                        reason = "请求被限流" if blocked else f"本分钟权重已用 {self._used}/{self.limit}"
+                        raise RateBudgetExceeded(f"Binance请求权重预算不足（{reason}），跳过 {priority} 请求")
+                    if not waited:
+                        self.waits += 1
+                        waited = True
+                    # 等待期间释放锁；经时钟等待，虚拟时钟下直接推进时间
+                    self._lock.release()
+                    try:
+                        self.clock.sleep(max(0.05, min(resume - now, 1.0)))
+                    finally:
+                        self._lock.acquire()
+            finally:
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+
+    def observe(self, used_weight=None, retry_after=None):
+        """根据响应校正：服务器报告的本分钟已用权重；被限流时的等待秒数"""
+        with self._lock:
+            now = self.clock.time()
+            self._roll(now)
+            if used_weight is not None:
+                self._server_used = used_weight
+                self._used = max(self._used, used_weight)
+            if retry_after is not None:
+                self.limited += 1
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def forecast(self):
+        """预测本分钟结束时的已用权重（按最近60秒的消耗速度外推）"""
+        with self._lock:
+            now = self.clock.time()
+            self._roll(now)
+            rate = sum(weight for _, weight in self._recent) / 60.0
+            return self._used + rate * (self._window + 60 - now)
+
+    def interval_multiplier(self):
+        """轮询间隔倍数：预测用量不超过目标时为1，否则按超出比例拉长（不超过 max_stretch）"""
+        target = self.limit * self.target_ratio
+        if target <= 0:
+            return 1.0
+        return min(self.max_stretch, max(1.0, self.forecast() / target))
+
+    def stats(self):
+        """返回预算统计"""
+        forecast = self.forecast()
+        multiplier = self.interval_multiplier()
+        with self._lock:
+            return {
+                'used': self._used,
+                'server_used': self._server_used,
+                'limit': self.limit,
+                'forecast': forecast,
+                'multiplier': multiplier,
+                'calls': self.calls,
+                'waits': self.waits,
+                'rejected': self.rejected,
+                'rate_limited': self.limited,
+                'blocked_seconds': max(0.0, self._blocked_until - self.clock.time()),
+            }
+
+
+class GovernedClient:
+    """
+    Binance客户端包装
+
+    所有方法调用先经过 WeightGovernor 占用预算（按方法名估计优先级和权重），调用后读取
+    响应头中的已用权重；收到429/418时按 Retry-After 暂停后续请求。其他属性直接转发。
+
+    已用权重从客户端的 response 属性读取。RuntimeBinanceClient 按调用线程保存各自调用的响应；
+    同步 Client 的 response 在多个线程同时调用时可能是另一个请求的响应，但服务器报告的是
+    整个IP本分钟的已用权重，observe 只取较大值，读到稍早的响应不会低估用量。
+    """
+
+    def __init__(self, client, governor, priority=None):
+        """
+        Args:
+            client: binance.client.Client 或 RuntimeBinanceClient 实例
+            governor: WeightGovernor
+            priority: 固定使用的优先级，None 表示按方法名估计
+        """
+        self._client = client
+        self._governor = governor
+        self._priority = priority
+
+    @property
+    def client(self):
+        return self._client
+
+    def prioritized(self, priority):
+        """返回共用同一客户端和预算、但所有请求都按 priority 计算的包装（如监控列表的K线请求）"""
+        return GovernedClient(self._client, self._governor, priority)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+
+        def call(*args, **kwargs):
+            priority, weight = request_cost(name, args, kwargs)
+            priority = self._priority or priority
+            self._governor.acquire(priority, weight)
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as e:
+                status = getattr(e, 'status_code', None)
+                if status in (418, 429):
+                    response = getattr(e, 'response', None)
+                    retry_after = getattr(response, 'headers', {}).get('Retry-After', '') if response is not None else ''
+                    self._governor.observe(retry_after=int(retry_after) if str(retry_after).isdigit() else 60)
+                raise
+            self._observe_response()
+            return result
+
+        return call
+
+    def _observe_response(self):
+        response = getattr(self._client, 'response', None)
+        headers = getattr(response, 'headers', None)
+        if not headers:
+            return
+        used = headers.get('x-mbx-used-weight-1m') or headers.get('X-MBX-USED-WEIGHT-1M')
+        if used is not None and str(used).isdigit():
+            self._governor.observe(used_weight=int(used))
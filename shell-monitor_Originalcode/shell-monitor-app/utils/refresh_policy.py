@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import math
+from collections import deque
+
+from utils.clock import SYSTEM_CLOCK
+
+
+class AdaptiveRefresh:
+    """
+    自适应轮询间隔
+
+    由最近一段时间的已实现波动率（对数收益平方和 / 经过的秒数）估计价格在一个间隔内的
+    典型波动 σ·√Δt，据此选择轮询间隔：
+      - 波动率：一个间隔内的典型波动不超过 target_move_percent
+      - 止盈止损：一个间隔内的典型波动不超过到最近止盈/止损价距离的 stop_safety 倍
+      - 提醒：最近 alert_hold_seconds 内每有一次提醒，间隔上限减半
+    取三者最小值并限制在 [min_interval, max_interval]。间隔缩短立即生效，
+    拉长时每次最多放大 max_growth 倍，避免行情刚平静就大幅放慢。
+    """
+
+    def __init__(self, base_interval=5.0, min_interval=1.0, max_interval=30.0, window_seconds=300.0,
+                 target_move_percent=0.15, stop_safety=0.25, alert_hold_seconds=120.0,
+                 min_samples=5, max_growth=1.5, clock=None):
+        """
+        Args:
+            base_interval: 基准间隔（秒），样本不足时使用
+            min_interval: 最短间隔（秒）
+            max_interval: 最长间隔（秒）
+            window_seconds: 估计波动率的滚动窗口（秒）
+            target_move_percent: 一个间隔内允许的典型价格波动（%）
+            stop_safety: 一个间隔内的典型波动占到止盈止损距离的比例上限
+            alert_hold_seconds: 提醒后保持快速轮询的时间（秒）
+            min_samples: 估计波动率所需的最少收益样本数
+            max_growth: 间隔每次最多放大的倍数
+            clock: 时钟（utils.clock），None 表示系统时钟
+        """
+        self.base_interval = float(base_interval)
+        self.min_interval = float(min(min_interval, max_interval))
+        self.max_interval = float(max_interval)
+        self.window = window_seconds
+        self.target_move = target_move_percent / 100
+        self.stop_safety = stop_safety
+        self.alert_hold = alert_hold_seconds
+        self.min_samples = min_samples
+        self.max_growth = max_growth
+        self.clock = clock or SYSTEM_CLOCK
+
+        self._returns = deque()  # (时间, 对数收益平方, 间隔秒数)
+        self._sum_squares = 0.0
+        self._sum_seconds = 0.0
+        self._last = None        # 上一个价格 (时间, 价格)
+        self._alerts = deque()
+        self.interval = self._clamp(self.base_interval)
+        self.reason = 'base'
+        self.stop_distance = None
+
+    def _clamp(self, interval):
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _expire(self, now):
+        while self._returns and now - self._returns[0][0] > self.window:
+            _, square, seconds = self._returns.popleft()
+            self._sum_squares -= square
+            self._sum_seconds -= seconds
+        while self._alerts and now - self._alerts[0] > self.alert_hold:
+            self._alerts.popleft()
+
+    def observe(self, price, timestamp=None):
+        """记录一个价格"""
+        now = self.clock.time() if timestamp is None else timestamp
+        if price is None or price <= 0:
+            return
+        if self._last is not None:
+            last_time, last_price = self._last
+            seconds = now - last_time
+            if seconds > 0:
+                square = math.log(price / last_price) ** 2
+                self._returns.append((now, square, seconds))
+                self._sum_squares += square
+                self._sum_seconds += seconds
+        self._last = (now, price)
+        self._expire(now)
+
+    def note_alert(self, timestamp=None):
+        """记录一次提醒（价格波动提醒、交易信号等）"""
+        self._alerts.append(self.clock.time() if timestamp is None else timestamp)
+
+    def volatility(self):
+        """每秒的已实现波动率（对数收益标准差 / √秒），样本不足时返回 None"""
+        if len(self._returns) < self.min_samples or self._sum_seconds <= 0:
+            return None
+        return math.sqrt(max(0.0, self._sum_squares) / self._sum_seconds)
+
+    def next_interval(self, stop_distance=None, timestamp=None):
+        """计算下一次轮询前的等待秒数
+
+        Args:
+            stop_distance: 当前价格到最近止盈/止损价的距离（比例，如 0.01 表示 1%），None 表示没有持仓
+        """
+        now = self.clock.time() if timestamp is None else timestamp
+        self._expire(now)
+        self.stop_distance = stop_distance
+        sigma = self.volatility()
+
+        candidates = []
+        if sigma is None:
+            candidates.append((self.base_interval, 'base'))
+        elif sigma > 0:
+            candidates.append(((self.target_move / sigma) ** 2, 'volatility'))
+        else:
+            candidates.append((self.max_interval, 'volatility'))
+        if stop_distance is not None:
+            if stop_distance <= 0:
+                candidates.append((self.min_interval, 'stop'))
+            elif sigma:
+                candidates.append(((self.stop_safety * stop_distance / sigma) ** 2, 'stop'))
+        if self._alerts:
+            candidates.append((self.base_interval / (1 + len(self._alerts)), 'alert'))
+
+        interval, reason = min(candidates)
+        interval = self._clamp(min(interval, self.interval * self.max_growth))
+        self.interval = interval
+        self.reason = reason
+        return interval
+
+    def stats(self):
+        """返回当前间隔和依据"""
+        sigma = self.volatility()
+        return {
+            'interval': self.interval,
+            'reason': self.reason,
+            'volatility_per_minute': sigma * math.sqrt(60) * 100 if sigma is not None else None,
+            'stop_distance_percent': self.stop_distance * 100 if self.stop_distance is not None else None,
+            'recent_alerts': len(self._alerts),
+            'samples': len(self._returns),
+            'min_interval': self.min_interval,
+            'max_interval': self.max_interval,
+        }
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.price_journal import read_journal
+
+# K线周期 -> 毫秒
+INTERVAL_MS = {
+    '1m': 60 * 1000,
+    '3m': 3 * 60 * 1000,
+    '5m': 5 * 60 * 1000,
+    '15m': 15 * 60 * 1000,
+    '30m': 30 * 60 * 1000,
+    '1h': 60 * 60 * 1000,
+    '2h': 2 * 60 * 60 * 1000,
+    '4h': 4 * 60 * 60 * 1000,
+    '1d': 24 * 60 * 60 * 1000,
+}
+
+# 回放速度：None 表示不等待（尽可能快）
+SPEED_MAX = None
+
+
+def load_price_log(path):
+    """读取价格日志（二进制 .bin 或 timestamp,price 格式的 .csv）
+
+    Returns:
+        tuple: (毫秒时间戳数组, 价格数组)，按时间升序
+    """
+    if os.path.splitext(path)[1].lower() == '.bin':
+        records = read_journal(path)
+        times = records['time_ms'].astype(np.int64)
+        prices = records['price'].astype(float)
+    else:
+        df = pd.read_csv(path)
+        stamps = pd.to_datetime(df['timestamp'])
+        naive_ms = ((stamps - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).to_numpy(dtype=np.int64)
+        # CSV中是本地时间，按第一条记录的时区偏移换算为UTC毫秒
+        if len(naive_ms):
+            offset = naive_ms[0] - int(stamps.iloc[0].to_pydatetime().timestamp() * 1000)
+            naive_ms = naive_ms - offset
+        times = naive_ms
+        prices = df['price'].to_numpy(dtype=float)
+
+    order = np.argsort(times, kind='stable')
+    return times[order], prices[order]
+
+
+def ticks_from_klines(columns):
+    """将K线展开为价格tick：开盘 -> 最低/最高（按涨跌顺序）-> 收盘
+
+    Returns:
+        tuple: (毫秒时间戳数组, 价格数组, 成交量数组)
+    """
+    open_time = np.asarray(columns['open_time'], dtype=np.int64)
+    close_time = np.asarray(columns['close_time'], dtype=np.int64)
+    o, h, l, c = (np.asarray(columns[k], dtype=float) for k in ('open', 'high', 'low', 'close'))
+    n = len(open_time)
+
+    rising = c >= o
+    span = close_time - open_time
+    times = np.empty((n, 4), dtype=np.int64)
+    times[:, 0] = open_time
+    times[:, 1] = open_time + span // 3
+    times[:, 2] = open_time + span * 2 // 3
+    times[:, 3] = close_time
+
+    prices = np.empty((n, 4))
+    prices[:, 0] = o
+    prices[:, 1] = np.where(rising, l, h)
+    prices[:, 2] = np.where(rising, h, l)
+    prices[:, 3] = c
+
+    volume = np.repeat(np.asarray(columns.get('volume', np.zeros(n)), dtype=float) / 4, 4)
+    return times.ravel(), prices.ravel(), volume
+
+
+class ReplayFeed:
+    """
+    录制行情回放源
+
+    按顺序提供历史价格tick，并由已回放的tick实时聚合出K线（可预先载入更早的K线
+    作为指标预热数据）。wait_next() 按录制时的时间间隔除以回放速度等待，
+    speed=None 时不等待。
+    """
+
+    def __init__(self, times_ms, prices, interval_ms=60000, speed=1.0, volumes=None, max_bars=1000):
+        """
+        Args:
+            times_ms: tick时间戳（毫秒，升序）
+            prices: tick价格
+            interval_ms: 聚合K线的周期（毫秒）
+            speed: 回放倍速（1.0 为原速，100.0 为百倍速，None 为尽可能快）
+            volumes: 每个tick的成交量（可选）
+            max_bars: 保留的最大K线条数
+        """
+        self.times_ms = np.asarray(times_ms, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=float)
+        self.volumes = None if volumes is None else np.asarray(volumes, dtype=float)
+        self.interval_ms = interval_ms
+        self.speed = speed
+        self.max_bars = max_bars
+
+        self.cursor = -1
+        self.bars = []  # Binance REST格式的K线（最后一根为正在形成的K线）
+        self._wall_start = None
+
+    def __len__(self):
+        return len(self.times_ms)
+
+    @classmethod
+    def from_price_log(cls, path, interval_ms=60000, speed=1.0):
+        """从价格日志文件创建回放源"""
+        times, prices = load_price_log(path)
+        return cls(times, prices, interval_ms=interval_ms, speed=speed)
+
+    @classmethod
+    def from_kline_store(cls, store, symbol, interval, start_time=None, end_time=None,
+                         speed=1.0, warmup_bars=100):
+        """从本地K线库创建回放源，start_time 之前的 warmup_bars 根K线作为预热历史"""
+        columns = store.load(symbol, interval, start_time, end_time)
+        times, prices, volumes = ticks_from_klines(columns)
+        feed = cls(times, prices, interval_ms=INTERVAL_MS[interval], speed=speed, volumes=volumes)
+        if start_time is not None and warmup_bars > 0:
+            history = store.load_rows(symbol, interval, end_time=start_time)
+            feed.seed_history(history[-warmup_bars:])
+        return feed
+
+    def seed_history(self, rows):
+        """载入回放开始之前的已收盘K线（Binance REST格式），只保留早于第一个tick的部分"""
+        if len(self.times_ms):
+            first_bucket = self.times_ms[0] // self.interval_ms * self.interval_ms
+            rows = [r for r in rows if int(r[0]) < first_bucket]
+        self.bars = [list(r) for r in rows[-self.max_bars:]]
+
+    def duration_seconds(self):
+        """录制数据的时间跨度（秒）"""
+        if len(self.times_ms) < 2:
+            return 0.0
+        return (self.times_ms[-1] - self.times_ms[0]) / 1000
+
+    def typical_interval_seconds(self):
+        """tick之间的典型间隔（中位数，秒）"""
+        if len(self.times_ms) < 2:
+            return 1.0
+        return float(np.median(np.diff(self.times_ms))) / 1000
+
+    def advance(self):
+        """前进到下一个tick，并更新正在形成的K线
+
+        Returns:
+            bool: 是否还有数据
+        """
+        if self.cursor + 1 >= len(self.times_ms):
+            return False
+        self.cursor += 1
+        if self._wall_start is None:
+            self._wall_start = time.monotonic()
+
+        t = int(self.times_ms[self.cursor])
+        price = float(self.prices[self.cursor])
+        volume = 0.0 if self.volumes is None else float(self.volumes[self.cursor])
+        bucket = t // self.interval_ms * self.interval_ms
+
+        if self.bars and int(self.bars[-1][0]) == bucket:
+            bar = self.bars[-1]
+            bar[2] = max(bar[2], price)
+            bar[3] = min(bar[3], price)
+            bar[4] = price
+            bar[5] += volume
+        else:
+            self.bars.append([bucket, price, price, price, price, volume,
+                              bucket + self.interval_ms - 1, 0.0, 0, 0.0, 0.0, '0'])
+            if len(self.bars) > self.max_bars:
+                del self.bars[:len(self.bars) - self.max_bars]
+        return True
+
+    def price(self):
+        """当前tick价格"""
+        return float(self.prices[self.cursor]) if self.cursor >= 0 else None
+
+    def now(self):
+        """当前tick对应的时间（本地时间）"""
+        index = max(self.cursor, 0)
+        if not len(self.times_ms):
+            return datetime.now()
+        return datetime.fromtimestamp(self.times_ms[index] / 1000)
+
+    def klines(self):
+        """截至当前tick的K线副本（Binance REST格式）"""
+        return [list(bar) for bar in self.bars]
+
+    def wait_next(self, should_stop=None, max_slice=0.1):
+        """按录制间隔和回放速度等待到下一个tick的回放时刻
+
+        Args:
+            should_stop: 可选的无参函数，返回True时立即结束等待
+            max_slice: 单次睡眠的最长时间（秒），保证停止请求能及时响应
+        """
+        if not self.speed or self.cursor + 1 >= len(self.times_ms):
+            return
+        offset = (self.times_ms[self.cursor + 1] - self.times_ms[0]) / 1000 / self.speed
+        target = self._wall_start + offset
+        while True:
+            remaining = target - time.monotonic()
+            if remaining <= 0 or (should_stop is not None and should_stop()):
+                return
+            time.sleep(min(remaining, max_slice))
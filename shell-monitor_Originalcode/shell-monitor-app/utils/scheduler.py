@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.clock import SYSTEM_CLOCK
+
+
+class TaskScheduler:
+    """
+    统一任务调度器
+
+    所有后台任务在一个固定大小的线程池中执行。每个任务有独立的执行间隔；
+    任务仍在执行时再次触发不会排队，而是合并到正在进行的那次执行。
+    每个任务记录执行次数、合并次数、失败次数和耗时。
+    """
+
+    def __init__(self, max_workers=4, clock=None):
+        """
+        Args:
+            max_workers: 线程池大小（同时执行的后台任务上限）
+            clock: 时钟（utils.clock），用于判断任务是否到期，None 表示系统时钟
+        """
+        self.clock = clock or SYSTEM_CLOCK
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler")
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _new_task(func, interval):
+        return {
+            'func': func,
+            'interval': interval,
+            'future': None,
+            'last_start': None,
+            'runs': 0,
+            'merged': 0,
+            'errors': 0,
+            'total_time': 0.0,
+            'last_duration': None,
+            'max_duration': 0.0,
+            'last_error': None,
+        }
+
+    def register(self, name, func, interval=None):
+        """注册后台任务
+
+        Args:
+            name: 任务名
+            func: 任务函数
+            interval: 执行间隔（秒），None 表示只在 trigger 时执行
+        """
+        with self._lock:
+            task = self._tasks.get(name)
+            if task is None:
+                self._tasks[name] = self._new_task(func, interval)
+            else:
+                task['func'] = func
+                task['interval'] = interval
+
+    def set_interval(self, name, interval):
+        """修改任务的执行间隔（秒）"""
+        with self._lock:
+            self._tasks[name]['interval'] = interval
+
+    def trigger(self, name, *args, **kwargs):
+        """立即在线程池中执行任务；任务正在执行时合并到当前执行
+
+        Returns:
+            Future: 本次（或正在进行的）执行
+        """
+        with self._lock:
+            task = self._tasks[name]
+            future = task['future']
+            if future is not None and not future.done():
+                task['merged'] += 1
+                return future
+            task['last_start'] = self.clock.time()
+            future = self._executor.submit(self._run, name, task['func'], args, kwargs)
+            task['future'] = future
+            return future
+
+    def run_due(self, *names):
+        """触发已到执行间隔的任务
+
+        Args:
+            names: 只检查这些任务，省略时检查全部任务
+
+        Returns:
+            list: 本次触发的任务名
+        """
+        now = self.clock.time()
+        with self._lock:
+            candidates = names or tuple(self._tasks)
+            due = []
+            for name in candidates:
+                task = self._tasks[name]
+                if task['interval'] is None:
+                    continue
+                if task['last_start'] is None or now - task['last_start'] >= task['interval']:
+                    due.append(name)
+        for name in due:
+            self.trigger(name)
+        return due
+
+    def call(self, name, func, *args, **kwargs):
+        """在当前线程中执行函数并记录到任务 name 的耗时统计中"""
+        with self._lock:
+            task = self._tasks.setdefault(name, self._new_task(func, None))
+            task['last_start'] = self.clock.time()
+        return self._run(name, func, args, kwargs, raise_errors=True)
+
+    def _run(self, name, func, args, kwargs, raise_errors=False):
+        start = time.perf_counter()
+        error = None
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            error = e
+            if raise_errors:
+                raise
+            print(f"后台任务 {name} 执行失败: {str(e)}")
+            traceback.print_exc()
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                task = self._tasks[name]
+                task['runs'] += 1
+                task['total_time'] += duration
+                task['last_duration'] = duration
+                task['max_duration'] = max(task['max_duration'], duration)
+                if error is not None:
+                    task['errors'] += 1
+                    task['last_error'] = str(error)
+
+    def is_running(self, name):
+        """任务是否正在线程池中执行"""
+        with self._lock:
+            task = self._tasks.get(name)
+            return task is not None and task['future'] is not None and not task['future'].done()
+
+    def reset(self, name=None):
+        """清除上次执行时间，使任务在下一次 run_due 时立即执行"""
+        with self._lock:
+            for task_name, task in self._tasks.items():
+                if name is None or task_name == name:
+                    task['last_start'] = None
+
+    def stats(self):
+        """返回各任务的执行统计
+
+        Returns:
+            dict: 任务名 -> {'interval', 'running', 'runs', 'merged', 'errors',
+                             'avg_duration', 'last_duration', 'max_duration', 'last_error'}
+        """
+        with self._lock:
+            return {
+                name: {
+                    'interval': task['interval'],
+                    'running': task['future'] is not None and not task['future'].done(),
+                    'runs': task['runs'],
+                    'merged': task['merged'],
+                    'errors': task['errors'],
+                    'avg_duration': task['total_time'] / task['runs'] if task['runs'] else None,
+                    'last_duration': task['last_duration'],
+                    'max_duration': task['max_duration'],
+                    'last_error': task['last_error'],
+                }
+                for name, task in self._tasks.items()
+            }
+
+    def shutdown(self, wait=False):
+        """关闭线程池，未开始的任务被取消"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
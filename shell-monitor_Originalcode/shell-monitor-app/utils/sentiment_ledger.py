@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import hashlib
+import threading
+
+from utils.clock import SYSTEM_CLOCK
+from utils.analysis_cache import normalize_headline
+
+
+def sentiment_label(score, threshold=0.3):
+    """情感分数 -> positive / neutral / negative"""
+    if score >= threshold:
+        return "positive"
+    if score <= -threshold:
+        return "negative"
+    return "neutral"
+
+
+class SentimentLedger:
+    """
+    逐条新闻情感记录
+
+    每条标题（归一化后）只需评分一次，之后只有没见过的标题才需要交给LLM分析。
+    整体情感为各条评分的时间衰减加权平均：权重按半衰期指数衰减，并加入一个分数为0、
+    权重固定的中性先验，因此没有新新闻时整体情感会逐渐回到中性。
+    """
+
+    def __init__(self, path=None, half_life_hours=6.0, prior_weight=0.5, max_age_hours=72.0,
+                 max_records=1000, clock=None):
+        """
+        Args:
+            path: 记录文件路径（JSON），None 表示只保存在内存中
+            half_life_hours: 评分权重的半衰期（小时）
+            prior_weight: 中性先验的权重（相当于多少条刚出现的新闻）
+            max_age_hours: 超过该时间的记录被删除
+            max_records: 最多保留的记录数
+            clock: 时钟（utils.clock），None 表示系统时钟
+        """
+        self.path = path
+        self.half_life = half_life_hours * 3600
+        self.prior_weight = prior_weight
+        self.max_age = max_age_hours * 3600
+        self.max_records = max_records
+        self.clock = clock or SYSTEM_CLOCK
+        self.records = {}  # 键 -> {'headline', 'score', 'time'}
+        self.pending = []  # 分析中尚未确定的分数（流式分析时先计入整体情感，不保存）
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    @staticmethod
+    def key(headline):
+        return hashlib.sha1(normalize_headline(headline).encode('utf-8')).hexdigest()
+
+    def __len__(self):
+        return len(self.records)
+
+    def unseen(self, headlines):
+        """返回还没有评分记录的标题（保持原顺序，去除归一化后重复的标题）"""
+        result = []
+        keys = set()
+        with self._lock:
+            for headline in headlines:
+                key = self.key(headline)
+                if key not in self.records and key not in keys:
+                    keys.add(key)
+                    result.append(headline)
+        return result
+
+    def add(self, headlines, scores, timestamp=None, weights=None):
+        """记录一批标题的评分（分数限制在 -1 ~ 1）
+
+        Args:
+            weights: 每条标题的权重（如同一事件的报道数），None 表示均为 1
+        """
+        now = self.clock.time() if timestamp is None else timestamp
+        weights = [1.0] * len(headlines) if weights is None else weights
+        with self._lock:
+            for headline, score, weight in zip(headlines, scores, weights):
+                self.records[self.key(headline)] = {
+                    'headline': headline,
+                    'score': max(-1.0, min(1.0, float(score))),
+                    'time': now,
+                    'weight': float(weight),
+                }
+            self._prune(self.clock.time())
+
+    def set_weight(self, headline, weight):
+        """更新已有记录的权重（如同一事件出现了新的报道），没有记录时忽略"""
+        with self._lock:
+            record = self.records.get(self.key(headline))
+            if record is not None:
+                record['weight'] = float(weight)
+
+    def set_pending(self, scores):
+        """设置分析中的临时分数（按刚出现的新闻计权），None 表示清除"""
+        with self._lock:
+            self.pending = [max(-1.0, min(1.0, float(s))) for s in scores or ()]
+
+    def _prune(self, now):
+        expired = [k for k, r in self.records.items() if now - r['time'] > self.max_age]
+        for key in expired:
+            del self.records[key]
+        if len(self.records) > self.max_records:
+            oldest = sorted(self.records, key=lambda k: self.records[k]['time'])
+            for key in oldest[:len(self.records) - self.max_records]:
+                del self.records[key]
+
+    def aggregate(self, now=None):
+        """时间衰减加权平均情感分数（包括临时分数），没有记录时返回 None"""
+        now = self.clock.time() if now is None else now
+        with self._lock:
+            if not self.records and not self.pending:
+                return None
+            weighted = sum(self.pending)
+            total = self.prior_weight + len(self.pending)
+            for record in self.records.values():
+                age = max(0.0, now - record['time'])
+                weight = 0.5 ** (age / self.half_life) if self.half_life > 0 else 1.0
+                weight *= record.get('weight', 1.0)
+                weighted += weight * record['score']
+                total += weight
+            return weighted / total if total > 0 else 0.0
+
+    def stats(self):
+        """返回记录统计"""
+        with self._lock:
+            times = [r['time'] for r in self.records.values()]
+        score = self.aggregate()
+        return {
+            'records': len(times),
+            'oldest': min(times) if times else None,
+            'newest': max(times) if times else None,
+            'score': score,
+        }
+
+    def load(self):
+        """从磁盘读取记录（文件损坏时忽略）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                self.records = data.get('records', {})
+                self._prune(self.clock.time())
+        except Exception as e:
+            print(f"读取情感记录失败: {str(e)}")
+
+    def save(self):
+        """写入磁盘（先写临时文件再替换）"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {'records': dict(self.records)}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+
+import numpy as np
+
+from utils.indicators import INDICATOR_COLUMNS
+
+# 持仓状态编码
+POSITION_NONE = 0
+POSITION_LONG = 1
+
+_MA_FAST, _MA_SLOW, _RSI, _MACD, _MACD_SIGNAL = (
+    INDICATOR_COLUMNS.index(col) for col in ('ma5', 'ma25', 'rsi', 'macd', 'macd_signal'))
+
+
+class WatchlistEngine:
+    """
+    多交易对监控引擎
+
+    每个周期通过一次批量ticker请求获取全部交易对价格，
+    各交易对的状态（价格、持仓、入场价、会话高低点、最近两根K线的指标）保存在按列存放的
+    numpy数组中，价格变化、交易信号和止盈止损判断均为向量运算。
+    指标由后台任务更新，价格和持仓由监控线程更新，所有读写都在同一把锁内进行。
+    """
+
+    def __init__(self, symbols=()):
+        self.symbols = []
+        self.index = {}
+        self._lock = threading.RLock()
+        self._allocate(0)
+        self.set_symbols(symbols)
+
+    def _allocate(self, n):
+        self.last_price = np.full(n, np.nan)
+        self.prev_price = np.full(n, np.nan)
+        self.entry_price = np.full(n, np.nan)
+        self.position = np.zeros(n, dtype=np.int8)
+        self.session_high = np.full(n, np.nan)
+        self.session_low = np.full(n, np.nan)
+        self.indicators = np.full((n, len(INDICATOR_COLUMNS)), np.nan)
+        self.prev_indicators = np.full((n, len(INDICATOR_COLUMNS)), np.nan)
+        self.fresh = np.zeros(n, dtype=bool)  # 指标更新后尚未检查过信号
+
+    def _arrays(self):
+        return (self.last_price, self.prev_price, self.entry_price, self.position,
+                self.session_high, self.session_low, self.indicators, self.prev_indicators, self.fresh)
+
+    def set_symbols(self, symbols):
+        """设置监控列表，保留仍在列表中的交易对状态"""
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        with self._lock:
+            old_index = self.index
+            old_arrays = self._arrays()
+
+            self.symbols = symbols
+            self.index = {s: i for i, s in enumerate(symbols)}
+            self._allocate(len(symbols))
+
+            kept = [(i, old_index[s]) for i, s in enumerate(symbols) if s in old_index]
+            if kept:
+                new_idx, old_idx = (np.array(x) for x in zip(*kept))
+                for new_arr, old_arr in zip(self._arrays(), old_arrays):
+                    new_arr[new_idx] = old_arr[old_idx]
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def fetch_prices(self, client):
+        """一次批量请求获取全部交易对的最新价格
+
+        Returns:
+            dict: 交易对 -> 价格
+        """
+        if not self.symbols:
+            return {}
+        try:
+            tickers = client.get_symbol_ticker(symbols=json.dumps(self.symbols, separators=(',', ':')))
+        except Exception:
+            # 列表中有无效交易对时整批请求会失败，退回到全市场ticker再筛选
+            tickers = client.get_symbol_ticker()
+        return {t['symbol']: float(t['price']) for t in tickers if t.get('symbol') in self.index}
+
+    def update_prices(self, prices, stop_loss_percent, take_profit_percent):
+        """批量更新价格并检查止盈止损
+
+        Args:
+            prices: dict 交易对 -> 价格
+            stop_loss_percent: 止损百分比
+            take_profit_percent: 止盈百分比
+
+        Returns:
+            tuple: (价格更新列表 [(交易对, 价格, 变化百分比)],
+                    止盈止损列表 [(交易对, 'STOP_LOSS'/'TAKE_PROFIT', 价格, 盈亏百分比)])
+        """
+        with self._lock:
+            return self._update_prices(prices, stop_loss_percent, take_profit_percent)
+
+    def _update_prices(self, prices, stop_loss_percent, take_profit_percent):
+        n = len(self.symbols)
+        new = np.full(n, np.nan)
+        for symbol, price in prices.items():
+            i = self.index.get(symbol)
+            if i is not None:
+                new[i] = price
+
+        has_price = ~np.isnan(new)
+        self.prev_price = np.where(has_price, self.last_price, self.prev_price)
+        self.last_price = np.where(has_price, new, self.last_price)
+        self.session_high = np.where(has_price, np.fmax(self.session_high, new), self.session_high)
+        self.session_low = np.where(has_price, np.fmin(self.session_low, new), self.session_low)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pct = np.where(self.prev_price > 0, (self.last_price - self.prev_price) / self.prev_price * 100, 0.0)
+        pct = np.nan_to_num(pct)
+
+        updated_idx = np.flatnonzero(has_price)
+        updates = [(self.symbols[i], float(self.last_price[i]), float(pct[i])) for i in updated_idx]
+
+        # 止盈止损（只检查有入场价的多头持仓）
+        long_mask = has_price & (self.position == POSITION_LONG) & ~np.isnan(self.entry_price)
+        stop_loss_hit = long_mask & (new <= self.entry_price * (1 - stop_loss_percent / 100))
+        take_profit_hit = long_mask & ~stop_loss_hit & (new >= self.entry_price * (1 + take_profit_percent / 100))
+
+        stops = []
+        for mask, kind in ((stop_loss_hit, 'STOP_LOSS'), (take_profit_hit, 'TAKE_PROFIT')):
+            for i in np.flatnonzero(mask):
+                profit = (new[i] - self.entry_price[i]) / self.entry_price[i] * 100
+                stops.append((self.symbols[i], kind, float(new[i]), float(profit)))
+
+        closed = stop_loss_hit | take_profit_hit
+        self.position[closed] = POSITION_NONE
+        self.entry_price[closed] = np.nan
+
+        return updates, stops
+
+    def check_signals(self):
+        """检查指标更新后尚未检查过的交易对的交易信号（与单交易对的技术信号规则相同）
+
+        买入：MA5上穿MA25、RSI<50且MACD上穿信号线，只对空仓交易对；
+        卖出：MA5下穿MA25、RSI>50且MACD下穿信号线，只对多头持仓。
+        每次指标更新只检查一次，持仓由调用方通过 open_position / close_position 更新。
+
+        Returns:
+            list: [(交易对, 'BUY'/'SELL', 最新价格)]
+        """
+        with self._lock:
+            cur, prev = self.indicators, self.prev_indicators
+            columns = [_MA_FAST, _MA_SLOW, _RSI, _MACD, _MACD_SIGNAL]
+            valid = self.fresh & ~np.isnan(cur[:, columns]).any(axis=1) & \
+                ~np.isnan(prev[:, columns]).any(axis=1) & (self.last_price > 0)
+            self.fresh[:] = False
+
+            cross_up = (prev[:, _MA_FAST] <= prev[:, _MA_SLOW]) & (cur[:, _MA_FAST] > cur[:, _MA_SLOW]) & \
+                (prev[:, _MACD] <= prev[:, _MACD_SIGNAL]) & (cur[:, _MACD] > cur[:, _MACD_SIGNAL])
+            cross_down = (prev[:, _MA_FAST] >= prev[:, _MA_SLOW]) & (cur[:, _MA_FAST] < cur[:, _MA_SLOW]) & \
+                (prev[:, _MACD] >= prev[:, _MACD_SIGNAL]) & (cur[:, _MACD] < cur[:, _MACD_SIGNAL])
+            buy = valid & cross_up & (cur[:, _RSI] < 50) & (self.position != POSITION_LONG)
+            sell = valid & cross_down & (cur[:, _RSI] > 50) & (self.position == POSITION_LONG)
+
+            signals = []
+            for mask, kind in ((buy, 'BUY'), (sell, 'SELL')):
+                for i in np.flatnonzero(mask):
+                    signals.append((self.symbols[i], kind, float(self.last_price[i])))
+            return signals
+
+    def stop_distance(self, stop_loss_percent, take_profit_percent):
+        """全部多头持仓中，最新价格到止损价或止盈价的最近距离（比例），没有持仓时返回 None"""
+        with self._lock:
+            long_mask = (self.position == POSITION_LONG) & ~np.isnan(self.entry_price) & (self.last_price > 0)
+            if not long_mask.any():
+                return None
+            price = self.last_price[long_mask]
+            entry = self.entry_price[long_mask]
+        to_stop = np.log(price / (entry * (1 - stop_loss_percent / 100)))
+        to_target = np.log(entry * (1 + take_profit_percent / 100) / price)
+        return float(np.minimum(to_stop, to_target).min())
+
+    def open_position(self, symbol, price):
+        """记录多头入场"""
+        with self._lock:
+            i = self.index[symbol]
+            self.position[i] = POSITION_LONG
+            self.entry_price[i] = price
+
+    def close_position(self, symbol):
+        """清空持仓，返回入场价（没有持仓时为 None）"""
+        with self._lock:
+            i = self.index[symbol]
+            entry = None if np.isnan(self.entry_price[i]) else float(self.entry_price[i])
+            self.position[i] = POSITION_NONE
+            self.entry_price[i] = np.nan
+            return entry
+
+    def set_indicators(self, symbol, values, previous=None):
+        """保存交易对最新一根和前一根K线的指标值（如 IndicatorEngine.sync() 结果的最后两行）"""
+        with self._lock:
+            i = self.index.get(symbol)
+            if i is None:
+                return  # 更新期间已从监控列表中移除
+            self.indicators[i] = [values.get(col, np.nan) for col in INDICATOR_COLUMNS]
+            if previous is not None:
+                self.prev_indicators[i] = [previous.get(col, np.nan) for col in INDICATOR_COLUMNS]
+            self.fresh[i] = True
+
+    def snapshot(self, symbol):
+        """返回单个交易对的状态字典"""
+        with self._lock:
+            i = self.index[symbol]
+            state = {
+                'symbol': symbol,
+                'price': float(self.last_price[i]),
+                'position': 'LONG' if self.position[i] == POSITION_LONG else None,
+                'entry_price': None if np.isnan(self.entry_price[i]) else float(self.entry_price[i]),
+                'session_high': float(self.session_high[i]),
+                'session_low': float(self.session_low[i]),
+            }
+            state.update({col: float(v) for col, v in zip(INDICATOR_COLUMNS, self.indicators[i])})
+            return state